@@ -5,6 +5,7 @@ from syscore.exceptions import missingData
 from sysdata.config.configdata import Config
 from private.systems.crypto_2024.accounts.account_buffering_subsystem import apply_buffer
 from syscore.pandas.strategy_functions import turnover
+from syscore.pandas.step_function import stepFunctionSeries
 from systems.system_cache import diagnostic
 
 from private.systems.crypto_2024.accounts.account_inputs import accountInputs
@@ -53,7 +54,6 @@ class accountBufferingSystemLevel(accountInputs):
 
         return self.parent.portfolio.get_buffers_for_position(instrument_code)
 
-    @diagnostic()
     def get_buffered_position(
         self, instrument_code: str, roundpositions: bool = True
     ) -> pd.Series:
@@ -79,6 +79,26 @@ class accountBufferingSystemLevel(accountInputs):
         2015-12-11         1
         """
 
+        buffered_position = self.get_buffered_position_as_step_function(
+            instrument_code, roundpositions=roundpositions
+        )
+
+        return buffered_position.as_series()
+
+    @diagnostic()
+    def get_buffered_position_as_step_function(
+        self, instrument_code: str, roundpositions: bool = True
+    ) -> stepFunctionSeries:
+        ## positions rarely change from bar to bar, so are cached as the changes only
+        buffered_position = self._get_buffered_position_without_caching(
+            instrument_code, roundpositions=roundpositions
+        )
+
+        return stepFunctionSeries.from_series(buffered_position)
+
+    def _get_buffered_position_without_caching(
+        self, instrument_code: str, roundpositions: bool = True
+    ) -> pd.Series:
         optimal_position = self.get_notional_position(instrument_code)
 
         buffer_method = self.config.get_element_or_default("buffer_method", "none")
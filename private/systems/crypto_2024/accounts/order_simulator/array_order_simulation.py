@@ -0,0 +1,184 @@
+"""
+Array versions of the bar by bar order simulation
+
+The object based simulator builds a DataAtIDXPoint, orders and fills for every bar,
+which dominates run time on minute data. Here the same logic runs over plain arrays
+and orders and fills are kept as columns; the objects are only built if someone
+iterates over them.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from sysobjects.fills import ListOfFillsAsArrays
+from private.systems.crypto_2024.accounts.order_simulator.simple_orders import (
+    ListOfSimpleOrdersWithDateAsArrays,
+)
+
+
+@dataclass
+class OrdersAndFillsAsArrays:
+    ## each order is submitted at dates[order_idx], each fill happens at dates[fill_idx]
+    dates: pd.DatetimeIndex
+    order_idx: np.ndarray
+    order_qty: np.ndarray
+    limit_price: np.ndarray  ## nan for market orders
+    fill_idx: np.ndarray
+    fill_qty: np.ndarray
+    fill_price: np.ndarray
+    price_requires_slippage_adjustment: np.ndarray
+
+    @property
+    def order_dates(self) -> pd.DatetimeIndex:
+        return self.dates[self.order_idx]
+
+    @property
+    def fill_dates(self) -> pd.DatetimeIndex:
+        return self.dates[self.fill_idx]
+
+    def orders_as_pd_df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            dict(quantity=self.order_qty, limit_price=self.limit_price),
+            index=self.order_dates,
+        )
+
+    def fills_as_pd_df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            dict(qty=self.fill_qty, price=self.fill_price), index=self.fill_dates
+        )
+
+    def list_of_orders(self) -> ListOfSimpleOrdersWithDateAsArrays:
+        return ListOfSimpleOrdersWithDateAsArrays(
+            submit_date=self.order_dates,
+            quantity=self.order_qty,
+            limit_price=self.limit_price,
+        )
+
+    def list_of_fills(self) -> ListOfFillsAsArrays:
+        return ListOfFillsAsArrays(
+            date=self.fill_dates,
+            qty=self.fill_qty,
+            price=self.fill_price,
+            price_requires_slippage_adjustment=self.price_requires_slippage_adjustment,
+        )
+
+
+def simulate_market_orders_over_arrays(
+    dates: pd.DatetimeIndex, prices: np.ndarray, optimal_positions: np.ndarray
+) -> tuple:
+    """
+    Market orders: at each bar we trade to the rounded optimal position and are
+    filled at the next bar's price, so the position path doesn't depend on prices
+    and the whole thing vectorises
+
+    >>> dates = pd.date_range("2024-01-01", periods=5, freq="min")
+    >>> prices = np.array([10.0, 11.0, 12.0, 13.0, 14.0])
+    >>> optimal = np.array([np.nan, 1.4, 1.6, 1.6, -3.0])
+    >>> positions, orders_and_fills = simulate_market_orders_over_arrays(dates, prices, optimal)
+    >>> positions.tolist()
+    [0, 0, 1, 2, 2]
+    >>> orders_and_fills.order_qty.tolist(), orders_and_fills.fill_price.tolist()
+    ([1, 1], [12.0, 13.0])
+    """
+    length = len(optimal_positions)
+    target = np.rint(optimal_positions[:-1])
+
+    ## NaN optimal positions mean no order, so we keep the previous target
+    target = pd.Series(target).ffill().fillna(0.0).values.astype(np.int64)
+    positions = np.zeros(length, dtype=np.int64)
+    positions[1:] = target
+
+    trades = positions[1:] - positions[:-1]
+    order_idx = np.flatnonzero(trades)
+    order_qty = trades[order_idx]
+    fill_idx = order_idx + 1
+
+    orders_and_fills = OrdersAndFillsAsArrays(
+        dates=dates,
+        order_idx=order_idx,
+        order_qty=order_qty,
+        limit_price=np.full(len(order_idx), np.nan),
+        fill_idx=fill_idx,
+        fill_qty=order_qty,
+        fill_price=prices[fill_idx],
+        price_requires_slippage_adjustment=np.full(len(order_idx), True),
+    )
+
+    return positions, orders_and_fills
+
+
+def simulate_limit_orders_over_arrays(
+    dates: pd.DatetimeIndex, prices: np.ndarray, optimal_positions: np.ndarray
+) -> tuple:
+    """
+    Limit orders at the current price, filled only if the next price goes through the
+    limit. Fills are path dependent so this has to loop, but only over floats.
+
+    >>> dates = pd.date_range("2024-01-01", periods=5, freq="min")
+    >>> prices = np.array([10.0, 9.0, 9.5, 8.0, 8.5])
+    >>> optimal = np.array([1.0, 1.0, 1.0, 0.0, 0.0])
+    >>> positions, orders_and_fills = simulate_limit_orders_over_arrays(dates, prices, optimal)
+    >>> positions.tolist()
+    [0, 1, 1, 1, 0]
+    >>> orders_and_fills.fill_qty.tolist(), orders_and_fills.fill_price.tolist()
+    ([1, -1], [10.0, 8.0])
+    """
+    length = len(optimal_positions)
+    optimal_as_list = optimal_positions.tolist()
+    prices_as_list = prices.tolist()
+
+    positions = [0] * length
+    order_idx = []
+    order_qty = []
+    fill_order_number = []
+    requires_slippage = []
+
+    current_position = 0
+    for idx in range(length - 1):
+        positions[idx] = current_position
+        current_optimal_position = optimal_as_list[idx]
+        if current_optimal_position != current_optimal_position:
+            ## NaN
+            continue
+
+        quantity = round(current_optimal_position) - current_position
+        if quantity == 0:
+            continue
+
+        limit_price = prices_as_list[idx]
+        next_price = prices_as_list[idx + 1]
+
+        order_idx.append(idx)
+        order_qty.append(quantity)
+
+        if quantity > 0 and limit_price > next_price:
+            requires_slippage.append(False)
+        elif quantity < 0 and limit_price < next_price:
+            requires_slippage.append(True)
+        else:
+            continue
+
+        fill_order_number.append(len(order_idx) - 1)
+        current_position = current_position + quantity
+
+    if length > 0:
+        positions[-1] = current_position
+
+    order_idx = np.array(order_idx, dtype=np.int64)
+    order_qty = np.array(order_qty, dtype=np.int64)
+    fill_order_number = np.array(fill_order_number, dtype=np.int64)
+    limit_price = prices[order_idx]
+
+    orders_and_fills = OrdersAndFillsAsArrays(
+        dates=dates,
+        order_idx=order_idx,
+        order_qty=order_qty,
+        limit_price=limit_price,
+        fill_idx=order_idx[fill_order_number] + 1,
+        fill_qty=order_qty[fill_order_number],
+        fill_price=limit_price[fill_order_number],
+        price_requires_slippage_adjustment=np.array(requires_slippage, dtype=bool),
+    )
+
+    return np.array(positions, dtype=np.int64), orders_and_fills
@@ -21,6 +21,9 @@ from private.systems.crypto_2024.accounts.order_simulator.account_curve_order_si
 from private.systems.crypto_2024.accounts.order_simulator.pandl_order_simulator import (
     DataAtIDXPoint,
 )
+from private.systems.crypto_2024.accounts.order_simulator.array_order_simulation import (
+    simulate_limit_orders_over_arrays,
+)
 from private.systems.crypto_2024.accounts.order_simulator.minute_market_orders import (
     MinuteOrderSimulatorOfMarketOrders,
 )
@@ -32,6 +35,10 @@ class MinuteOrderSimulatorOfLimitOrders(MinuteOrderSimulatorOfMarketOrders):
     def orders_fills_function(self) -> Callable:
         return generate_order_and_fill_at_idx_point_for_limit_orders
 
+    @property
+    def array_simulation_function(self) -> Callable:
+        return simulate_limit_orders_over_arrays
+
 
 def generate_order_and_fill_at_idx_point_for_limit_orders(
     current_position: int,
@@ -10,13 +10,18 @@ import numpy as np
 from syscore.cache import Cache
 from private.systems.crypto_2024.accounts.order_simulator.simple_orders import (
     ListOfSimpleOrdersWithDate,
+    ListOfSimpleOrdersWithDateAsArrays,
     SimpleOrderWithDate,
 )
-from sysobjects.fills import ListOfFills, Fill
+from sysobjects.fills import ListOfFills, ListOfFillsAsArrays, Fill
 from private.systems.crypto_2024.accounts.order_simulator.fills_and_orders import (
     ListOfSimpleOrdersAndResultingFill,
     empty_list_of_orders_with_no_fills,
 )
+from private.systems.crypto_2024.accounts.order_simulator.array_order_simulation import (
+    OrdersAndFillsAsArrays,
+    simulate_market_orders_over_arrays,
+)
 
 
 @dataclass
@@ -25,6 +30,60 @@ class PositionsOrdersFills:
     list_of_orders: ListOfSimpleOrdersWithDate
     list_of_fills: ListOfFills
 
+    def orders_and_fills_df(self) -> pd.DataFrame:
+        fills_df = self.list_of_fills.as_pd_df()
+        orders_df = self.list_of_orders.as_pd_df()
+
+        return _concat_orders_and_fills_df(orders_df=orders_df, fills_df=fills_df)
+
+
+class PositionsOrdersFillsFromArrays(object):
+    ## Same interface as PositionsOrdersFills, but orders and fills are held as arrays
+    ## and only turned into lists of objects when asked for
+    def __init__(
+        self, positions: pd.Series, orders_and_fills_arrays: OrdersAndFillsAsArrays
+    ):
+        self.positions = positions
+        self.orders_and_fills_arrays = orders_and_fills_arrays
+
+    @property
+    def list_of_orders(self) -> ListOfSimpleOrdersWithDate:
+        list_of_orders = getattr(self, "_list_of_orders", None)
+        if list_of_orders is None:
+            list_of_orders = self.orders_and_fills_arrays.list_of_orders()
+            self._list_of_orders = list_of_orders
+
+        return list_of_orders
+
+    @property
+    def list_of_fills(self) -> ListOfFills:
+        list_of_fills = getattr(self, "_list_of_fills", None)
+        if list_of_fills is None:
+            list_of_fills = self.orders_and_fills_arrays.list_of_fills()
+            self._list_of_fills = list_of_fills
+
+        return list_of_fills
+
+    def orders_and_fills_df(self) -> pd.DataFrame:
+        fills_df = self.orders_and_fills_arrays.fills_as_pd_df().sort_index()
+        orders_df = self.orders_and_fills_arrays.orders_as_pd_df()
+
+        return _concat_orders_and_fills_df(orders_df=orders_df, fills_df=fills_df)
+
+
+def _concat_orders_and_fills_df(
+    orders_df: pd.DataFrame, fills_df: pd.DataFrame
+) -> pd.DataFrame:
+    orders_and_fills_df = pd.concat([orders_df, fills_df], axis=1)
+    orders_and_fills_df.columns = [
+        "order_qty",
+        "limit_price",
+        "fill_qty",
+        "fill_price",
+    ]
+
+    return orders_and_fills_df
+
 
 class OrdersSeriesData(object):
     def __init__(self, price_series: pd.Series, unrounded_positions: pd.Series):
@@ -64,19 +123,8 @@ class OrderSimulator:
         return df_positions
 
     def _orders_and_fills_df(self) -> pd.DataFrame:
-        list_of_fills = self.list_of_fills()
-        fills_df = list_of_fills.as_pd_df()
-        list_of_orders = self.list_of_orders()
-        orders_df = list_of_orders.as_pd_df()
-        orders_and_fills_df = pd.concat([orders_df, fills_df], axis=1)
-        orders_and_fills_df.columns = [
-            "order_qty",
-            "limit_price",
-            "fill_qty",
-            "fill_price",
-        ]
-
-        return orders_and_fills_df
+        positions_orders_fills = self.positions_orders_and_fills_from_series_data()
+        return positions_orders_fills.orders_and_fills_df()
 
     def prices(self) -> pd.Series:
         return self.series_data.price_series
@@ -101,7 +149,14 @@ class OrderSimulator:
         return self.cache.get(self._positions_orders_and_fills_from_series_data)
 
     def _positions_orders_and_fills_from_series_data(self) -> PositionsOrdersFills:
+        self._simulation_count = self.simulation_count + 1
         series_data = self.series_data
+        if self.use_array_simulation:
+            return generate_positions_orders_and_fills_from_arrays(
+                series_data=series_data,
+                passed_array_simulation_function=self.array_simulation_function,
+            )
+
         return generate_positions_orders_and_fills_from_series_data(
             series_data=series_data,
             passed_orders_fills_function=self.orders_fills_function,
@@ -122,7 +177,34 @@ class OrderSimulator:
 
     @property
     def cache(self) -> Cache:
-        return getattr(self, "_cache", Cache(self))
+        ## The simulator lives in the system cache, keyed on instrument_code and
+        ## is_subsystem, so this memoises each simulation for the whole backtest.
+        ## If the upstream unrounded positions change we start again.
+        upstream_positions = self.upstream_unrounded_positions()
+        cache = getattr(self, "_cache", None)
+        if cache is None or _positions_have_changed(
+            upstream_positions, self._upstream_positions_in_cache
+        ):
+            cache = Cache(self)
+            self._cache = cache
+            self._upstream_positions_in_cache = upstream_positions
+
+        return cache
+
+    def upstream_unrounded_positions(self) -> pd.Series:
+        if self.is_subsystem:
+            return self.system_accounts_stage.get_unrounded_subsystem_position_for_order_simulator(
+                self.instrument_code
+            )
+        else:
+            return self.system_accounts_stage.get_unrounded_instrument_position_for_order_simulator(
+                self.instrument_code
+            )
+
+    @property
+    def simulation_count(self) -> int:
+        ## number of times the path dependent simulation has actually been run
+        return getattr(self, "_simulation_count", 0)
 
     @property
     def orders_fills_function(self) -> Callable:
@@ -132,6 +214,26 @@ class OrderSimulator:
     def idx_data_function(self) -> Callable:
         return get_order_sim_daily_data_at_idx_point
 
+    @property
+    def use_array_simulation(self) -> bool:
+        ## subclasses with their own orders_fills_function and no array equivalent
+        ## should return False here
+        return True
+
+    @property
+    def array_simulation_function(self) -> Callable:
+        ## must implement the same logic as orders_fills_function
+        return simulate_market_orders_over_arrays
+
+
+def _positions_have_changed(
+    upstream_positions: pd.Series, positions_in_cache: pd.Series
+) -> bool:
+    if upstream_positions is positions_in_cache:
+        return False
+
+    return not upstream_positions.equals(positions_in_cache)
+
 
 def build_daily_series_data_for_order_simulator(
     system_accounts_stage,  ## no explicit type would cause circular import
@@ -191,7 +293,7 @@ def generate_positions_orders_and_fills_from_series_data(
         orders = list_of_orders_and_fill.list_of_orders
         fill = list_of_orders_and_fill.fill
         if len(orders) > 0:
-            list_of_orders = list_of_orders + orders
+            list_of_orders.extend(orders)
 
             if fill.is_unfilled:
                 pass
@@ -204,14 +306,35 @@ def generate_positions_orders_and_fills_from_series_data(
     list_of_positions.append(current_position)
 
     positions = pd.Series(list_of_positions, master_index)
-    list_of_orders = ListOfSimpleOrdersWithDate(list_of_orders)
-    list_of_fills = ListOfFills(list_of_fills)
+    # held as columns, so we don't keep an object for every order and fill
+    list_of_orders = ListOfSimpleOrdersWithDateAsArrays.from_list_of_orders(
+        list_of_orders
+    )
+    list_of_fills = ListOfFillsAsArrays.from_list_of_fills(list_of_fills)
 
     return PositionsOrdersFills(
         positions=positions, list_of_orders=list_of_orders, list_of_fills=list_of_fills
     )
 
 
+def generate_positions_orders_and_fills_from_arrays(
+    series_data: OrdersSeriesData,
+    passed_array_simulation_function: Callable,
+) -> PositionsOrdersFillsFromArrays:
+    master_index = series_data.price_series.index
+    prices = series_data.price_series.values.astype(np.float64)
+    optimal_positions = series_data.unrounded_positions.values.astype(np.float64)
+
+    positions, orders_and_fills_arrays = passed_array_simulation_function(
+        dates=master_index, prices=prices, optimal_positions=optimal_positions
+    )
+    positions = pd.Series(positions, master_index)
+
+    return PositionsOrdersFillsFromArrays(
+        positions=positions, orders_and_fills_arrays=orders_and_fills_arrays
+    )
+
+
 DataAtIDXPoint = namedtuple(
     "DataAtIDXPoint",
     ["current_optimal_position", "current_price", "next_price", "next_datetime"],
@@ -3,6 +3,9 @@ from typing import List
 import datetime
 from dataclasses import dataclass
 
+import numpy as np
+import pandas as pd
+
 from syscore.pandas.pdutils import make_df_from_list_of_named_tuple
 
 
@@ -93,5 +96,85 @@ class ListOfSimpleOrdersWithDate(ListOfSimpleOrders):
         return [order._as_tuple() for order in self]
 
 
+class ListOfSimpleOrdersWithDateAsArrays(object):
+    ## Same methods as ListOfSimpleOrdersWithDate, but orders are held as columns, and
+    ## only created as objects if they are iterated over. limit_price is nan for market
+    ## orders
+    def __init__(
+        self,
+        submit_date: pd.DatetimeIndex,
+        quantity: np.ndarray,
+        limit_price: np.ndarray,
+    ):
+        self._submit_date = pd.DatetimeIndex(submit_date)
+        self._quantity = np.asarray(quantity)
+        self._limit_price = np.asarray(limit_price, dtype=float)
+
+    def __repr__(self):
+        return "ListOfSimpleOrdersWithDateAsArrays with %d orders" % len(self)
+
+    def __len__(self):
+        return len(self._quantity)
+
+    def __iter__(self):
+        for submit_date, quantity, limit_price in zip(
+            self._submit_date, self._quantity.tolist(), self._limit_price.tolist()
+        ):
+            yield SimpleOrderWithDate(
+                quantity=quantity,
+                submit_date=submit_date,
+                limit_price=None if np.isnan(limit_price) else limit_price,
+            )
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return ListOfSimpleOrdersWithDateAsArrays(
+                submit_date=self._submit_date[item],
+                quantity=self._quantity[item],
+                limit_price=self._limit_price[item],
+            )
+
+        limit_price = float(self._limit_price[item])
+        return SimpleOrderWithDate(
+            quantity=self._quantity[item].item(),
+            submit_date=self._submit_date[item],
+            limit_price=None if np.isnan(limit_price) else limit_price,
+        )
+
+    def remove_zero_orders(self):
+        not_zero = self._quantity != 0
+        return ListOfSimpleOrdersWithDateAsArrays(
+            submit_date=self._submit_date[not_zero],
+            quantity=self._quantity[not_zero],
+            limit_price=self._limit_price[not_zero],
+        )
+
+    def contains_no_orders(self):
+        return not (self._quantity != 0).any()
+
+    def as_pd_df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            dict(quantity=self._quantity, limit_price=self._limit_price),
+            index=self._submit_date.rename("submit_date"),
+            copy=False,
+        )
+
+    @classmethod
+    def from_list_of_orders(cls, list_of_orders: list):
+        return cls(
+            submit_date=pd.DatetimeIndex(
+                [order.submit_date for order in list_of_orders]
+            ),
+            quantity=np.array([order.quantity for order in list_of_orders]),
+            limit_price=np.array(
+                [
+                    np.nan if order.limit_price is None else order.limit_price
+                    for order in list_of_orders
+                ],
+                dtype=float,
+            ),
+        )
+
+
 def empty_list_of_orders_with_date() -> ListOfSimpleOrdersWithDate:
     return ListOfSimpleOrdersWithDate([])
@@ -16,7 +16,20 @@ from private.systems.crypto_2024.accounts.pandl_calculators.pandl_using_fills im
 )
 
 from sysobjects.instruments import instrumentCosts
-from sysobjects.fills import Fill
+from sysobjects.fills import (
+    Fill,
+    fill_arrays_from_fills,
+    list_of_fills_as_arrays,
+    concatenate_fill_arrays,
+)
+
+## What calculate_costs_from_fill_arrays needs from the cost object
+COST_ATTRIBUTES_FOR_ARRAYS = [
+    "price_slippage",
+    "value_of_block_commission",
+    "percentage_cost",
+    "value_of_pertrade_commission",
+]
 
 
 class pandlCalculationWithCashCostsAndFills(
@@ -63,16 +76,53 @@ class pandlCalculationWithCashCostsAndFills(
         return normalised_costs
 
     def costs_from_trading_in_instrument_currency_as_series(self) -> pd.Series:
-        instrument_currency_costs_as_list = (
-            self.costs_from_trading_in_instrument_currency_as_list()
-        )
-        date_index = self.date_index_for_all_fills()
-        costs_as_pd_series = pd.Series(instrument_currency_costs_as_list, date_index)
+        if self.can_calculate_costs_from_arrays:
+            costs_as_pd_series = (
+                self.costs_from_trading_in_instrument_currency_from_arrays()
+            )
+        else:
+            instrument_currency_costs_as_list = (
+                self.costs_from_trading_in_instrument_currency_as_list()
+            )
+            date_index = self.date_index_for_all_fills()
+            costs_as_pd_series = pd.Series(
+                instrument_currency_costs_as_list, date_index
+            )
+
         costs_as_pd_series = costs_as_pd_series.sort_index()
         costs_as_pd_series = costs_as_pd_series.groupby(costs_as_pd_series.index).sum()
 
         return costs_as_pd_series
 
+    def costs_from_trading_in_instrument_currency_from_arrays(self) -> pd.Series:
+        fill_arrays = self.arrays_for_all_fills()
+        instrument_currency_costs = -calculate_costs_from_fill_arrays(
+            qty=fill_arrays["qty"],
+            price=fill_arrays["price"],
+            price_requires_slippage_adjustment=fill_arrays[
+                "price_requires_slippage_adjustment"
+            ],
+            value_per_point=self.value_per_point,
+            raw_costs=self.raw_costs,
+        )
+
+        return pd.Series(instrument_currency_costs, index=fill_arrays["date"])
+
+    def arrays_for_all_fills(self) -> dict:
+        ## same fills as list_of_all_fills
+        trading_fill_arrays = fill_arrays_from_fills(self.fills)
+        holding_fill_arrays = list_of_fills_as_arrays(self.pseudo_fills_from_holding)
+
+        return concatenate_fill_arrays([trading_fill_arrays, holding_fill_arrays])
+
+    @property
+    def can_calculate_costs_from_arrays(self) -> bool:
+        ## otherwise fall back to calculating the cost of each Fill in turn
+        return all(
+            hasattr(self.raw_costs, attribute)
+            for attribute in COST_ATTRIBUTES_FOR_ARRAYS
+        )
+
     def costs_from_trading_in_instrument_currency_as_list(self) -> list:
         list_of_fills = self.list_of_all_fills()
 
@@ -177,3 +227,34 @@ def calculate_cost_from_fill_with_cost_object(
     )
 
     return cost_for_trade
+
+
+def calculate_costs_from_fill_arrays(
+    qty: np.ndarray,
+    price: np.ndarray,
+    price_requires_slippage_adjustment: np.ndarray,
+    value_per_point: float,
+    raw_costs: instrumentCosts,
+) -> np.ndarray:
+    """
+    Same as raw_costs.calculate_cost_instrument_currency for each fill: slippage where
+    required, plus the largest of the per trade, per block and percentage commissions
+    """
+    blocks_traded = np.abs(qty)
+    value_per_block = price * value_per_point
+
+    slippage = np.where(
+        price_requires_slippage_adjustment,
+        blocks_traded * raw_costs.price_slippage * value_per_point,
+        0.0,
+    )
+    per_trade_commission = np.full(
+        len(blocks_traded), float(raw_costs.value_of_pertrade_commission)
+    )
+    per_block_commission = blocks_traded * raw_costs.value_of_block_commission
+    percentage_commission = blocks_traded * value_per_block * raw_costs.percentage_cost
+    commission = np.maximum.reduce(
+        [per_trade_commission, per_block_commission, percentage_commission]
+    )
+
+    return slippage + commission
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from private.systems.crypto_2024.accounts.order_simulator.pandl_order_simulator import (
+    OrdersSeriesData,
+    generate_positions_orders_and_fills_from_series_data,
+    generate_positions_orders_and_fills_from_arrays,
+    generate_order_and_fill_at_idx_point_for_market_orders,
+    get_order_sim_daily_data_at_idx_point,
+)
+from private.systems.crypto_2024.accounts.order_simulator.minute_limit_orders import (
+    generate_order_and_fill_at_idx_point_for_limit_orders,
+)
+from private.systems.crypto_2024.accounts.order_simulator.array_order_simulation import (
+    simulate_market_orders_over_arrays,
+    simulate_limit_orders_over_arrays,
+)
+
+
+@pytest.fixture(scope="module")
+def series_data():
+    rng = np.random.default_rng(7)
+    periods = 5000
+    index = pd.date_range("2024-01-01", periods=periods, freq="min")
+    price = pd.Series(100.0 * np.exp(np.cumsum(rng.normal(0, 0.001, periods))), index)
+    optimal_positions = pd.Series(np.cumsum(rng.normal(0, 0.3, periods)), index)
+    optimal_positions.iloc[:50] = np.nan
+    optimal_positions.iloc[1000:1100] = np.nan
+
+    return OrdersSeriesData(price_series=price, unrounded_positions=optimal_positions)
+
+
+@pytest.mark.parametrize(
+    "orders_fills_function, array_simulation_function",
+    [
+        (
+            generate_order_and_fill_at_idx_point_for_market_orders,
+            simulate_market_orders_over_arrays,
+        ),
+        (
+            generate_order_and_fill_at_idx_point_for_limit_orders,
+            simulate_limit_orders_over_arrays,
+        ),
+    ],
+)
+def test_array_simulation_matches_object_simulation(
+    series_data, orders_fills_function, array_simulation_function
+):
+    expected = generate_positions_orders_and_fills_from_series_data(
+        series_data=series_data,
+        passed_idx_data_function=get_order_sim_daily_data_at_idx_point,
+        passed_orders_fills_function=orders_fills_function,
+    )
+    result = generate_positions_orders_and_fills_from_arrays(
+        series_data=series_data,
+        passed_array_simulation_function=array_simulation_function,
+    )
+
+    pd.testing.assert_series_equal(result.positions, expected.positions)
+    assert result.list_of_fills == expected.list_of_fills
+    assert [order._as_tuple() for order in result.list_of_orders] == [
+        order._as_tuple() for order in expected.list_of_orders
+    ]
+
+    expected_df = expected.orders_and_fills_df()
+    expected_df["limit_price"] = expected_df.limit_price.astype(float)
+    pd.testing.assert_frame_equal(
+        result.orders_and_fills_df(), expected_df, check_dtype=False
+    )
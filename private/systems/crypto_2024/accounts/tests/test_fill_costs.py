@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysobjects.fills import (
+    Fill,
+    ListOfFills,
+    ListOfFillsAsArrays,
+    list_of_fills_as_arrays,
+)
+from sysobjects.instruments import instrumentCosts
+from private.systems.crypto_2024.accounts.order_simulator.array_order_simulation import (
+    OrdersAndFillsAsArrays,
+)
+from private.systems.crypto_2024.accounts.pandl_calculators.pandl_cash_costs import (
+    calculate_costs_from_fill_arrays,
+    calculate_cost_from_fill_with_cost_object,
+)
+from private.systems.crypto_2024.accounts.pandl_calculators.pandl_using_fills import (
+    infer_positions_from_fills,
+)
+
+
+@pytest.mark.parametrize(
+    "raw_costs",
+    [
+        instrumentCosts(price_slippage=0.5, percentage_cost=0.001),
+        instrumentCosts(price_slippage=0.1, value_of_block_commission=2.0),
+        instrumentCosts(value_of_pertrade_commission=5.0, percentage_cost=0.0002),
+    ],
+)
+def test_array_costs_match_cost_of_each_fill(raw_costs):
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2024-01-01", periods=500, freq="min", tz="utc")
+    list_of_fills = [
+        Fill(
+            date=date,
+            qty=float(rng.choice([-3, -1, 1, 2, 10])),
+            price=float(rng.uniform(10, 1000)),
+            price_requires_slippage_adjustment=bool(rng.random() > 0.5),
+        )
+        for date in dates
+    ]
+
+    expected = [
+        calculate_cost_from_fill_with_cost_object(
+            fill, value_per_point=2.0, raw_costs=raw_costs
+        )
+        for fill in list_of_fills
+    ]
+
+    fill_arrays = list_of_fills_as_arrays(list_of_fills)
+    result = calculate_costs_from_fill_arrays(
+        qty=fill_arrays["qty"],
+        price=fill_arrays["price"],
+        price_requires_slippage_adjustment=fill_arrays[
+            "price_requires_slippage_adjustment"
+        ],
+        value_per_point=2.0,
+        raw_costs=raw_costs,
+    )
+
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+def test_fill_arrays_from_simulator_match_fill_objects():
+    dates = pd.date_range("2024-01-01", periods=6, freq="min", tz="utc")
+    orders_and_fills = OrdersAndFillsAsArrays(
+        dates=dates,
+        order_idx=np.array([0, 2, 4]),
+        order_qty=np.array([1.0, -2.0, 0.0]),
+        limit_price=np.full(3, np.nan),
+        fill_idx=np.array([1, 3, 5]),
+        fill_qty=np.array([1.0, -2.0, 0.0]),
+        fill_price=np.array([100.0, 101.0, np.nan]),
+        price_requires_slippage_adjustment=np.array([True, False, True]),
+    )
+    list_of_fills = orders_and_fills.list_of_fills()
+
+    fill_arrays = list_of_fills.as_arrays()
+    expected = list_of_fills_as_arrays(list(list_of_fills))
+
+    assert len(list_of_fills) == 2
+    pd.testing.assert_index_equal(fill_arrays["date"], expected["date"])
+    for key in ["qty", "price", "price_requires_slippage_adjustment"]:
+        np.testing.assert_array_equal(fill_arrays[key], expected[key])
+
+
+def test_fills_as_arrays_match_list_of_fills():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2024-01-01", periods=2000, freq="min", tz="utc")
+    positions = pd.Series(np.round(np.cumsum(rng.normal(0, 0.3, 2000))), dates)
+    price = pd.Series(rng.uniform(10, 20, 2000), dates)
+
+    expected = ListOfFills.from_position_series_and_prices(positions, price=price)
+    result = ListOfFillsAsArrays.from_position_series_and_prices(positions, price=price)
+
+    assert len(result) == len(expected)
+    assert list(result) == list(expected)
+    assert result[-1] == expected[-1]
+    pd.testing.assert_frame_equal(
+        result.as_pd_df(), expected.as_pd_df(), check_freq=False
+    )
+
+
+def test_positions_inferred_from_any_list_of_fills():
+    rng = np.random.default_rng(5)
+    dates = pd.date_range("2024-01-01", periods=200, freq="min", tz="utc")
+    positions = pd.Series(np.round(np.cumsum(rng.normal(0, 0.5, 200))), dates)
+    price = pd.Series(rng.uniform(10, 20, 200), dates)
+    fills = ListOfFillsAsArrays.from_position_series_and_prices(positions, price=price)
+
+    expected = infer_positions_from_fills(fills)
+    for same_fills in [ListOfFills(list(fills)), list(fills)]:
+        pd.testing.assert_series_equal(infer_positions_from_fills(same_fills), expected)
+
+
+def test_fills_as_arrays_added_to_list():
+    dates = pd.date_range("2024-01-01", periods=3, freq="min", tz="utc")
+    fills = ListOfFillsAsArrays(
+        date=dates,
+        qty=np.array([1.0, -2.0, 1.0]),
+        price=np.array([100.0, 101.0, 102.0]),
+        price_requires_slippage_adjustment=np.array([True, False, True]),
+    )
+    other_fill = Fill(date=dates[-1], qty=3.0, price=99.0)
+
+    assert fills + [other_fill] == list(fills) + [other_fill]
+    assert [other_fill] + fills == [other_fill] + list(fills)
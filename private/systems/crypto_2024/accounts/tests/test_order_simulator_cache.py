@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from private.systems.crypto_2024.accounts.order_simulator.minute_market_orders import (
+    MinuteOrderSimulatorOfMarketOrders,
+)
+
+
+class fakeAccountsStage(object):
+    def __init__(self):
+        index = pd.date_range("2024-01-01", periods=500, freq="min")
+        rng = np.random.default_rng(3)
+        self.prices = pd.Series(100.0 + np.cumsum(rng.normal(0, 0.1, 500)), index)
+        self.positions = pd.Series(np.cumsum(rng.normal(0, 0.5, 500)), index)
+
+    def get_mintue_prices(self, instrument_code):
+        return self.prices
+
+    def get_unrounded_subsystem_position_for_order_simulator(self, instrument_code):
+        return self.positions
+
+    def get_unrounded_instrument_position_for_order_simulator(self, instrument_code):
+        return self.positions
+
+
+def test_simulation_runs_once_per_backtest():
+    accounts_stage = fakeAccountsStage()
+    order_simulator = MinuteOrderSimulatorOfMarketOrders(
+        system_accounts_stage=accounts_stage,
+        instrument_code="BTCUSDT",
+        is_subsystem=True,
+    )
+
+    order_simulator.positions()
+    order_simulator.list_of_fills()
+    order_simulator.list_of_orders()
+    order_simulator.diagnostic_df()
+    order_simulator.positions()
+
+    assert order_simulator.simulation_count == 1
+
+
+def test_simulation_reruns_when_upstream_positions_change():
+    accounts_stage = fakeAccountsStage()
+    order_simulator = MinuteOrderSimulatorOfMarketOrders(
+        system_accounts_stage=accounts_stage,
+        instrument_code="BTCUSDT",
+    )
+    old_positions = order_simulator.positions()
+
+    # an identical but recalculated series is not a change
+    accounts_stage.positions = accounts_stage.positions.copy()
+    order_simulator.positions()
+    assert order_simulator.simulation_count == 1
+
+    accounts_stage.positions = accounts_stage.positions * 2.0
+    new_positions = order_simulator.positions()
+    order_simulator.list_of_fills()
+
+    assert order_simulator.simulation_count == 2
+    assert not new_positions.equals(old_positions)
@@ -1,4 +1,4 @@
-from syscore.pandas.strategy_functions import quantile_of_points_in_data_series
+from syscore.pandas.expanding_rank import fast_quantile_of_points_in_data_series
 from syscore.pandas.pdutils import from_scalar_values_to_ts
 from private.systems.crypto_2024.forecast_scale_cap import *
 
@@ -12,14 +12,14 @@ class volAttenForecastScaleCap(ForecastScaleCap):
         ten_minute_years_vol = minute_vol.rolling(87660, min_periods=10).mean()
         normalised_vol = minute_vol / ten_minute_years_vol
 
-        normalised_vol_q = quantile_of_points_in_data_series(normalised_vol)
+        normalised_vol_q = fast_quantile_of_points_in_data_series(normalised_vol)
 
         return normalised_vol_q
 
     @diagnostic()
     def get_vol_attenuation(self, instrument_code):
         normalised_vol_q = self.get_vol_quantile_points(instrument_code)
-        vol_attenuation = normalised_vol_q.apply(multiplier_function)
+        vol_attenuation = vectorised_multiplier_function(normalised_vol_q)
 
         smoothed_vol_attenuation = vol_attenuation #.ewm(span=10).mean()
 
@@ -72,11 +72,21 @@ class volAttenForecastScaleCap(ForecastScaleCap):
         return vol_attenutation_reindex
 
 
-# this is a little slow so suggestions for speeding up are welcome
-
-
 def multiplier_function(vol_quantile):
     if np.isnan(vol_quantile):
         return 1.0
 
     return 2 - 1.5 * vol_quantile
+
+
+def vectorised_multiplier_function(vol_quantile: pd.Series) -> pd.Series:
+    """
+    Same as vol_quantile.apply(multiplier_function)
+
+    >>> vectorised_multiplier_function(pd.Series([np.nan, 0.0, 0.5, 1.0])).tolist()
+    [1.0, 2.0, 1.25, 0.5]
+    """
+    return pd.Series(
+        np.where(np.isnan(vol_quantile.values), 1.0, 2 - 1.5 * vol_quantile.values),
+        index=vol_quantile.index,
+    )
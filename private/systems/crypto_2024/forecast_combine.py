@@ -3,7 +3,10 @@ from copy import copy
 import pandas as pd
 
 from syscore.exceptions import missingData
-from systems.forecast_mapping import map_forecast_value
+from private.systems.crypto_2024.forecast_mapping import (
+    map_forecast_value,
+    estimate_mapping_params,
+)
 from syscore.genutils import str2Bool, list_difference
 from syscore.objects import resolve_function
 from syscore.pandas.pdutils import (
@@ -1320,22 +1323,16 @@ class ForecastCombine(SystemStage):
 
         forecast_cap = self.get_forecast_cap()
         forecast_floor = self.get_forecast_floor()
-        if hasattr(self.parent.config, "forecast_mapping"):
-            if instrument_code in self.parent.config.forecast_mapping:
-                configuration = self.parent.config.forecast_mapping[instrument_code]
-                post_process_func = map_forecast_value
-                kwargs = dict(
-                    threshold=configuration["threshold"],
-                    a_param=configuration["a_param"],
-                    b_param=configuration["b_param"],
-                    capped_value=forecast_cap,
-                )
-                self.log.debug(
-                    "Applying threshold mapping for %s threshold %.2f"
-                    % (instrument_code, configuration["threshold"]),
-                    instrument_code=instrument_code,
-                )
-                return post_process_func, kwargs
+        mapping_parameters = self._get_forecast_mapping_parameters(instrument_code)
+        if mapping_parameters is not None:
+            post_process_func = map_forecast_value
+            kwargs = dict(capped_value=forecast_cap, **mapping_parameters)
+            self.log.debug(
+                "Applying threshold mapping for %s threshold %.2f"
+                % (instrument_code, mapping_parameters["threshold"]),
+                instrument_code=instrument_code,
+            )
+            return post_process_func, kwargs
 
         # just use the default, applying capping
         post_process_func = _cap_combined_forecast
@@ -1347,6 +1344,44 @@ class ForecastCombine(SystemStage):
 
         return post_process_func, kwargs
 
+    @diagnostic()
+    def _get_forecast_mapping_parameters(self, instrument_code):
+        """
+        threshold, a_param and b_param from config forecast_mapping, or None if there
+        is no mapping for this instrument. If only a_param is given, the others are
+        solved from it with estimate_mapping_params, which is only fitted for a
+        forecast cap of 20
+
+        :param instrument_code: instrument code
+        :return: dict or None
+        """
+        forecast_mapping = getattr(self.parent.config, "forecast_mapping", {})
+        if instrument_code not in forecast_mapping:
+            return None
+
+        configuration = forecast_mapping[instrument_code]
+        has_threshold = "threshold" in configuration
+        has_b_param = "b_param" in configuration
+        if has_threshold and has_b_param:
+            return dict(
+                threshold=configuration["threshold"],
+                a_param=configuration["a_param"],
+                b_param=configuration["b_param"],
+            )
+        elif has_threshold or has_b_param:
+            error_msg = (
+                "forecast_mapping for %s needs both threshold and b_param, or only "
+                "a_param to estimate them" % instrument_code
+            )
+            self.log.critical(error_msg, instrument_code=instrument_code)
+            raise Exception(error_msg)
+
+        a_param, b_param, threshold, capped_value = estimate_mapping_params(
+            configuration["a_param"], capped_value=self.get_forecast_cap()
+        )
+
+        return dict(threshold=threshold, a_param=a_param, b_param=b_param)
+
     @input
     def get_forecast_cap(self) -> float:
         """
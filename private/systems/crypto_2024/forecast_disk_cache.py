@@ -0,0 +1,450 @@
+"""
+Raw forecasts saved to disk, so they are only recalculated when the rule or its data
+change
+
+Entries are keyed on the rule function (its name and code, and the source of its module
+and of every module in the same project it uses, so editing a helper kernel changes
+the key), its other_args, the data methods and their arguments, and the instrument.
+With each entry we store a fingerprint of every data input: its length, last timestamp
+and a checksum of its rows. If the inputs are unchanged the saved forecast is returned;
+if the inputs are the saved ones with new bars appended, the rule is run again only
+over the new bars plus a warmup before them, and the new part is appended. The warmup
+has to be long enough for the rule to forget where it started; the overlap with the
+saved forecast is checked, and if it doesn't match the whole forecast is recalculated.
+
+Forecasts are stored as numpy arrays, with their metadata, one file per entry, with the
+least recently used entries removed when the cache is over its size limit.
+
+Switch on with, in the config:
+
+forecast_disk_cache:
+  datapath: /somewhere/forecast_cache
+  max_size_mb: 2048
+  warmup_bars: 20000
+"""
+import hashlib
+import json
+import os
+import sys
+import types
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+from syscore.fileutils import get_resolved_pathname
+
+FORECAST_FILE_SUFFIX = ".npz"
+
+## how many bars where the recalculated and saved forecasts overlap are compared
+OVERLAP_BARS_TO_CHECK = 100
+
+
+@dataclass
+class ConfigForecastDiskCache:
+    datapath: str
+    max_size_mb: float = 2048.0
+    warmup_bars: int = 20000
+    overlap_tolerance: float = 1e-6
+
+
+class forecastDiskCache(object):
+    def __init__(self, config: ConfigForecastDiskCache):
+        self._config = config
+        self._datapath = get_resolved_pathname(config.datapath)
+        Path(self._datapath).mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config_dict(cls, config_dict: dict):
+        return cls(ConfigForecastDiskCache(**config_dict))
+
+    @property
+    def config(self) -> ConfigForecastDiskCache:
+        return self._config
+
+    def get_forecast(
+        self, trading_rule, instrument_code: str, list_of_data_for_call: list
+    ) -> pd.Series:
+        [forecast] = self.get_forecasts(
+            [trading_rule],
+            instrument_code=instrument_code,
+            list_of_data_for_call=list_of_data_for_call,
+            calculate_forecasts=lambda list_of_missing_rules: [
+                trading_rule.call_with_data(list_of_data_for_call)
+            ],
+        )
+
+        return forecast
+
+    def get_forecasts(
+        self,
+        list_of_trading_rules: list,
+        instrument_code: str,
+        list_of_data_for_call: list,
+        calculate_forecasts,
+    ) -> list:
+        """
+        Forecasts for rules which use the same data, eg the variations of a rule
+        family. Each is returned from the cache if it can be; the others are
+        calculated together with calculate_forecasts(list_of_missing_rules), which
+        returns a forecast for each, and saved
+        """
+        list_of_row_hashes = [
+            _row_hashes(data_for_call) for data_for_call in list_of_data_for_call
+        ]
+        fingerprints = [
+            _fingerprint(data_for_call, row_hashes)
+            for data_for_call, row_hashes in zip(
+                list_of_data_for_call, list_of_row_hashes
+            )
+        ]
+        list_of_keys = [
+            key_for_trading_rule(trading_rule, instrument_code=instrument_code)
+            for trading_rule in list_of_trading_rules
+        ]
+
+        list_of_forecasts = [
+            self._saved_forecast(
+                key,
+                trading_rule=trading_rule,
+                list_of_data_for_call=list_of_data_for_call,
+                list_of_row_hashes=list_of_row_hashes,
+                fingerprints=fingerprints,
+            )
+            for key, trading_rule in zip(list_of_keys, list_of_trading_rules)
+        ]
+
+        missing = [
+            rule_number
+            for rule_number, forecast in enumerate(list_of_forecasts)
+            if forecast is None
+        ]
+        if len(missing) == 0:
+            return list_of_forecasts
+
+        calculated_forecasts = calculate_forecasts(
+            [list_of_trading_rules[rule_number] for rule_number in missing]
+        )
+        for rule_number, forecast in zip(missing, calculated_forecasts):
+            forecast = pd.Series(forecast)
+            self._write(
+                list_of_keys[rule_number], forecast=forecast, fingerprints=fingerprints
+            )
+            list_of_forecasts[rule_number] = forecast
+
+        return list_of_forecasts
+
+    def _saved_forecast(
+        self,
+        key: str,
+        trading_rule,
+        list_of_data_for_call: list,
+        list_of_row_hashes: list,
+        fingerprints: list,
+    ):
+        ## the saved forecast, extended if bars have been appended, or None
+        saved = self._read(key)
+        if saved is None:
+            return None
+
+        saved_fingerprints, saved_forecast = saved
+        if saved_fingerprints == fingerprints:
+            self._touch(key)
+            return saved_forecast
+
+        if not _is_extension_of(saved_fingerprints, list_of_row_hashes):
+            return None
+
+        forecast = self._extend_saved_forecast(
+            saved_forecast,
+            trading_rule=trading_rule,
+            list_of_data_for_call=list_of_data_for_call,
+        )
+        if forecast is not None:
+            self._write(key, forecast=forecast, fingerprints=fingerprints)
+
+        return forecast
+
+    def size_in_bytes(self) -> int:
+        return sum([os.path.getsize(path) for path in self._all_files()])
+
+    def _extend_saved_forecast(
+        self,
+        saved_forecast: pd.Series,
+        trading_rule,
+        list_of_data_for_call: list,
+    ):
+        if len(saved_forecast) == 0:
+            return None
+
+        last_saved_date = saved_forecast.index[-1]
+        warmup_data_for_call = [
+            _data_from_warmup_before_date(
+                data_for_call,
+                date=last_saved_date,
+                warmup_bars=self.config.warmup_bars,
+            )
+            for data_for_call in list_of_data_for_call
+        ]
+        recalculated_forecast = pd.Series(
+            trading_rule.call_with_data(warmup_data_for_call)
+        )
+
+        overlap = recalculated_forecast.index.intersection(saved_forecast.index)[
+            -OVERLAP_BARS_TO_CHECK:
+        ]
+        if len(overlap) == 0:
+            return None
+        if not np.allclose(
+            recalculated_forecast[overlap].values,
+            saved_forecast[overlap].values,
+            rtol=0.0,
+            atol=self.config.overlap_tolerance,
+            equal_nan=True,
+        ):
+            return None
+
+        new_forecast = recalculated_forecast[
+            recalculated_forecast.index > last_saved_date
+        ]
+
+        return pd.concat([saved_forecast, new_forecast])
+
+    def _read(self, key: str):
+        ## fingerprints and forecast, or None if there is no readable entry
+        try:
+            with np.load(self._forecast_filename(key)) as saved:
+                metadata = json.loads(str(saved["metadata"]))
+                unit = metadata.get("unit", "ns")
+                index = pd.DatetimeIndex(saved["index"].view("M8[%s]" % unit))
+                values = saved["values"]
+        except (OSError, KeyError, ValueError):
+            return None
+
+        if metadata["tz"] is not None:
+            index = index.tz_localize("utc").tz_convert(metadata["tz"])
+        forecast = pd.Series(values, index=index, name=metadata["name"])
+
+        return metadata["fingerprints"], forecast
+
+    def _write(self, key: str, forecast: pd.Series, fingerprints: list):
+        index = pd.DatetimeIndex(forecast.index)
+        tz = None if index.tz is None else str(index.tz)
+        if tz is not None:
+            index = index.tz_convert("utc").tz_localize(None)
+
+        name = forecast.name if isinstance(forecast.name, str) else None
+        # asi8 is in the index's own unit: parquet data comes back in microseconds
+        metadata = dict(fingerprints=fingerprints, tz=tz, name=name, unit=index.unit)
+
+        # one file, written then renamed, so other processes never see half an entry
+        # or a forecast with the metadata of another
+        temporary_filename = self._forecast_filename(key) + ".%d" % os.getpid()
+        with open(temporary_filename, "wb") as forecast_file:
+            np.savez(
+                forecast_file,
+                metadata=np.array(json.dumps(metadata)),
+                index=index.asi8,
+                values=forecast.values.astype(np.float64),
+            )
+        os.replace(temporary_filename, self._forecast_filename(key))
+
+        self._evict_until_under_size_limit(keep_key=key)
+
+    def _evict_until_under_size_limit(self, keep_key: str):
+        max_size_in_bytes = self.config.max_size_mb * 1024 * 1024
+        forecast_files = [
+            path
+            for path in self._all_files()
+            if path.endswith(FORECAST_FILE_SUFFIX)
+            and path != self._forecast_filename(keep_key)
+        ]
+        forecast_files.sort(key=os.path.getmtime)
+
+        size_in_bytes = self.size_in_bytes()
+        for forecast_filename in forecast_files:
+            if size_in_bytes <= max_size_in_bytes:
+                break
+            if os.path.exists(forecast_filename):
+                size_in_bytes -= os.path.getsize(forecast_filename)
+                os.remove(forecast_filename)
+
+    def _touch(self, key: str):
+        ## modification time of the forecast file is when it was last used
+        os.utime(self._forecast_filename(key))
+
+    def _all_files(self) -> list:
+        return [
+            os.path.join(self._datapath, filename)
+            for filename in os.listdir(self._datapath)
+            if filename.endswith(FORECAST_FILE_SUFFIX)
+        ]
+
+    def _forecast_filename(self, key: str) -> str:
+        return os.path.join(self._datapath, key + FORECAST_FILE_SUFFIX)
+
+
+def key_for_trading_rule(trading_rule, instrument_code: str) -> str:
+    function = trading_rule.function
+    function_code = getattr(function, "__code__", None)
+    if function_code is None:
+        code_description = ""
+    else:
+        code_description = repr(
+            (function_code.co_code, function_code.co_consts, function_code.co_names)
+        )
+
+    module_name = getattr(function, "__module__", "")
+    description = repr(
+        (
+            module_name,
+            getattr(function, "__qualname__", repr(function)),
+            code_description,
+            source_hash_of_module_and_dependencies(module_name),
+            sorted(trading_rule.other_args.items()),
+            list(trading_rule.data),
+            [sorted(data_args.items()) for data_args in trading_rule.data_args],
+            instrument_code,
+        )
+    )
+
+    return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+
+def source_hash_of_module_and_dependencies(module_name: str) -> str:
+    """
+    Hash of the source of a module, and of every module it uses (as a module, or by
+    importing a function or class from it), recursively, which is in the same project:
+    under the directory holding the module's top level package.
+    """
+    module = sys.modules.get(module_name, None)
+    module_filename = getattr(module, "__file__", None)
+    if module_filename is None:
+        return ""
+
+    project_path = os.path.dirname(os.path.abspath(module_filename))
+    for _ in range(module_name.count(".")):
+        project_path = os.path.dirname(project_path)
+
+    dependencies = _project_modules_used_by(module, project_path=project_path)
+    source_hashes = [
+        _source_hash_of_file(filename) for filename in sorted(dependencies.values())
+    ]
+
+    return hashlib.blake2b(repr(source_hashes).encode(), digest_size=16).hexdigest()
+
+
+def _project_modules_used_by(module: types.ModuleType, project_path: str) -> dict:
+    ## module name: filename
+    found = {}
+    modules_to_check = [module]
+    while len(modules_to_check) > 0:
+        module = modules_to_check.pop()
+        filename = _project_filename(module, project_path=project_path)
+        if filename is None or module.__name__ in found:
+            continue
+        found[module.__name__] = filename
+
+        for value in list(vars(module).values()):
+            if isinstance(value, types.ModuleType):
+                modules_to_check.append(value)
+            else:
+                value_module_name = getattr(value, "__module__", None)
+                if isinstance(value_module_name, str):
+                    modules_to_check.append(sys.modules.get(value_module_name, None))
+
+    return found
+
+
+def _project_filename(module, project_path: str):
+    filename = getattr(module, "__file__", None)
+    if filename is None:
+        return None
+
+    filename = os.path.abspath(filename)
+    in_project = filename.startswith(project_path + os.sep)
+    if not in_project or "site-packages" in filename:
+        return None
+
+    return filename
+
+
+## filename: (modification time, size, hash), so unchanged files are only read once
+_source_hashes = {}
+
+
+def _source_hash_of_file(filename: str) -> str:
+    file_stat = os.stat(filename)
+    file_version = (file_stat.st_mtime_ns, file_stat.st_size)
+    saved = _source_hashes.get(filename, None)
+    if saved is not None and saved[:2] == file_version:
+        return saved[2]
+
+    with open(filename, "rb") as source_file:
+        source_hash = hashlib.blake2b(source_file.read(), digest_size=16).hexdigest()
+    _source_hashes[filename] = file_version + (source_hash,)
+
+    return source_hash
+
+
+def _row_hashes(data_for_call) -> np.ndarray:
+    if isinstance(data_for_call, (pd.Series, pd.DataFrame)):
+        return pd.util.hash_pandas_object(data_for_call, index=True).values
+
+    return np.array(
+        [
+            int(
+                hashlib.blake2b(
+                    repr(data_for_call).encode(), digest_size=8
+                ).hexdigest(),
+                16,
+            )
+        ],
+        dtype=np.uint64,
+    )
+
+
+def _checksum(row_hashes: np.ndarray) -> str:
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def _fingerprint(data_for_call, row_hashes: np.ndarray) -> dict:
+    is_pandas = isinstance(data_for_call, (pd.Series, pd.DataFrame))
+    if is_pandas and len(data_for_call) > 0:
+        last_timestamp = str(data_for_call.index[-1])
+    else:
+        last_timestamp = None
+
+    return dict(
+        is_pandas=is_pandas,
+        length=len(row_hashes),
+        last_timestamp=last_timestamp,
+        checksum=_checksum(row_hashes),
+    )
+
+
+def _is_extension_of(saved_fingerprints: list, list_of_row_hashes: list) -> bool:
+    if len(saved_fingerprints) != len(list_of_row_hashes):
+        return False
+
+    for saved_fingerprint, row_hashes in zip(saved_fingerprints, list_of_row_hashes):
+        saved_length = saved_fingerprint["length"]
+        if len(row_hashes) < saved_length:
+            return False
+        if not saved_fingerprint["is_pandas"] and len(row_hashes) != saved_length:
+            return False
+        if _checksum(row_hashes[:saved_length]) != saved_fingerprint["checksum"]:
+            return False
+
+    return True
+
+
+def _data_from_warmup_before_date(data_for_call, date, warmup_bars: int):
+    if not isinstance(data_for_call, (pd.Series, pd.DataFrame)):
+        return data_for_call
+
+    start = max(data_for_call.index.searchsorted(date, side="right") - warmup_bars, 0)
+
+    return data_for_call.iloc[start:]
@@ -1,9 +1,10 @@
 import numpy as np
+import pandas as pd
 
 from syscore.genutils import sign
 
 
-def estimate_mapping_params(a_param):
+def estimate_mapping_params(a_param, capped_value=20):
     """
     The process of non-linear mapping is designed to ensure that we can still trade with small account sizes
 
@@ -20,10 +21,11 @@ def estimate_mapping_params(a_param):
 
     We set a such that at the capped value we have sufficient contracts
 
+    :param capped_value: the forecast cap the mapping will be used with
     :return: tuple
     """
 
-    capped_value = 20  # fitted function doesn't work otherwise
+    assert capped_value == 20  # fitted function doesn't work otherwise
     assert a_param > 1.2  # fitted function doesn't work otherwise
     assert a_param <= 1.7
 
@@ -89,6 +91,47 @@ def map_forecast_value(x, threshold=0.0, capped_value=20, a_param=1.0, b_param=1
     :return: mapped x
     """
 
-    return x.apply(
-        map_forecast_value_scalar, args=(threshold, capped_value, a_param, b_param)
+    mapped_x = map_forecast_value_array(
+        x.values,
+        threshold=threshold,
+        capped_value=capped_value,
+        a_param=a_param,
+        b_param=b_param,
     )
+
+    return pd.Series(mapped_x, index=x.index, name=x.name)
+
+
+def map_forecast_value_array(
+    x: np.ndarray, threshold=0.0, capped_value=20, a_param=1.0, b_param=1.0
+) -> np.ndarray:
+    """
+    As map_forecast_value_scalar, for a whole array at once; the conditions are tested
+    in the same order, so gives exactly the same values
+
+    >>> x = np.array([np.nan, 0.5, -1.0, 5.0, -20.0, 30.0])
+    >>> map_forecast_value_array(x, threshold=1.0, a_param=1.5, b_param=2.0).tolist()
+    [nan, 0.0, 0.0, 8.0, -38.0, 30.0]
+    """
+    x = np.asarray(x, dtype=np.float64)
+    abs_x = np.abs(x)
+    with np.errstate(invalid="ignore"):
+        mapped_x = np.select(
+            [
+                np.isnan(x),
+                abs_x < threshold,
+                (x >= -capped_value) & (x <= -threshold),
+                (x >= threshold) & (x <= capped_value),
+                abs_x > capped_value,
+            ],
+            [
+                x,
+                0.0,
+                b_param * (x + threshold),
+                b_param * (x - threshold),
+                np.sign(x) * capped_value * a_param,
+            ],
+            default=np.nan,
+        )
+
+    return mapped_x
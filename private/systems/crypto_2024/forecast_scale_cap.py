@@ -4,6 +4,7 @@ import numpy as np
 import pandas as pd
 
 from sysdata.config.configdata import Config
+from sysdata.config.defaults import get_system_defaults_dict
 
 from systems.basesystem import ALL_KEYNAME
 from systems.stage import SystemStage
@@ -261,6 +262,17 @@ class ForecastScaleCap(SystemStage):
         # we turn func which could be a string into a function, and then
         # call it with the other ags
 
+        # if there is a batched_func, it does the same for all rule variations at
+        # once, and we use that
+        if self._use_batched_forecast_scalar_function(forecast_scalar_config):
+            scaling_factors = self._get_forecast_scalars_estimated_for_all_rules(
+                instrument_code=instrument_code,
+                forecast_scalar_config=forecast_scalar_config,
+            )
+            if rule_variation_name in scaling_factors:
+                return scaling_factors[rule_variation_name]
+        forecast_scalar_config.pop("batched_func", None)
+
         cs_forecasts = self._get_cross_sectional_forecasts_for_instrument(
             instrument_code, rule_variation_name
         )
@@ -280,6 +292,92 @@ class ForecastScaleCap(SystemStage):
 
         return scaling_factor
 
+    def _use_batched_forecast_scalar_function(
+        self, forecast_scalar_config: dict
+    ) -> bool:
+        ## the default batched_func does the same as the default func, so is only used
+        ## with it; a config which changes func, and not batched_func, inherits the
+        ## default batched_func, which would otherwise silently replace func
+        batched_func = forecast_scalar_config.get("batched_func", None)
+        if batched_func is None:
+            return False
+
+        default_func, default_batched_func = self._default_forecast_scalar_functions()
+        if default_batched_func is None:
+            return True
+
+        func_is_default = _same_function(forecast_scalar_config["func"], default_func)
+        batched_func_is_default = _same_function(batched_func, default_batched_func)
+
+        return func_is_default or not batched_func_is_default
+
+    @diagnostic()
+    def _default_forecast_scalar_functions(self) -> tuple:
+        default_config = get_system_defaults_dict()["forecast_scalar_estimate"]
+
+        return default_config["func"], default_config.get("batched_func", None)
+
+    # protected in cache as slow to estimate
+    @diagnostic(protected=True)
+    def _get_forecast_scalars_estimated_for_all_rules(
+        self, instrument_code: str, forecast_scalar_config: dict
+    ) -> dict:
+        """
+        Scalars for every rule variation used with instrument_code (or any instrument,
+        if ALL_KEYNAME), estimated together; shared by all the rule variations
+
+        :returns: dict of rule variation name -> scalars
+        """
+        forecast_scalar_config = copy(forecast_scalar_config)
+        forecast_scalar_config.pop("func")
+        batched_scalar_function = resolve_function(
+            forecast_scalar_config.pop("batched_func")
+        )
+
+        list_of_rules = self._list_of_rules_for_scalar_estimation(instrument_code)
+        dict_of_cs_forecasts = dict(
+            [
+                (
+                    rule_variation_name,
+                    self._get_cross_sectional_forecasts_for_instrument(
+                        instrument_code, rule_variation_name
+                    ),
+                )
+                for rule_variation_name in list_of_rules
+            ]
+        )
+
+        # an example is
+        # sysquant.estimators.batched_forecast_scalar.batched_forecast_scalars
+        scaling_factors = batched_scalar_function(
+            dict_of_cs_forecasts,
+            target_abs_forecast=self.target_abs_forecast(),
+            **forecast_scalar_config,
+        )
+
+        return scaling_factors
+
+    @diagnostic()
+    def _list_of_rules_for_scalar_estimation(self, instrument_code: str) -> list:
+        if instrument_code == ALL_KEYNAME:
+            instrument_list = self.parent.get_instrument_list()
+        else:
+            instrument_list = [instrument_code]
+
+        list_of_rules = []
+        for instrument_code_in_list in instrument_list:
+            for rule_variation_name in self._get_trading_rule_list(
+                instrument_code_in_list
+            ):
+                if rule_variation_name not in list_of_rules:
+                    list_of_rules.append(rule_variation_name)
+
+        if len(list_of_rules) == 0:
+            ## no combForecast, so all the rules
+            list_of_rules = list(self.rules_stage.trading_rules().keys())
+
+        return list_of_rules
+
     @dont_cache
     def target_abs_forecast(self) -> float:
         return self.config.average_absolute_forecast
@@ -517,6 +615,12 @@ def _get_instrument_code_depending_on_pooling_status(
     return instrument_code_to_pass
 
 
+def _same_function(func_or_func_name, other_func_or_func_name) -> bool:
+    return resolve_function(func_or_func_name) is resolve_function(
+        other_func_or_func_name
+    )
+
+
 if __name__ == "__main__":
     import doctest
 
@@ -3,8 +3,12 @@ import pandas as pd
 from systems.stage import SystemStage
 from syscore.constants import arg_not_supplied
 
-from systems.system_cache import output, dont_cache
-from private.systems.crypto_2024.trading_rules import TradingRule
+from systems.system_cache import diagnostic, output, dont_cache
+from private.systems.crypto_2024.trading_rules import (
+    TradingRule,
+    group_trading_rules_into_families,
+)
+from private.systems.crypto_2024.forecast_disk_cache import forecastDiskCache
 
 
 class Rules(SystemStage):
@@ -55,6 +59,7 @@ class Rules(SystemStage):
 
         # We won't have trading rules we can use until we've parsed them
         self._trading_rules = None
+        self._rule_families = None
 
         # ... store the ones we've been passed for now
         self._passed_trading_rules = trading_rules
@@ -98,11 +103,111 @@ class Rules(SystemStage):
         trading_rule_dict = self.trading_rules()
         trading_rule = trading_rule_dict[rule_variation_name]
 
-        result = trading_rule.call(system, instrument_code)
+        rule_chunk_size = self.rule_chunk_size()
+        forecast_disk_cache = self.forecast_disk_cache()
+        family_name = self._rule_family_name_for_variation(rule_variation_name)
+
+        if (
+            rule_chunk_size is not arg_not_supplied
+            and trading_rule.has_chunked_function
+        ):
+            # one variation at a time, and not through the disk cache
+            result = trading_rule.call_in_chunks(
+                system, instrument_code, chunk_size=rule_chunk_size
+            )
+        elif family_name is None:
+            result = trading_rule.call(
+                system,
+                instrument_code,
+                forecast_disk_cache=forecast_disk_cache,
+            )
+        else:
+            family_forecasts = self._get_raw_forecasts_for_rule_family(
+                instrument_code, family_name
+            )
+            result = family_forecasts[rule_variation_name]
+
         result = pd.Series(result)
 
         return result
 
+    @diagnostic(not_pickable=True)
+    def _get_raw_forecasts_for_rule_family(
+        self, instrument_code: str, family_name: str
+    ) -> dict:
+        ## all the variations in a family from one call, as a dict of rule variation
+        ## name -> forecast; get_raw_forecast caches each of them
+        self.log.debug(
+            "Calculating raw forecasts for rule family %s for %s"
+            % (family_name, instrument_code),
+            instrument_code=instrument_code,
+        )
+
+        trading_rule_dict = self.trading_rules()
+        list_of_rule_variations = self.rule_families()[family_name]
+        family_argument = trading_rule_dict[family_name].function.family_argument
+        list_of_family_values = [
+            trading_rule_dict[rule_variation_name].other_args[family_argument]
+            for rule_variation_name in list_of_rule_variations
+        ]
+
+        list_of_forecasts = trading_rule_dict[family_name].call_for_family(
+            self.parent,
+            instrument_code,
+            list_of_family_values,
+            forecast_disk_cache=self.forecast_disk_cache(),
+        )
+
+        return dict(zip(list_of_rule_variations, list_of_forecasts))
+
+    @dont_cache
+    def rule_families(self) -> dict:
+        """
+        Rule variations that are evaluated together, as a dict of family name ->
+        list of rule variation names. See group_trading_rules_into_families
+        """
+        rule_families = self._rule_families
+        if rule_families is None:
+            rule_families = group_trading_rules_into_families(self.trading_rules())
+            self._rule_families = rule_families
+
+        return rule_families
+
+    @dont_cache
+    def _rule_family_name_for_variation(self, rule_variation_name: str):
+        for family_name, list_of_rule_variations in self.rule_families().items():
+            if rule_variation_name in list_of_rule_variations:
+                return family_name
+
+        return None
+
+    @dont_cache
+    def rule_chunk_size(self):
+        """
+        With rule_chunk_size in the config, rules that have a chunked version (eg
+        mr_wings_in_chunks) are run over that many bars at a time, so that their
+        intermediate series for a long history aren't all in memory at once
+        """
+        return self.parent.config.get_element_or_default(
+            "rule_chunk_size", arg_not_supplied
+        )
+
+    @dont_cache
+    def forecast_disk_cache(self):
+        ## only if there is forecast_disk_cache in the config
+        forecast_disk_cache = getattr(self, "_forecast_disk_cache", None)
+        if forecast_disk_cache is None:
+            cache_config = self.parent.config.get_element_or_default(
+                "forecast_disk_cache", arg_not_supplied
+            )
+            if cache_config is arg_not_supplied:
+                forecast_disk_cache = arg_not_supplied
+            else:
+                forecast_disk_cache = forecastDiskCache.from_config_dict(cache_config)
+            self._forecast_disk_cache = forecast_disk_cache
+
+        return forecast_disk_cache
+
     @dont_cache
     def trading_rules(self):
         """
@@ -0,0 +1,229 @@
+"""
+Refresh a system with new bars, without recalculating the whole history
+
+A full run of the system is saved with save_system_for_incremental_refresh. On the
+next run the subsystem positions, and everything before them (raw data, forecasts,
+scaling and combination), are calculated only from a warmup before the end of the
+saved run, and each result is spliced onto the saved one. The new system holds the
+spliced results in its cache, so the portfolio and accounts stages use them as if the
+whole history had been calculated.
+
+A result is only spliced if, just before the splice, the recalculated values match the
+saved ones; otherwise it is left out, and calculated over the whole history when it is
+needed. So results which depend on the whole history (eg estimated forecast scalars, or
+vol attenuation) are recalculated in full, along with everything which uses them, and
+the warmup has to be long enough for the rest to forget where they started: at least
+the longest lookback of any indicator.
+
+With the crypto configs, which estimate pooled forecast scalars and use a vol with a
+slow component, that leaves little to splice: raw data and the raw forecasts of rules
+which don't use the vol. Scaled and combined forecasts and positions are recalculated
+in full. The refresh logs which results were spliced (see splice_summary); it saves
+most with fixed forecast scalars.
+"""
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+from systems.cache_store import (
+    save_cache_to_directory,
+    load_cache_from_directory,
+    is_cache_directory,
+)
+from systems.system_cache import cacheElement
+
+DEFAULT_WARMUP = pd.Timedelta("14D")
+SPLICE_TOLERANCE = 1e-8
+
+## how many bars before the splice are compared
+OVERLAP_BARS_TO_CHECK = 100
+
+SUBSYSTEM_POSITION_ITEMNAME = "get_subsystem_position"
+
+
+def refresh_system_incrementally(
+    system_function,
+    previous_cache_filename: str,
+    warmup: pd.Timedelta = DEFAULT_WARMUP,
+    tolerance: float = SPLICE_TOLERANCE,
+    **system_function_kwargs,
+):
+    """
+    system_function(**system_function_kwargs) has to build the same system as the one
+    saved, with data which now has new bars appended
+    """
+    previous_cache_items = previous_cache_items_from_file(
+        system_function, previous_cache_filename, **system_function_kwargs
+    )
+
+    return refresh_system_incrementally_given_previous_cache(
+        system_function,
+        previous_cache_items=previous_cache_items,
+        warmup=warmup,
+        tolerance=tolerance,
+        **system_function_kwargs,
+    )
+
+
+def refresh_system_incrementally_given_previous_cache(
+    system_function,
+    previous_cache_items: dict,
+    warmup: pd.Timedelta = DEFAULT_WARMUP,
+    tolerance: float = SPLICE_TOLERANCE,
+    **system_function_kwargs,
+):
+    last_previous_date = last_date_of_subsystem_positions(previous_cache_items)
+
+    tail_system = system_function(**system_function_kwargs)
+    tail_system.config.start_date = last_previous_date - warmup
+    for instrument_code in tail_system.get_instrument_list():
+        tail_system.positionSize.get_subsystem_position(instrument_code)
+
+    spliced_cache_items = splice_cache_items(
+        previous_cache_items, tail_cache_items=tail_system.cache, tolerance=tolerance
+    )
+
+    system = system_function(**system_function_kwargs)
+    for cache_ref, cache_element in spliced_cache_items.items():
+        system.cache[cache_ref] = cache_element
+
+    system.log.debug(
+        "Spliced %d of %d cached results onto run ending %s; others will be recalculated"
+        % (len(spliced_cache_items), len(tail_system.cache), str(last_previous_date))
+    )
+    system.log.debug(
+        "Results spliced and recalculated:\n%s"
+        % str(splice_summary(spliced_cache_items, tail_cache_items=tail_system.cache))
+    )
+
+    return system
+
+
+def previous_cache_items_from_file(
+    system_function, previous_cache_filename: str, **system_function_kwargs
+) -> dict:
+    previous_system = system_function(**system_function_kwargs)
+    if is_cache_directory(previous_cache_filename):
+        ## only the results which are spliced get read from file
+        load_cache_from_directory(previous_system.cache, previous_cache_filename)
+    else:
+        previous_system.cache.unpickle(previous_cache_filename)
+
+    return dict(previous_system.cache.items())
+
+
+def last_date_of_subsystem_positions(cache_items: dict) -> pd.Timestamp:
+    ## the earliest, so no instrument has a gap
+    last_dates = [
+        cache_element.value.index[-1]
+        for cache_ref, cache_element in cache_items.items()
+        if cache_ref.itemname == SUBSYSTEM_POSITION_ITEMNAME
+        and len(cache_element.value) > 0
+    ]
+    if len(last_dates) == 0:
+        raise Exception("No subsystem positions in previous cache, can't refresh")
+
+    return min(last_dates)
+
+
+def splice_cache_items(
+    previous_cache_items: dict,
+    tail_cache_items: dict,
+    tolerance: float = SPLICE_TOLERANCE,
+) -> dict:
+    spliced_cache_items = {}
+    for cache_ref, tail_cache_element in tail_cache_items.items():
+        previous_cache_element = previous_cache_items.get(cache_ref, None)
+        if previous_cache_element is None:
+            continue
+
+        spliced_value = splice_time_series(
+            previous_cache_element.value,
+            tail_cache_element.value,
+            tolerance=tolerance,
+        )
+        if spliced_value is arg_not_supplied:
+            continue
+
+        spliced_cache_items[cache_ref] = cacheElement(
+            spliced_value,
+            protected=tail_cache_element.protected,
+            not_pickable=tail_cache_element.not_pickable,
+        )
+
+    return spliced_cache_items
+
+
+def splice_summary(spliced_cache_items: dict, tail_cache_items: dict) -> pd.DataFrame:
+    """
+    For each stage and item name, how many results (eg one per instrument) were
+    spliced, and how many will be recalculated over the whole history
+    """
+    counts = {}
+    for cache_ref in tail_cache_items.keys():
+        key = (cache_ref.stage_name, cache_ref.itemname)
+        spliced, recalculated = counts.get(key, (0, 0))
+        if cache_ref in spliced_cache_items:
+            spliced += 1
+        else:
+            recalculated += 1
+        counts[key] = (spliced, recalculated)
+
+    summary = pd.DataFrame.from_dict(
+        counts, orient="index", columns=["spliced", "recalculated"]
+    )
+    if len(summary) > 0:
+        summary.index = pd.MultiIndex.from_tuples(
+            summary.index, names=["stage_name", "itemname"]
+        )
+
+    return summary.sort_index()
+
+
+def splice_time_series(previous, tail, tolerance: float = SPLICE_TOLERANCE):
+    """
+    previous up to its last bar, then tail from there on, as long as they match on the
+    bars before; the last bar is taken from tail as it may have been incomplete.
+    Returns arg_not_supplied if they can't be spliced.
+    """
+    if not _is_time_series(previous) or not _is_time_series(tail):
+        return arg_not_supplied
+    if type(previous) is not type(tail) or len(previous) == 0:
+        return arg_not_supplied
+    if isinstance(previous, pd.DataFrame) and not previous.columns.equals(tail.columns):
+        return arg_not_supplied
+
+    splice_date = previous.index[-1]
+    previous_before_splice = previous[previous.index < splice_date]
+    overlap = previous_before_splice.index.intersection(tail.index)[
+        -OVERLAP_BARS_TO_CHECK:
+    ]
+    if len(overlap) == 0:
+        return arg_not_supplied
+
+    try:
+        matches = np.allclose(
+            previous_before_splice.loc[overlap].values.astype(float),
+            tail.loc[overlap].values.astype(float),
+            rtol=tolerance,
+            atol=tolerance,
+            equal_nan=True,
+        )
+    except (TypeError, ValueError):
+        # not numbers
+        return arg_not_supplied
+    if not matches:
+        return arg_not_supplied
+
+    return pd.concat([previous_before_splice, tail[tail.index >= splice_date]])
+
+
+def _is_time_series(value) -> bool:
+    return isinstance(value, (pd.Series, pd.DataFrame)) and isinstance(
+        value.index, pd.DatetimeIndex
+    )
+
+
+def save_system_for_incremental_refresh(system, cache_filename: str):
+    ## only the calculated values are saved, so this needs the same system to load
+    save_cache_to_directory(system.cache, cache_filename)
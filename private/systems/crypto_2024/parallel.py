@@ -0,0 +1,244 @@
+"""
+Calculate subsystem positions for several instruments at once, in separate processes
+
+Everything up to and including positionSize.get_subsystem_position only needs data for
+one instrument, apart from pooled forecast scalars, so instruments can be shared out
+across worker processes. Each worker builds its own copy of the system, and sends back
+the cache entries it added; these are merged into the cache of the parent system, so
+stages that need every instrument (Portfolios, IDM, correlations, accounts) then run in
+the parent on the cached results.
+
+Pooled forecast scalars are estimated from the raw forecasts of every instrument. Left
+to the workers, the first subsystem position in each worker would calculate all of them,
+and send them all back. Instead, if the scalars are estimated and pooled, the raw
+forecasts are first calculated in the workers one instrument at a time, the scalars are
+estimated once in the parent, and then each worker is given the scalars, and the cached
+results of its instrument, to calculate the subsystem positions.
+
+The system has to be rebuilt in each worker from a picklable function and arguments,
+eg crypto_system in run_system.py, and must match the parent system.
+"""
+import time
+from multiprocessing import Pool
+
+from syscore.constants import arg_not_supplied
+from syscore.genutils import str2Bool
+from systems.basesystem import ALL_KEYNAME
+
+## Each worker process builds one system, and reuses it for all its instruments
+_worker_system = None
+
+## Cached by forecastScaleCap with ALL_KEYNAME when scalars are pooled; these are
+## all the workers need, rather than the cross sectional forecasts they come from
+POOLED_FORECAST_SCALAR_ITEMNAMES = (
+    "_get_forecast_scalars_estimated_for_all_rules",
+    "_get_forecast_scalar_estimated_from_instrument_code",
+)
+
+
+def calculate_subsystem_positions_in_parallel(
+    system,
+    system_function,
+    n_threads: int,
+    instrument_list: list = arg_not_supplied,
+    **system_function_kwargs,
+):
+    if instrument_list is arg_not_supplied:
+        instrument_list = system.get_instrument_list()
+
+    if forecast_scalars_are_pooled(system):
+        _calculate_in_pool(
+            system,
+            system_function,
+            n_threads=n_threads,
+            calculation=_new_cache_items_after_raw_forecasts,
+            instrument_list=instrument_list,
+            system_function_kwargs=system_function_kwargs,
+        )
+        shared_cache_items = estimate_pooled_forecast_scalars(system, instrument_list)
+    else:
+        shared_cache_items = {}
+
+    _calculate_in_pool(
+        system,
+        system_function,
+        n_threads=n_threads,
+        calculation=_new_cache_items_after_subsystem_position,
+        instrument_list=instrument_list,
+        system_function_kwargs=system_function_kwargs,
+        shared_cache_items=shared_cache_items,
+    )
+
+    return system
+
+
+def forecast_scalars_are_pooled(system) -> bool:
+    config = system.config
+    if not str2Bool(config.use_forecast_scale_estimates):
+        return False
+
+    return str2Bool(config.forecast_scalar_estimate["pool_instruments"])
+
+
+def estimate_pooled_forecast_scalars(system, instrument_list: list) -> dict:
+    """
+    Estimates the pooled forecast scalars in system, from its cached raw forecasts
+
+    :returns: the new cache entries which hold the pooled estimates
+    """
+    existing_cache_refs = set(system.cache.keys())
+
+    ## the estimate is shared, so one instrument for each rule is enough
+    rules_estimated = []
+    for instrument_code in instrument_list:
+        for rule_variation_name in system.combForecast.get_trading_rule_list(
+            instrument_code
+        ):
+            if rule_variation_name in rules_estimated:
+                continue
+            system.forecastScaleCap.get_forecast_scalar(
+                instrument_code, rule_variation_name
+            )
+            rules_estimated.append(rule_variation_name)
+
+    return {
+        cache_ref: cache_element
+        for cache_ref, cache_element in system.cache.items()
+        if cache_ref not in existing_cache_refs
+        and cache_ref.instrument_code == ALL_KEYNAME
+        and cache_ref.itemname in POOLED_FORECAST_SCALAR_ITEMNAMES
+    }
+
+
+def merge_cache_items_into_system(system, cache_items: dict):
+    ## a result used by several instruments can be calculated by more than one worker;
+    ## they'll be the same, so we keep whichever arrived first, and never overwrite what
+    ## the parent has
+    for cache_ref, cache_element in cache_items.items():
+        if cache_ref not in system.cache:
+            system.cache[cache_ref] = cache_element
+
+
+def benchmark_parallel_subsystem_positions(
+    system_function,
+    list_of_n_threads: tuple = (1, 2, 4, 8),
+    instrument_list: list = arg_not_supplied,
+    **system_function_kwargs,
+) -> dict:
+    """
+    Returns seconds taken to get every subsystem position with each number of workers,
+    and in the parent process without a pool (as n_threads=0)
+    """
+    system = system_function(**system_function_kwargs)
+    if instrument_list is arg_not_supplied:
+        instrument_list = system.get_instrument_list()
+
+    start = time.perf_counter()
+    for instrument_code in instrument_list:
+        system.positionSize.get_subsystem_position(instrument_code)
+    seconds_taken = {0: time.perf_counter() - start}
+
+    for n_threads in list_of_n_threads:
+        system = system_function(**system_function_kwargs)
+        start = time.perf_counter()
+        calculate_subsystem_positions_in_parallel(
+            system,
+            system_function,
+            n_threads=n_threads,
+            instrument_list=instrument_list,
+            **system_function_kwargs,
+        )
+        seconds_taken[n_threads] = time.perf_counter() - start
+
+    return seconds_taken
+
+
+def _calculate_in_pool(
+    system,
+    system_function,
+    n_threads: int,
+    calculation,
+    instrument_list: list,
+    system_function_kwargs: dict,
+    shared_cache_items: dict = arg_not_supplied,
+):
+    if shared_cache_items is arg_not_supplied:
+        shared_cache_items = {}
+
+    ## each worker gets the results already in the parent for its instrument
+    list_of_instruments_and_cache_items = [
+        (instrument_code, _cache_items_for_instrument(system, instrument_code))
+        for instrument_code in instrument_list
+    ]
+
+    with Pool(
+        n_threads,
+        initializer=_build_worker_system,
+        initargs=(system_function, system_function_kwargs, shared_cache_items),
+    ) as pool:
+        for new_cache_items in pool.imap_unordered(
+            calculation, list_of_instruments_and_cache_items
+        ):
+            merge_cache_items_into_system(system, new_cache_items)
+
+
+def _cache_items_for_instrument(system, instrument_code: str) -> dict:
+    return {
+        cache_ref: cache_element
+        for cache_ref, cache_element in system.cache.items()
+        if cache_ref.instrument_code == instrument_code
+        and not cache_element.not_pickable
+    }
+
+
+def _build_worker_system(
+    system_function, system_function_kwargs: dict, shared_cache_items: dict
+):
+    global _worker_system
+    _worker_system = system_function(**system_function_kwargs)
+    merge_cache_items_into_system(_worker_system, shared_cache_items)
+
+
+def _new_cache_items_after_raw_forecasts(instrument_and_cache_items: tuple) -> dict:
+    instrument_code, cache_items = instrument_and_cache_items
+
+    def _calculate():
+        for rule_variation_name in _worker_system.combForecast.get_trading_rule_list(
+            instrument_code
+        ):
+            _worker_system.rules.get_raw_forecast(instrument_code, rule_variation_name)
+
+    return _new_cache_items_after(_calculate, cache_items)
+
+
+def _new_cache_items_after_subsystem_position(
+    instrument_and_cache_items: tuple,
+) -> dict:
+    instrument_code, cache_items = instrument_and_cache_items
+
+    def _calculate():
+        _worker_system.positionSize.get_subsystem_position(instrument_code)
+
+    return _new_cache_items_after(_calculate, cache_items)
+
+
+def _new_cache_items_after(calculation, cache_items: dict) -> dict:
+    cache = _worker_system.cache
+    merge_cache_items_into_system(_worker_system, cache_items)
+    existing_cache_refs = set(cache.keys())
+
+    calculation()
+
+    return {
+        cache_ref: cache_element
+        for cache_ref, cache_element in cache.items()
+        if cache_ref not in existing_cache_refs and not cache_element.not_pickable
+    }
+
+
+if __name__ == "__main__":
+    from private.systems.crypto_2024.run_system import crypto_system
+
+    seconds_taken = benchmark_parallel_subsystem_positions(crypto_system)
+    for n_threads, seconds in seconds_taken.items():
+        print("%d workers: %.1f seconds" % (n_threads, seconds))
@@ -10,6 +10,7 @@ from syscore.pandas.pdutils import (
     from_scalar_values_to_ts,
 )
 from syscore.pandas.find_data import get_row_of_df_aligned_to_weights_as_dict
+from syscore.pandas.step_function import stepFunctionSeries, dictOfStepFunctionSeries
 from syscore.pandas.strategy_functions import (
     weights_sum_to_one,
     fix_weights_vs_position_or_forecast,
@@ -30,10 +31,8 @@ from sysquant.estimators.covariance import (
     covariance_from_stdev_and_correlation,
 )
 from sysquant.estimators.turnover import turnoverDataAcrossSubsystems
-from sysquant.portfolio_risk import (
-    calc_portfolio_risk_series,
-    calc_sum_annualised_risk_given_portfolio_weights,
-)
+from sysquant.portfolio_risk import calc_sum_annualised_risk_given_portfolio_weights
+from sysquant.batched_portfolio_risk import calc_portfolio_risk_series_batched
 from sysquant.optimisation.pre_processing import returnsPreProcessor
 from sysquant.optimisation.weights import portfolioWeights, seriesOfPortfolioWeights
 
@@ -51,7 +50,11 @@ from systems.stage import SystemStage
 from systems.system_cache import input, dont_cache, diagnostic, output
 from private.systems.crypto_2024.positionsizing import PositionSizing
 from private.systems.crypto_2024.accounts.curves.account_curve_group import accountCurveGroup
-from private.systems.crypto_2024.risk_overlay import get_risk_multiplier
+from private.systems.crypto_2024.risk_overlay import (
+    get_risk_multiplier,
+    positions_of_risk_overlay_schedule,
+    risk_multiplier_drift,
+)
 from systems.basesystem import get_instrument_weights_from_config
 
 """
@@ -174,7 +177,6 @@ class Portfolios(SystemStage):
         return buffer
 
     ## notional position
-    @output()
     def get_notional_position(self, instrument_code: str) -> pd.Series:
         """
         Gets the position, accounts for instrument weights and diversification multiplier
@@ -201,6 +203,13 @@ class Portfolios(SystemStage):
 
         """
 
+        ## positions rarely change from bar to bar, so are only cached as the changes
+        return self.get_notional_position_as_step_function(instrument_code).as_series()
+
+    @output()
+    def get_notional_position_as_step_function(
+        self, instrument_code: str
+    ) -> stepFunctionSeries:
         self.log.debug(
             "Calculating notional position for %s" % instrument_code,
             instrument_code=instrument_code,
@@ -224,15 +233,20 @@ class Portfolios(SystemStage):
                 notional_position_without_risk_scalar * risk_scalar_reindex.ffill()
             )
 
-        return notional_position
+        return stepFunctionSeries.from_series(notional_position)
 
     ## notional position
-    @diagnostic()
     def get_notional_position_before_risk_scaling(
         self, instrument_code: str
     ) -> pd.Series:
-        """ """
+        return self.get_notional_position_before_risk_scaling_as_step_function(
+            instrument_code
+        ).as_series()
 
+    @diagnostic()
+    def get_notional_position_before_risk_scaling_as_step_function(
+        self, instrument_code: str
+    ) -> stepFunctionSeries:
         # same frequency as subsystem / forecasts
         notional_position_without_idm = self.get_notional_position_without_idm(
             instrument_code
@@ -245,9 +259,9 @@ class Portfolios(SystemStage):
         notional_position = notional_position_without_idm * idm_reindexed
 
         # same frequency as subsystem / forecasts
-        return notional_position
+        return stepFunctionSeries.from_series(notional_position)
 
-    @diagnostic()
+    ## not cached, as only used for the position above
     def get_notional_position_without_idm(self, instrument_code: str) -> pd.Series:
         instr_weights = self.get_instrument_weights()
 
@@ -951,14 +965,58 @@ class Portfolios(SystemStage):
     ## RISK
     @diagnostic()
     def get_risk_scalar(self) -> pd.Series:
-        risk_overlay_config = self.config.get_element("risk_overlay")
+        schedule = self.get_risk_overlay_schedule()
+        if len(schedule) == len(self.common_index()):
+            return self.get_per_bar_risk_scalar()
+
+        return self.get_risk_scalar_for_schedule(schedule)
 
+    @diagnostic()
+    def get_per_bar_risk_scalar(self) -> pd.Series:
         normal_risk = self.get_portfolio_risk_for_original_positions()
         shocked_vol_risk = (
             self.get_portfolio_risk_for_original_positions_with_shocked_vol()
         )
         sum_abs_risk = self.get_sum_annualised_risk_for_original_positions()
         leverage = self.get_leverage_for_original_position()
+
+        return self._risk_multiplier_given_risk_measures(
+            normal_risk=normal_risk,
+            shocked_vol_risk=shocked_vol_risk,
+            sum_abs_risk=sum_abs_risk,
+            leverage=leverage,
+        )
+
+    def get_risk_scalar_for_schedule(self, schedule: pd.DatetimeIndex) -> pd.Series:
+        ## risk measures only on the schedule, then carried forward to every bar
+        scheduled_weights = self.get_portfolio_weights_at_dates(schedule)
+
+        normal_risk = self.get_portfolio_risk_given_weights(scheduled_weights)
+        shocked_vol_risk = self.get_portfolio_risk_given_weights(
+            scheduled_weights, use_shocked_vol=True
+        )
+        sum_abs_risk = self.get_sum_annualised_risk_given_portfolio_weights(
+            scheduled_weights
+        )
+        leverage = scheduled_weights.get_sum_leverage()
+
+        scheduled_risk_scalar = self._risk_multiplier_given_risk_measures(
+            normal_risk=normal_risk,
+            shocked_vol_risk=shocked_vol_risk,
+            sum_abs_risk=sum_abs_risk,
+            leverage=leverage,
+        )
+
+        return scheduled_risk_scalar.reindex(self.common_index()).ffill()
+
+    def _risk_multiplier_given_risk_measures(
+        self,
+        normal_risk: pd.Series,
+        shocked_vol_risk: pd.Series,
+        sum_abs_risk: pd.Series,
+        leverage: pd.Series,
+    ) -> pd.Series:
+        risk_overlay_config = self.config.get_element("risk_overlay")
         percentage_vol_target = self.get_percentage_vol_target()
 
         risk_scalar = get_risk_multiplier(
@@ -972,6 +1030,63 @@ class Portfolios(SystemStage):
 
         return risk_scalar
 
+    @diagnostic()
+    def get_risk_overlay_schedule(self) -> pd.DatetimeIndex:
+        risk_overlay_config = self.config.get_element("risk_overlay")
+
+        return self.get_risk_overlay_schedule_given_parameters(
+            every_n_bars=int(risk_overlay_config.get("every_n_bars", 1)),
+            vol_change_trigger=risk_overlay_config.get(
+                "vol_change_trigger", arg_not_supplied
+            ),
+        )
+
+    def get_risk_overlay_schedule_given_parameters(
+        self, every_n_bars: int = 1, vol_change_trigger: float = arg_not_supplied
+    ) -> pd.DatetimeIndex:
+        index = self.common_index()
+        if vol_change_trigger is None:
+            vol_change_trigger = arg_not_supplied
+
+        if vol_change_trigger is not arg_not_supplied:
+            vol = self.get_df_of_perc_vol().reindex(index).ffill().values
+            vol_change_trigger = float(vol_change_trigger)
+        else:
+            vol = arg_not_supplied
+
+        positions = positions_of_risk_overlay_schedule(
+            len(index),
+            every_n_bars=every_n_bars,
+            vol=vol,
+            vol_change_trigger=vol_change_trigger,
+        )
+
+        return index[positions]
+
+    def risk_scalar_drift_for_schedules(
+        self,
+        list_of_every_n_bars: list = (5, 15, 60, 240, 1440),
+        vol_change_trigger: float = arg_not_supplied,
+    ) -> pd.DataFrame:
+        """
+        For picking the risk overlay schedule: how far the risk scalar calculated every
+        n bars, and carried forward, drifts from the one calculated every bar
+        """
+        per_bar_risk_scalar = self.get_per_bar_risk_scalar()
+
+        drift_for_schedules = {}
+        for every_n_bars in list_of_every_n_bars:
+            schedule = self.get_risk_overlay_schedule_given_parameters(
+                every_n_bars=every_n_bars, vol_change_trigger=vol_change_trigger
+            )
+            drift = risk_multiplier_drift(
+                per_bar_risk_scalar, self.get_risk_scalar_for_schedule(schedule)
+            )
+            drift["number_of_calculations"] = len(schedule)
+            drift_for_schedules[every_n_bars] = drift
+
+        return pd.DataFrame(drift_for_schedules).transpose()
+
     @diagnostic()
     def get_leverage_for_original_position(self) -> pd.Series:
         portfolio_weights = self.get_original_portfolio_weight_df()
@@ -1012,7 +1127,7 @@ class Portfolios(SystemStage):
     ) -> pd.Series:
         list_of_correlations = self.get_list_of_instrument_returns_correlations()
         pd_of_stdev = self.get_stdev_df(shocked=use_shocked_vol)
-        risk_series = calc_portfolio_risk_series(
+        risk_series = calc_portfolio_risk_series_batched(
             portfolio_weights=portfolio_weights,
             list_of_correlations=list_of_correlations,
             pd_of_stdev=pd_of_stdev,
@@ -1037,10 +1152,8 @@ class Portfolios(SystemStage):
     def get_position_contracts_for_relevant_date(
         self, relevant_date: datetime.datetime = arg_not_supplied
     ) -> portfolioWeights:
-        position_contracts_as_df = self.get_position_contracts_as_df()
-        position_contracts_at_date = get_row_of_df_aligned_to_weights_as_dict(
-            position_contracts_as_df, relevant_date
-        )
+        position_contracts = self.get_position_contracts_as_step_functions()
+        position_contracts_at_date = position_contracts.row_at(relevant_date)
 
         position_contracts = portfolioWeights(position_contracts_at_date)
 
@@ -1156,19 +1269,41 @@ class Portfolios(SystemStage):
 
     @diagnostic()
     def common_index(self):
-        portfolio_weights = self.get_original_portfolio_weight_df()
-        common_index = portfolio_weights.index
+        position_contracts = self.get_position_contracts_as_step_functions()
+        common_index = position_contracts.common_index()
 
         return common_index
 
     @diagnostic()
     def get_original_portfolio_weight_df(self) -> seriesOfPortfolioWeights:
+        ## shared by the per bar risk measures; a scheduled risk overlay only works
+        ## out weights on its schedule, with get_portfolio_weights_at_dates, so
+        ## neither this nor the per contract values are held for every bar
+        return self.get_portfolio_weights_at_dates(self.common_index())
+
+    def get_portfolio_weights_at_dates(
+        self, index: pd.DatetimeIndex
+    ) -> seriesOfPortfolioWeights:
+        position_contracts = self.get_position_contracts_as_step_functions()
+        positions_as_pd = position_contracts.reindex(index)
+
+        values_as_pd = self.get_per_contract_value_as_proportion_of_capital_at_dates(
+            index
+        )
+
+        return seriesOfPortfolioWeights(
+            positions_as_pd * values_as_pd[positions_as_pd.columns]
+        )
+
+    ## not cached, as the step functions are
+    def get_position_contracts_as_step_functions(self) -> dictOfStepFunctionSeries:
         instrument_list = self.get_instrument_list()
-        weights_as_dict = dict(
+
+        return dictOfStepFunctionSeries(
             [
                 (
                     instrument_code,
-                    self.get_portfolio_weight_series_from_contract_positions(
+                    self.get_notional_position_before_risk_scaling_as_step_function(
                         instrument_code
                     ),
                 )
@@ -1176,31 +1311,29 @@ class Portfolios(SystemStage):
             ]
         )
 
-        weights_as_pd = pd.DataFrame(weights_as_dict)
-        weights_as_pd = weights_as_pd.ffill()
-
-        return seriesOfPortfolioWeights(weights_as_pd)
-
     @diagnostic()
     def get_per_contract_value_as_proportion_of_capital_df(self) -> pd.DataFrame:
+        return self.get_per_contract_value_as_proportion_of_capital_at_dates(
+            self.common_index()
+        )
+
+    def get_per_contract_value_as_proportion_of_capital_at_dates(
+        self, index: pd.DatetimeIndex
+    ) -> pd.DataFrame:
         instrument_list = self.get_instrument_list()
         values_as_dict = dict(
             [
                 (
                     instrument_code,
-                    self.get_per_contract_value_as_proportion_of_capital(
-                        instrument_code
-                    ),
+                    self.get_per_contract_value_as_proportion_of_capital(instrument_code)
+                    .ffill()
+                    .reindex(index, method="ffill"),
                 )
                 for instrument_code in instrument_list
             ]
         )
 
-        values_as_pd = pd.DataFrame(values_as_dict)
-        common_index = self.common_index()
-
-        values_as_pd = values_as_pd.reindex(common_index)
-        values_as_pd = values_as_pd.ffill()
+        values_as_pd = pd.DataFrame(values_as_dict, index=index)
 
         ## slight cheating
         values_as_pd = values_as_pd.bfill()
@@ -1208,24 +1341,9 @@ class Portfolios(SystemStage):
         return values_as_pd
 
     def get_position_contracts_as_df(self) -> pd.DataFrame:
-        instrument_list = self.get_instrument_list()
-        values_as_dict = dict(
-            [
-                (
-                    instrument_code,
-                    self.get_notional_position_before_risk_scaling(instrument_code),
-                )
-                for instrument_code in instrument_list
-            ]
-        )
-
-        values_as_pd = pd.DataFrame(values_as_dict)
-        common_index = self.common_index()
+        position_contracts = self.get_position_contracts_as_step_functions()
 
-        values_as_pd = values_as_pd.reindex(common_index)
-        values_as_pd = values_as_pd.ffill()
-
-        return values_as_pd
+        return position_contracts.reindex(self.common_index())
 
     @diagnostic()
     def get_portfolio_weight_series_from_contract_positions(
@@ -13,24 +13,41 @@ from syscore.dateutils import (
 from syscore.genutils import list_intersection
 from syscore.exceptions import missingData
 from syscore.objects import resolve_function
+from syscore.constants import arg_not_supplied
+from syscore.pandas.bar_pyramid import barPyramid, aggregate_bars
+from sysquant.estimators.incremental_vol import (
+    incrementalVol,
+    incremental_vol_for_vol_function,
+)
 
 
 class cryptoMinuteRawData(SystemStage):
     @output()
-    def get_aggregated_minute_prices(self, instrument_code: str):
-        minuteprice = self.get_minute_prices(instrument_code)
-        agg_minuteprice = minuteprice.resample(self.barsize).agg(
-            {
-                'OPEN': 'first',
-                'HIGH': 'max',
-                'LOW': 'min',
-                'FINAL': 'last',
-                'VOLUME': 'sum',
-            }
-        )
+    def get_aggregated_minute_prices(
+        self, instrument_code: str, barsize: str = arg_not_supplied
+    ):
+        if barsize is arg_not_supplied:
+            barsize = self.barsize
+        try:
+            bar_pyramid = self.get_bar_pyramid(instrument_code)
+        except missingData:
+            ## building a pyramid here would take longer than one resample
+            minuteprice = self.get_minute_prices(instrument_code)
+            return aggregate_bars(minuteprice, barsize)
+
+        agg_minuteprice = bar_pyramid.bars_at_frequency(barsize)
 
         return agg_minuteprice
 
+    @diagnostic(not_pickable=True)
+    def get_bar_pyramid(self, instrument_code: str) -> barPyramid:
+        ## levels stored when prices were ingested, joined to the minutes used here;
+        ## raises missingData if there aren't any
+        stored_levels = self.data_stage.get_bar_pyramid_levels(instrument_code)
+        minuteprice = self.get_minute_prices(instrument_code)
+
+        return barPyramid.from_stored_levels(minuteprice, stored_levels)
+
     @input
     def get_minute_prices(self, instrument_code: str):
         self.log.debug(
@@ -61,24 +78,24 @@ class cryptoMinuteRawData(SystemStage):
 
     @output()
     def get_aggregated_minute_final_prices(self, instrument_code: str):
-        minute_final_prices = self.get_minute_final_prices(instrument_code)
-        agg_minute_final_prices = minute_final_prices.resample(self.barsize).agg(func='last').dropna()
+        agg_minuteprice = self.get_aggregated_minute_prices(instrument_code)
+        agg_minute_final_prices = agg_minuteprice['FINAL'].dropna()
 
         return agg_minute_final_prices
 
     @output()
     def get_aggregated_minute_high_prices(self, instrument_code: str):
-        minute_final_prices = self.get_minute_high_prices(instrument_code)
-        agg_minute_final_prices = minute_final_prices.resample(self.barsize).agg(func='max').dropna()
+        agg_minuteprice = self.get_aggregated_minute_prices(instrument_code)
+        agg_minute_high_prices = agg_minuteprice['HIGH'].dropna()
 
-        return agg_minute_final_prices
+        return agg_minute_high_prices
 
     @output()
     def get_aggregated_minute_low_prices(self, instrument_code: str):
-        minute_final_prices = self.get_minute_low_prices(instrument_code)
-        agg_minute_final_prices = minute_final_prices.resample(self.barsize).agg(func='min').dropna()
+        agg_minuteprice = self.get_aggregated_minute_prices(instrument_code)
+        agg_minute_low_prices = agg_minuteprice['LOW'].dropna()
 
-        return agg_minute_final_prices
+        return agg_minute_low_prices
 
     @property
     def barsize(self):
@@ -227,6 +244,31 @@ class cryptoMinuteRawData(SystemStage):
 
         return vol
 
+    @diagnostic(not_pickable=True)
+    def returns_volatility_state(self, instrument_code: str) -> incrementalVol:
+        """
+        Incremental version of returns_volatility, for live updates
+
+        Only works if volatility_calculation uses mixed_minute_vol_calc or
+        simple_ewvol_calc. The state is run over the full history once; after that new
+        returns can be added with update_with_new_returns_only, and the state saved and
+        loaded between runs.
+
+        The state doesn't include multiplier_to_get_daily_vol, so
+        current_vol * multiplier_to_get_daily_vol == returns_volatility(...).iloc[-1]
+        """
+        volconfig = copy(self.config.volatility_calculation)
+
+        which_returns = volconfig.pop("name_returns_attr_in_rawdata")
+        returns_func = getattr(self, which_returns)
+        price_returns = returns_func(instrument_code)
+
+        volconfig.pop("multiplier_to_get_daily_vol")
+        vol_state = incremental_vol_for_vol_function(volconfig.pop("func"), **volconfig)
+        vol_state.update_with_series(price_returns)
+
+        return vol_state
+
     @output()
     def get_percentage_returns(self, instrument_code: str) -> pd.Series:
         """
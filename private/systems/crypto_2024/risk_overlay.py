@@ -1,5 +1,11 @@
+import numpy as np
 import pandas as pd
 
+from syscore.constants import arg_not_supplied
+
+## how many bars to look through at a time for a vol change
+VOL_CHANGE_SEARCH_BLOCK = 4096
+
 
 def get_risk_multiplier(
     risk_overlay_config: dict,
@@ -84,3 +90,92 @@ def multiplier_given_series_and_limit(
     max_value_as_ratio_to_limit = risk_limit / max_value
 
     return max_value_as_ratio_to_limit
+
+
+def positions_of_risk_overlay_schedule(
+    number_of_bars: int,
+    every_n_bars: int = 1,
+    vol: np.ndarray = arg_not_supplied,
+    vol_change_trigger: float = arg_not_supplied,
+) -> np.ndarray:
+    """
+    Positions of the bars where the risk overlay is calculated; in between the last
+    multiplier is carried forward.
+
+    Every every_n_bars bars, and if vol (bars x instruments) and vol_change_trigger are
+    given, also as soon as any instrument's vol has changed by more than that
+    proportion since the last calculation.
+
+    >>> positions_of_risk_overlay_schedule(10, every_n_bars=4).tolist()
+    [0, 4, 8]
+    >>> vol = np.array([[1.0], [1.05], [1.3], [1.35], [1.0], [1.0]])
+    >>> positions_of_risk_overlay_schedule(6, every_n_bars=10, vol=vol, vol_change_trigger=0.2).tolist()
+    [0, 2, 4]
+    """
+    if every_n_bars < 1:
+        raise Exception(
+            "risk_overlay every_n_bars must be at least 1, not %s" % str(every_n_bars)
+        )
+
+    if vol_change_trigger is arg_not_supplied or vol is arg_not_supplied:
+        return np.arange(0, number_of_bars, every_n_bars)
+
+    positions = []
+    position = 0
+    while position < number_of_bars:
+        positions.append(position)
+        position = _next_position_after_vol_change(
+            vol,
+            position=position,
+            every_n_bars=every_n_bars,
+            vol_change_trigger=vol_change_trigger,
+        )
+
+    return np.array(positions)
+
+
+def _next_position_after_vol_change(
+    vol: np.ndarray, position: int, every_n_bars: int, vol_change_trigger: float
+) -> int:
+    last_vol = vol[position]
+    next_scheduled_position = min(position + every_n_bars, len(vol))
+
+    for block_start in range(
+        position + 1, next_scheduled_position, VOL_CHANGE_SEARCH_BLOCK
+    ):
+        block_end = min(block_start + VOL_CHANGE_SEARCH_BLOCK, next_scheduled_position)
+        block_vol = vol[block_start:block_end]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            large_change = np.abs(block_vol / last_vol - 1.0) > vol_change_trigger
+        # an instrument with vol for the first time is a change too
+        new_vol = np.isnan(last_vol) & ~np.isnan(block_vol)
+        changed = (large_change | new_vol).any(axis=1)
+        if changed.any():
+            return block_start + int(np.argmax(changed))
+
+    return next_scheduled_position
+
+
+def risk_multiplier_drift(
+    per_bar_multiplier: pd.Series, scheduled_multiplier: pd.Series
+) -> pd.Series:
+    """
+    How far a multiplier calculated on a schedule and carried forward is from the one
+    calculated every bar. Positive drift is when the scheduled multiplier allows more
+    risk than the per bar one would.
+    """
+    drift = (
+        scheduled_multiplier.reindex(per_bar_multiplier.index).ffill()
+        - per_bar_multiplier
+    ).dropna()
+    abs_drift = drift.abs()
+
+    return pd.Series(
+        dict(
+            mean_abs_drift=abs_drift.mean(),
+            abs_drift_99_percentile=abs_drift.quantile(0.99),
+            max_abs_drift=abs_drift.max(),
+            max_positive_drift=drift.max(),
+            proportion_of_bars_with_drift=(abs_drift > 0.0).mean(),
+        )
+    )
@@ -1,4 +1,14 @@
 from systems.provided.rules.ewmac import ewmac
+from private.systems.crypto_2024.rules.ewmac import (
+    ewmac_for_speed_pairs,
+    ewmacChunkStep,
+)
+from syscore.constants import arg_not_supplied
+from syscore.pandas.chunked_window import (
+    DEFAULT_CHUNK_SIZE,
+    chunkedShift,
+    run_in_chunks,
+)
 
 
 def accel(price, vol, Lfast=4, invert: bool=False):
@@ -11,3 +21,56 @@ def accel(price, vol, Lfast=4, invert: bool=False):
         accel *= -1
 
     return accel
+
+
+def accel_for_speeds(price, vol, list_of_Lfast: list, invert: bool=False) -> list:
+    ## accel for each Lfast, sharing the EWMAs across speeds
+    list_of_ewmac = ewmac_for_speed_pairs(
+        price, vol, [(Lfast, Lfast * 4) for Lfast in list_of_Lfast]
+    )
+
+    list_of_forecasts = []
+    for Lfast, ewmac_signal in zip(list_of_Lfast, list_of_ewmac):
+        accel = ewmac_signal - ewmac_signal.shift(Lfast)
+
+        if invert:
+            accel *= -1
+
+        list_of_forecasts.append(accel)
+
+    return list_of_forecasts
+
+
+def accel_in_chunks(
+    price,
+    vol,
+    Lfast=4,
+    invert: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    output_filename: str = arg_not_supplied,
+):
+    ## accel over consecutive chunks, see syscore.pandas.chunked_window
+    ewmac_step = ewmacChunkStep(Lfast, Lfast * 4)
+    lagged_ewmac = chunkedShift(Lfast)
+
+    def accel_for_chunk(price_chunk, vol_chunk):
+        ewmac_signal = ewmac_step.process(price_chunk, vol_chunk)
+        accel = ewmac_signal - lagged_ewmac.process(ewmac_signal)
+
+        if invert:
+            accel *= -1
+
+        return accel
+
+    return run_in_chunks(
+        accel_for_chunk,
+        price,
+        vol,
+        chunk_size=chunk_size,
+        output_filename=output_filename,
+    )
+
+
+accel.family_argument = "Lfast"
+accel.family_function = accel_for_speeds
+accel.chunked_function = accel_in_chunks
@@ -1,4 +1,9 @@
 import numpy as np
+import pandas as pd
+
+from private.systems.crypto_2024.rules.rolling_extremes import (
+    rolling_max_and_min_for_lookbacks,
+)
 
 
 def breakout(price, lookback=10, smooth=None, invert: bool=False):
@@ -39,3 +44,47 @@ def breakout(price, lookback=10, smooth=None, invert: bool=False):
         smoothed_output *= -1
 
     return smoothed_output
+
+
+def breakout_for_lookbacks(price, list_of_lookbacks: list, smooth=None, invert: bool=False) -> list:
+    """
+    breakout for each lookback, in the same order. The rolling max and min of each
+    lookback are built from those of a shorter one where possible
+
+    >>> price = pd.Series(np.arange(20.0) % 7)
+    >>> fast, slow = breakout_for_lookbacks(price, [4, 8])
+    >>> slow.equals(breakout(price, 8))
+    True
+    """
+    list_of_max_and_min = rolling_max_and_min_for_lookbacks(
+        price,
+        list_of_lookbacks,
+        list_of_min_periods=[
+            int(min(len(price), np.ceil(lookback / 2.0))) for lookback in list_of_lookbacks
+        ],
+    )
+
+    list_of_breakouts = []
+    for lookback, (roll_max, roll_min) in zip(list_of_lookbacks, list_of_max_and_min):
+        lookback_smooth = smooth
+        if lookback_smooth is None:
+            lookback_smooth = max(int(lookback / 4.0), 1)
+
+        assert lookback_smooth < lookback
+
+        roll_mean = (roll_max + roll_min) / 2.0
+        output = 40.0 * ((price - roll_mean) / (roll_max - roll_min))
+        smoothed_output = output.ewm(
+            span=lookback_smooth, min_periods=np.ceil(lookback_smooth / 2.0)
+        ).mean()
+
+        if invert:
+            smoothed_output *= -1
+
+        list_of_breakouts.append(smoothed_output)
+
+    return list_of_breakouts
+
+
+breakout.family_argument = "lookback"
+breakout.family_function = breakout_for_lookbacks
@@ -1,3 +1,14 @@
+from syscore.constants import arg_not_supplied
+from syscore.pandas.chunked_window import (
+    DEFAULT_CHUNK_SIZE,
+    chunkedDiff,
+    chunkedEwmMean,
+    chunkedFfill,
+    chunkedRolling,
+    run_in_chunks,
+)
+
+
 def cross_sectional_mean_reversion(
     normalised_price_this_instrument,
     normalised_price_for_asset_class,
@@ -27,3 +38,50 @@ def cross_sectional_mean_reversion(
     forecast = -outperformance_over_horizon.ewm(span=ewma_span).mean()
 
     return forecast
+
+
+def cross_sectional_mean_reversion_in_chunks(
+    normalised_price_this_instrument,
+    normalised_price_for_asset_class,
+    horizon=250,
+    ewma_span=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    output_filename: str = arg_not_supplied,
+):
+    """
+    cross_sectional_mean_reversion over consecutive chunks, for histories too long to
+    hold in memory with their intermediate series; see syscore.pandas.chunked_window
+    """
+
+    if ewma_span is None:
+        ewma_span = int(horizon / 4.0)
+
+    ewma_span = max(ewma_span, 2)
+
+    filled_price_this_instrument = chunkedFfill()
+    filled_price_for_asset_class = chunkedFfill()
+    relative_return_diff = chunkedDiff()
+    rolling_mean_return = chunkedRolling(horizon)
+    ewma_of_outperformance = chunkedEwmMean(span=ewma_span)
+
+    def forecast_for_chunk(price_this_instrument_chunk, price_for_asset_class_chunk):
+        outperformance = filled_price_this_instrument.process(
+            price_this_instrument_chunk
+        ) - filled_price_for_asset_class.process(price_for_asset_class_chunk)
+        relative_return = relative_return_diff.process(outperformance)
+        outperformance_over_horizon = rolling_mean_return.process(relative_return)
+
+        return -ewma_of_outperformance.process(outperformance_over_horizon)
+
+    return run_in_chunks(
+        forecast_for_chunk,
+        normalised_price_this_instrument,
+        normalised_price_for_asset_class,
+        chunk_size=chunk_size,
+        output_filename=output_filename,
+    )
+
+
+cross_sectional_mean_reversion.chunked_function = (
+    cross_sectional_mean_reversion_in_chunks
+)
@@ -1,3 +1,15 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+from syscore.pandas.chunked_window import (
+    DEFAULT_CHUNK_SIZE,
+    chunkedEwmMean,
+    chunkedFfill,
+    run_in_chunks,
+)
 from sysquant.estimators.vol import robust_vol_calc
 
 
@@ -128,6 +140,80 @@ def ewmac(price, vol, Lfast, Lslow, invert: bool=False):
     return return_val
 
 
+def ewmac_for_speed_pairs(price, vol, list_of_speed_pairs: list) -> list:
+    """
+    ewmac(price, vol, Lfast, Lslow) for each (Lfast, Lslow) pair, in the same order
+
+    Each EWMA span is only calculated once, which matters when the slow span of one
+    variation is the fast span of another (eg Lslow = 4 * Lfast with Lfast 4, 16, 64),
+    and the vol is only forward filled once
+
+    >>> price = pd.Series([1.0, 2.0, 4.0, 3.0, 5.0])
+    >>> vol = pd.Series([1.0, 1.0, np.nan, 1.0, 1.0])
+    >>> fast, slow = ewmac_for_speed_pairs(price, vol, [(2, 4), (4, 16)])
+    >>> fast.equals(ewmac(price, vol, 2, 4))
+    True
+    """
+    filled_vol = vol.ffill()
+
+    ewma_for_span = {}
+    for span in sorted(set(itertools.chain.from_iterable(list_of_speed_pairs))):
+        ewma_for_span[span] = price.ewm(span=span, min_periods=1).mean()
+
+    list_of_ewmac = [
+        (ewma_for_span[Lfast] - ewma_for_span[Lslow]) / filled_vol
+        for Lfast, Lslow in list_of_speed_pairs
+    ]
+
+    return list_of_ewmac
+
+
+def ewmac_in_chunks(
+    price,
+    vol,
+    Lfast,
+    Lslow,
+    invert: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    output_filename: str = arg_not_supplied,
+):
+    """
+    ewmac over consecutive chunks of price and vol, for histories too long to hold
+    in memory with their intermediate series; see syscore.pandas.chunked_window
+    """
+    ewmac_step = ewmacChunkStep(Lfast, Lslow, invert=invert)
+
+    return run_in_chunks(
+        ewmac_step.process,
+        price,
+        vol,
+        chunk_size=chunk_size,
+        output_filename=output_filename,
+    )
+
+
+ewmac.chunked_function = ewmac_in_chunks
+
+
+class ewmacChunkStep(object):
+    ## ewmac for one chunk of price and vol, carrying the EWMA and vol state
+    def __init__(self, Lfast, Lslow, invert: bool = False):
+        self._fast_ewma = chunkedEwmMean(span=Lfast, min_periods=1)
+        self._slow_ewma = chunkedEwmMean(span=Lslow, min_periods=1)
+        self._filled_vol = chunkedFfill()
+        self.invert = invert
+
+    def process(self, price_chunk, vol_chunk):
+        raw_ewmac = self._fast_ewma.process(price_chunk) - self._slow_ewma.process(
+            price_chunk
+        )
+        return_val = raw_ewmac / self._filled_vol.process(vol_chunk)
+        if self.invert:
+            return_val *= -1
+
+        return return_val
+
+
 def ewmac_calc_vol(price, Lfast, Lslow, vol_days=35):
     """
     Calculate the ewmac trading rule forecast, given a price and EWMA speeds Lfast, Lslow and number of days to
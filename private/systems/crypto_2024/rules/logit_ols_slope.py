@@ -5,7 +5,18 @@ from scipy.stats.mstats import zscore
 import pandas as pd
 import numpy as np
 
-
+from private.systems.crypto_2024.rules.rolling_regression import (
+    rolling_ols_slope,
+    rolling_ols_slopes,
+    rolling_normalize,
+)
+from private.systems.crypto_2024.rules.rolling_extremes import (
+    rolling_max_and_min_for_lookbacks,
+)
+
+
+# get_ols_slope and normalize are the per-window reference implementations, kept for
+# testing: logit_ols_slope uses the vectorised equivalents in rolling_regression
 def get_ols_slope(price):
     linreg = LinearRegression(fit_intercept=True).fit(
         X=zscore(list(price.reset_index(drop=True).index)).reshape(-1, 1),
@@ -22,14 +33,30 @@ def normalize(series: pd.Series):
 
 
 def logit_ols_slope(price, lookback: int=240):
-    rolling_ols_slope = price.rolling(lookback, min_periods=10).apply(get_ols_slope)
-    rolling_ols_slope = rolling_ols_slope.fillna(0.0).rolling(lookback, min_periods=10).apply(normalize)
+    ols_slope = rolling_ols_slope(price, lookback, min_periods=10)
+    normalized_slope = rolling_normalize(ols_slope.fillna(0.0), lookback, min_periods=10)
 
-    forecast = logit(rolling_ols_slope) / 40.0
+    forecast = logit(normalized_slope) / 40.0
 
     return forecast
 
 
+def logit_ols_slope_for_lookbacks(price, list_of_lookbacks: list) -> list:
+    ## logit_ols_slope for each lookback, with the slopes from one set of prefix sums
+    ols_slopes = rolling_ols_slopes(price, list_of_lookbacks, min_periods=10)
+
+    list_of_forecasts = []
+    for lookback, ols_slope in zip(list_of_lookbacks, ols_slopes):
+        normalized_slope = rolling_normalize(ols_slope.fillna(0.0), lookback, min_periods=10)
+        list_of_forecasts.append(logit(normalized_slope) / 40.0)
+
+    return list_of_forecasts
+
+
+logit_ols_slope.family_argument = "lookback"
+logit_ols_slope.family_function = logit_ols_slope_for_lookbacks
+
+
 def logit_ols_slope_inverted_when_trend_is_weak(price, lookback: int=240):
     logit_forecast = logit_ols_slope(price, lookback)
     logit_forecast.loc[logit_forecast.abs() < 0.01] *= -1
@@ -37,6 +64,20 @@ def logit_ols_slope_inverted_when_trend_is_weak(price, lookback: int=240):
     return logit_forecast
 
 
+def logit_ols_slope_inverted_when_trend_is_weak_for_lookbacks(price, list_of_lookbacks: list) -> list:
+    list_of_forecasts = logit_ols_slope_for_lookbacks(price, list_of_lookbacks)
+    for logit_forecast in list_of_forecasts:
+        logit_forecast.loc[logit_forecast.abs() < 0.01] *= -1
+
+    return list_of_forecasts
+
+
+logit_ols_slope_inverted_when_trend_is_weak.family_argument = "lookback"
+logit_ols_slope_inverted_when_trend_is_weak.family_function = (
+    logit_ols_slope_inverted_when_trend_is_weak_for_lookbacks
+)
+
+
 def mr_logit_ols_slope(price, vol, lookback: int=240):
     equilibrium = price.ewm(lookback).mean()
     mr_forecast = (equilibrium - price) / vol
@@ -71,8 +112,40 @@ def breakout(price, lookback=60, smooth=None):
     return smoothed_output
 
 
+def breakout_for_lookbacks(price, list_of_lookbacks: list) -> list:
+    ## breakout for each lookback, with the default smooth
+    list_of_max_and_min = rolling_max_and_min_for_lookbacks(
+        price,
+        list_of_lookbacks,
+        list_of_min_periods=[
+            int(min(len(price), np.ceil(lookback / 2.0))) for lookback in list_of_lookbacks
+        ],
+    )
+
+    list_of_breakouts = []
+    for lookback, (roll_max, roll_min) in zip(list_of_lookbacks, list_of_max_and_min):
+        smooth = max(int(lookback / 4.0), 1)
+        assert smooth < lookback
+
+        roll_mean = (roll_max + roll_min) / 2.0
+        output = ((price - roll_mean) / (roll_max - roll_min))
+        list_of_breakouts.append(
+            output.ewm(span=smooth, min_periods=np.ceil(smooth / 2.0)).mean()
+        )
+
+    return list_of_breakouts
+
+
 def logit_breakout(price, lookback: int=60):
     bo = breakout(price, lookback)
     forecast = logit(bo) / 40.0
 
     return forecast
+
+
+def logit_breakout_for_lookbacks(price, list_of_lookbacks: list) -> list:
+    return [logit(bo) / 40.0 for bo in breakout_for_lookbacks(price, list_of_lookbacks)]
+
+
+logit_breakout.family_argument = "lookback"
+logit_breakout.family_function = logit_breakout_for_lookbacks
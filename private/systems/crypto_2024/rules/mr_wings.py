@@ -1,4 +1,14 @@
 from systems.provided.rules.ewmac import ewmac
+from private.systems.crypto_2024.rules.ewmac import (
+    ewmac_for_speed_pairs,
+    ewmacChunkStep,
+)
+from syscore.constants import arg_not_supplied
+from syscore.pandas.chunked_window import (
+    DEFAULT_CHUNK_SIZE,
+    chunkedRolling,
+    run_in_chunks,
+)
 
 
 def mr_wings(price, vol, Lfast=4):
@@ -9,3 +19,50 @@ def mr_wings(price, vol, Lfast=4):
     mr_signal = -ewmac_signal
 
     return mr_signal
+
+
+def mr_wings_for_speeds(price, vol, list_of_Lfast: list) -> list:
+    ## mr_wings for each Lfast, sharing the EWMAs across speeds
+    list_of_ewmac = ewmac_for_speed_pairs(
+        price, vol, [(Lfast, Lfast * 4) for Lfast in list_of_Lfast]
+    )
+
+    list_of_forecasts = []
+    for ewmac_signal in list_of_ewmac:
+        ewmac_std = ewmac_signal.rolling(5000, min_periods=3).std()
+        ewmac_signal[ewmac_signal.abs() < ewmac_std * 3] = 0.0
+        list_of_forecasts.append(-ewmac_signal)
+
+    return list_of_forecasts
+
+
+def mr_wings_in_chunks(
+    price,
+    vol,
+    Lfast=4,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    output_filename: str = arg_not_supplied,
+):
+    ## mr_wings over consecutive chunks, see syscore.pandas.chunked_window
+    ewmac_step = ewmacChunkStep(Lfast, Lfast * 4)
+    ewmac_rolling_std = chunkedRolling(5000, min_periods=3, statistic="std")
+
+    def mr_wings_for_chunk(price_chunk, vol_chunk):
+        ewmac_signal = ewmac_step.process(price_chunk, vol_chunk)
+        ewmac_std = ewmac_rolling_std.process(ewmac_signal)
+        ewmac_signal[ewmac_signal.abs() < ewmac_std * 3] = 0.0
+
+        return -ewmac_signal
+
+    return run_in_chunks(
+        mr_wings_for_chunk,
+        price,
+        vol,
+        chunk_size=chunk_size,
+        output_filename=output_filename,
+    )
+
+
+mr_wings.family_argument = "Lfast"
+mr_wings.family_function = mr_wings_for_speeds
+mr_wings.chunked_function = mr_wings_in_chunks
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+
+def rolling_max_and_min_for_lookbacks(
+    price: pd.Series, list_of_lookbacks: list, list_of_min_periods: list = None
+) -> list:
+    """
+    price.rolling(lookback, min_periods).max() and .min() for several lookbacks of the
+    same price. Going up through the lookbacks, a window of L bars is two overlapping
+    windows of a shorter lookback already done (if it is at least L/2), so it takes two
+    array operations rather than a new pass over the price. For a single lookback,
+    use pandas.
+
+    >>> price = pd.Series([1.0, 3.0, 2.0, np.nan, 0.0, 4.0])
+    >>> (max2, min2), (max3, min3) = rolling_max_and_min_for_lookbacks(price, [2, 3])
+    >>> max3.tolist(), min3.tolist()
+    ([nan, nan, 3.0, nan, nan, nan], [nan, nan, 1.0, nan, nan, nan])
+    """
+    if list_of_min_periods is None:
+        list_of_min_periods = list_of_lookbacks
+
+    values = np.asarray(price.values, dtype=np.float64)
+    is_valid = ~np.isnan(values)
+    for_max = np.where(is_valid, values, -np.inf)
+    for_min = np.where(is_valid, -values, -np.inf)
+
+    done = {}
+    for lookback in sorted(set(list_of_lookbacks)):
+        shorter_lookbacks = [
+            shorter for shorter in done.keys() if 2 * shorter >= lookback
+        ]
+        if len(shorter_lookbacks) == 0:
+            done[lookback] = (
+                _rolling_max_array(for_max, lookback),
+                _rolling_max_array(for_min, lookback),
+            )
+        else:
+            shorter = max(shorter_lookbacks)
+            done[lookback] = tuple(
+                _widen_rolling_max(roll_max, lookback - shorter)
+                for roll_max in done[shorter]
+            )
+
+    list_of_max_and_min = []
+    for lookback, min_periods in zip(list_of_lookbacks, list_of_min_periods):
+        enough_values = _rolling_count(is_valid, lookback) >= max(min_periods, 1)
+        roll_max, negative_roll_min = done[lookback]
+        list_of_max_and_min.append(
+            (
+                pd.Series(
+                    np.where(enough_values, roll_max, np.nan),
+                    index=price.index,
+                    name=price.name,
+                ),
+                pd.Series(
+                    np.where(enough_values, -negative_roll_min, np.nan),
+                    index=price.index,
+                    name=price.name,
+                ),
+            )
+        )
+
+    return list_of_max_and_min
+
+
+def _rolling_count(is_valid: np.ndarray, lookback: int) -> np.ndarray:
+    cumulative_count = np.concatenate([[0], np.cumsum(is_valid, dtype=np.int64)])
+    window_start = np.maximum(np.arange(1, len(is_valid) + 1) - lookback, 0)
+
+    return cumulative_count[1:] - cumulative_count[window_start]
+
+
+def _rolling_max_array(values: np.ndarray, lookback: int) -> np.ndarray:
+    ## max over values[i - lookback + 1: i + 1], with the van Herk / Gil-Werman method:
+    ## running maxima forwards and backwards within blocks of lookback bars, so that
+    ## every window is the max of one backward and one forward value
+    length = len(values)
+    if length == 0:
+        return np.array([])
+
+    lookback = int(min(max(lookback, 1), length))
+
+    # padded so that every window is full, and there is a whole number of blocks
+    number_of_blocks = -(-(length + lookback - 1) // lookback)
+    padded = np.full(number_of_blocks * lookback, -np.inf)
+    padded[lookback - 1 : lookback - 1 + length] = values
+    blocks = padded.reshape(number_of_blocks, lookback)
+
+    forward_max = np.maximum.accumulate(blocks, axis=1).ravel()
+    backward_max = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    # window ending at padded[end] starts at padded[end - lookback + 1]
+    window_end = np.arange(lookback - 1, lookback - 1 + length)
+
+    return np.maximum(forward_max[window_end], backward_max[window_end - lookback + 1])
+
+
+def _widen_rolling_max(roll_max: np.ndarray, extra_bars: int) -> np.ndarray:
+    ## a rolling max of lookback L to one of L + extra_bars, for extra_bars <= L
+    widened = roll_max.copy()
+    if extra_bars > 0:
+        np.maximum(
+            widened[extra_bars:], roll_max[:-extra_bars], out=widened[extra_bars:]
+        )
+
+    return widened
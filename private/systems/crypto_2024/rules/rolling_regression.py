@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+
+def rolling_ols_slope(
+    price: pd.Series, lookback: int, min_periods: int = 10, block_size: int = 4096
+) -> pd.Series:
+    """
+    Rolling OLS slope of the z-scored price on the z-scored bar position, computed
+    from running sums instead of fitting a regression per window.
+
+    With both sides z-scored the slope is just the correlation between price and
+    time, so for a window of m points with positions x = 0..m-1:
+
+        slope = (m*Sxy - Sx*Sy) / sqrt((m*Sxx - Sx^2) * (m*Syy - Sy^2))
+
+    Sx and Sxx are closed form; Sy, Syy and Sxy come from prefix sums. The prefix
+    sums are re-anchored every block_size bars, on both position and price level, so
+    float64 precision does not degrade over millions of minute bars.
+
+    Gives the same result as price.rolling(lookback, min_periods).apply(get_ols_slope).
+    Windows containing a NaN, or with a constant price, return NaN.
+
+    >>> price = pd.Series([1.0, 2.0, 4.0, 3.0, 5.0, 4.0])
+    >>> rolling_ols_slope(price, lookback=4, min_periods=3).round(6).tolist()
+    [nan, nan, 0.981981, 0.8, 0.8, 0.316228]
+    """
+    values = price.values.astype(np.float64)
+    slope = _rolling_ols_slope_array(
+        values, lookback=lookback, min_periods=min_periods, block_size=block_size
+    )
+
+    return pd.Series(slope, index=price.index)
+
+
+def rolling_ols_slopes(
+    price: pd.Series,
+    list_of_lookbacks: list,
+    min_periods: int = 10,
+    block_size: int = 4096,
+) -> list:
+    """
+    rolling_ols_slope for several lookbacks at once, sharing the prefix sums
+
+    >>> price = pd.Series([1.0, 2.0, 4.0, 3.0, 5.0, 4.0])
+    >>> short, long = rolling_ols_slopes(price, [3, 4], min_periods=3)
+    >>> long.round(6).tolist()
+    [nan, nan, 0.981981, 0.8, 0.8, 0.316228]
+    """
+    values = price.values.astype(np.float64)
+    list_of_slopes = _rolling_ols_slope_arrays(
+        values,
+        list_of_lookbacks,
+        min_periods=min_periods,
+        block_size=block_size,
+    )
+
+    return [pd.Series(slope, index=price.index) for slope in list_of_slopes]
+
+
+def rolling_normalize(
+    series: pd.Series, lookback: int, min_periods: int = 10
+) -> pd.Series:
+    """
+    Position of the last value in the rolling [min, max] range
+
+    Gives the same result as series.rolling(lookback, min_periods).apply(normalize)
+
+    >>> series = pd.Series([1.0, 3.0, 2.0, 0.0, 4.0])
+    >>> rolling_normalize(series, lookback=3, min_periods=2).tolist()
+    [nan, 1.0, 0.5, 0.0, 1.0]
+    """
+    rolling = series.rolling(lookback, min_periods=min_periods)
+    roll_max = rolling.max()
+    roll_min = rolling.min()
+
+    return (series - roll_min) / (roll_max - roll_min)
+
+
+def _rolling_ols_slope_array(
+    values: np.ndarray, lookback: int, min_periods: int = 10, block_size: int = 4096
+) -> np.ndarray:
+    return _rolling_ols_slope_arrays(
+        values, [lookback], min_periods=min_periods, block_size=block_size
+    )[0]
+
+
+def _rolling_ols_slope_arrays(
+    values: np.ndarray,
+    list_of_lookbacks: list,
+    min_periods: int = 10,
+    block_size: int = 4096,
+) -> list:
+    ## one slope array per lookback, all from the same prefix sums
+    length = len(values)
+    list_of_slopes = [np.full(length, np.nan) for _ in list_of_lookbacks]
+    if length == 0:
+        return list_of_slopes
+
+    longest_lookback = max(list_of_lookbacks)
+    block_size = max(block_size, longest_lookback)
+    is_nan = np.isnan(values)
+
+    for block_start in range(0, length, block_size):
+        block_end = min(block_start + block_size, length)
+
+        # all windows ending in this block start at or after anchor
+        anchor = max(block_start - longest_lookback + 1, 0)
+        segment = values[anchor:block_end]
+        segment_nan = is_nan[anchor:block_end]
+
+        level = segment[~segment_nan]
+        level = level[0] if len(level) > 0 else 0.0
+
+        y = np.where(segment_nan, 0.0, segment - level)
+        position = np.arange(len(segment), dtype=np.float64)
+
+        cum_y = _prefix_sum(y)
+        cum_yy = _prefix_sum(y * y)
+        cum_xy = _prefix_sum(position * y)
+        cum_nan = _prefix_sum(segment_nan.astype(np.float64))
+
+        # window [start, end) in segment coordinates
+        end = np.arange(block_start, block_end) - anchor + 1
+
+        for lookback, slope in zip(list_of_lookbacks, list_of_slopes):
+            start = np.maximum(end - lookback, 0)
+            count = (end - start).astype(np.float64)
+
+            sum_y = cum_y[end] - cum_y[start]
+            sum_yy = cum_yy[end] - cum_yy[start]
+            # positions re-based so each window starts at x=0
+            sum_xy = cum_xy[end] - cum_xy[start] - start * sum_y
+            nan_count = cum_nan[end] - cum_nan[start]
+
+            sum_x = count * (count - 1.0) / 2.0
+            sum_xx = (count - 1.0) * count * (2.0 * count - 1.0) / 6.0
+
+            covariance = count * sum_xy - sum_x * sum_y
+            variance_x = count * sum_xx - sum_x**2
+            variance_y = np.maximum(count * sum_yy - sum_y**2, 0.0)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                block_slope = covariance / np.sqrt(variance_x * variance_y)
+
+            # constant windows leave only rounding noise in variance_y
+            not_flat = variance_y > 1e-12 * count * sum_yy
+            valid = (count >= min_periods) & (nan_count == 0) & not_flat
+            slope[block_start:block_end] = np.where(valid, block_slope, np.nan)
+
+    return list_of_slopes
+
+
+def _prefix_sum(values: np.ndarray) -> np.ndarray:
+    prefix = np.zeros(len(values) + 1)
+    np.cumsum(values, out=prefix[1:])
+
+    return prefix
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from private.systems.crypto_2024.rules.accel import accel, accel_in_chunks
+from private.systems.crypto_2024.rules.cs_mr import (
+    cross_sectional_mean_reversion,
+    cross_sectional_mean_reversion_in_chunks,
+)
+from private.systems.crypto_2024.rules.ewmac import ewmac, ewmac_in_chunks
+from private.systems.crypto_2024.rules.mr_wings import mr_wings, mr_wings_in_chunks
+from syscore.tests.minute_prices import minute_prices
+
+
+def normalised_prices(periods: int, seed: int) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=periods, freq="min", tz="UTC")
+    price = pd.Series(np.cumsum(rng.normal(0.0, 0.001, periods)), index=index)
+    price.iloc[rng.integers(0, periods, periods // 100)] = np.nan
+
+    return price
+
+
+@pytest.mark.parametrize("chunk_size", [100, 4999, 20000])
+def test_cross_sectional_mean_reversion_in_chunks_matches(chunk_size):
+    price_this_instrument = normalised_prices(20000, seed=1)
+    price_for_asset_class = normalised_prices(20000, seed=2)
+
+    result = cross_sectional_mean_reversion_in_chunks(
+        price_this_instrument,
+        price_for_asset_class,
+        horizon=250,
+        chunk_size=chunk_size,
+    )
+    expected = cross_sectional_mean_reversion(
+        price_this_instrument, price_for_asset_class, horizon=250
+    )
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-9, check_names=False)
+
+
+def minute_vol(price: pd.Series) -> pd.Series:
+    vol = price.diff().abs().ewm(span=35, min_periods=10).mean()
+    # gaps that the rules forward fill, across a chunk boundary
+    vol.iloc[4990:5010] = np.nan
+
+    return vol
+
+
+@pytest.mark.parametrize("chunk_size", [100, 4999, 20000])
+@pytest.mark.parametrize("invert", [False, True])
+def test_ewmac_in_chunks_matches(chunk_size, invert):
+    price = minute_prices(20000, with_gaps=True)
+    vol = minute_vol(price)
+
+    result = ewmac_in_chunks(price, vol, 16, 64, invert=invert, chunk_size=chunk_size)
+    expected = ewmac(price, vol, 16, 64, invert=invert)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-9, check_names=False)
+
+
+@pytest.mark.parametrize("chunk_size", [100, 4999, 20000])
+def test_accel_in_chunks_matches(chunk_size):
+    price = minute_prices(20000, with_gaps=True)
+    vol = minute_vol(price)
+
+    result = accel_in_chunks(price, vol, Lfast=16, chunk_size=chunk_size)
+    expected = accel(price, vol, Lfast=16)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-9, check_names=False)
+
+
+@pytest.mark.parametrize("chunk_size", [100, 4999, 20000])
+def test_mr_wings_in_chunks_matches(chunk_size):
+    price = minute_prices(20000, with_gaps=True)
+    vol = minute_vol(price)
+
+    result = mr_wings_in_chunks(price, vol, Lfast=4, chunk_size=chunk_size)
+    expected = mr_wings(price, vol, Lfast=4)
+
+    # the wings must be in the test data
+    assert (expected != 0.0).any()
+    pd.testing.assert_series_equal(result, expected, rtol=1e-9, check_names=False)
+
+
+@pytest.mark.parametrize(
+    "rule_function, chunked_function",
+    [
+        (ewmac, ewmac_in_chunks),
+        (accel, accel_in_chunks),
+        (mr_wings, mr_wings_in_chunks),
+        (cross_sectional_mean_reversion, cross_sectional_mean_reversion_in_chunks),
+    ],
+)
+def test_rules_have_their_chunked_function(rule_function, chunked_function):
+    assert rule_function.chunked_function is chunked_function
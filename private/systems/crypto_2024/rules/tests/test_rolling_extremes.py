@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from private.systems.crypto_2024.rules.breakout import breakout
+from private.systems.crypto_2024.rules.rolling_extremes import (
+    rolling_max_and_min_for_lookbacks,
+)
+from syscore.tests.minute_prices import minute_prices
+
+
+@pytest.mark.parametrize("lookback", [1, 2, 10, 60, 999, 5000])
+@pytest.mark.parametrize("min_periods", [1, 5])
+def test_rolling_max_and_min_match_pandas(lookback, min_periods):
+    price = minute_prices(3000).round(-1)
+    price.iloc[100:130] = np.nan
+    price.iloc[2000] = np.nan
+    min_periods = min(min_periods, lookback)
+
+    [(roll_max, roll_min)] = rolling_max_and_min_for_lookbacks(
+        price, [lookback], list_of_min_periods=[min_periods]
+    )
+    rolling = price.rolling(lookback, min_periods=min_periods)
+
+    pd.testing.assert_series_equal(roll_max, rolling.max())
+    pd.testing.assert_series_equal(roll_min, rolling.min())
+
+
+def test_breakout_matches_separate_rolling_max_and_min():
+    price = minute_prices(5000)
+    lookback = 240
+    min_periods = int(np.ceil(lookback / 2.0))
+    roll_max = price.rolling(lookback, min_periods=min_periods).max()
+    roll_min = price.rolling(lookback, min_periods=min_periods).min()
+    output = 40.0 * ((price - (roll_max + roll_min) / 2.0) / (roll_max - roll_min))
+    expected = output.ewm(span=60, min_periods=30).mean()
+
+    pd.testing.assert_series_equal(breakout(price, lookback), expected)
@@ -0,0 +1,85 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.special import logit
+
+from private.systems.crypto_2024.rules.logit_ols_slope import (
+    get_ols_slope,
+    normalize,
+    logit_ols_slope,
+)
+from private.systems.crypto_2024.rules.rolling_regression import (
+    rolling_ols_slope,
+    rolling_normalize,
+)
+from syscore.tests.minute_prices import minute_prices
+
+
+def logit_ols_slope_reference(price, lookback):
+    slope = price.rolling(lookback, min_periods=10).apply(get_ols_slope)
+    slope = slope.fillna(0.0).rolling(lookback, min_periods=10).apply(normalize)
+
+    return logit(slope) / 40.0
+
+
+@pytest.mark.parametrize("lookback", [12, 60, 240])
+def test_rolling_ols_slope_matches_regression(lookback):
+    price = minute_prices(3000)
+
+    expected = price.rolling(lookback, min_periods=10).apply(get_ols_slope)
+    # small block forces several re-anchors
+    result = rolling_ols_slope(price, lookback, min_periods=10, block_size=500)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-8, atol=1e-10)
+
+
+def test_rolling_normalize_matches_apply():
+    series = minute_prices(1000).pct_change().fillna(0.0)
+
+    expected = series.rolling(60, min_periods=10).apply(normalize)
+    result = rolling_normalize(series, 60, min_periods=10)
+
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_logit_ols_slope_matches_reference():
+    price = minute_prices(2000)
+
+    expected = logit_ols_slope_reference(price, 120)
+    result = logit_ols_slope(price, 120)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-6, atol=1e-8)
+
+
+def test_rolling_ols_slope_nan_and_flat_windows():
+    price = pd.Series([1.0] * 15 + [2.0, np.nan, 3.0] + list(np.arange(4.0, 20.0)))
+
+    result = rolling_ols_slope(price, lookback=10, min_periods=10)
+
+    assert result.iloc[:15].isna().all()
+    # any window containing the NaN is undefined
+    assert result.iloc[16:26].isna().all()
+    assert result.iloc[-1] == pytest.approx(1.0)
+
+
+@pytest.mark.slow
+def test_benchmark_rolling_ols_slope_multi_year_minutes():
+    # three years of minute bars
+    price = minute_prices(3 * 365 * 24 * 60)
+    lookback = 960
+
+    start = time.perf_counter()
+    logit_ols_slope(price, lookback)
+    vectorised_seconds = time.perf_counter() - start
+
+    sample = price.iloc[:20000]
+    start = time.perf_counter()
+    sample.rolling(lookback, min_periods=10).apply(get_ols_slope)
+    reference_seconds = (time.perf_counter() - start) * len(price) / len(sample)
+
+    print(
+        "logit_ols_slope%d on %d bars: vectorised %.2fs, per-window regression ~%.0fs"
+        % (lookback, len(price), vectorised_seconds, reference_seconds)
+    )
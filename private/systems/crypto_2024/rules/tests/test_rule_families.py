@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from private.systems.crypto_2024.rules import logit_ols_slope as logit_rules
+from private.systems.crypto_2024.rules.breakout import breakout, breakout_for_lookbacks
+from private.systems.crypto_2024.rules.rolling_extremes import (
+    rolling_max_and_min_for_lookbacks,
+)
+from private.systems.crypto_2024.rules.rolling_regression import (
+    rolling_ols_slope,
+    rolling_ols_slopes,
+)
+from private.systems.crypto_2024.rules.accel import accel
+from private.systems.crypto_2024.rules.mr_wings import mr_wings
+from syscore.tests.minute_prices import minute_prices
+
+
+def minute_vol(price: pd.Series) -> pd.Series:
+    vol = price.diff().abs().ewm(span=35, min_periods=10).mean()
+    # gaps that the rules forward fill
+    vol.iloc[1000:1010] = np.nan
+
+    return vol
+
+
+def test_rolling_max_and_min_for_lookbacks_match_single_lookbacks():
+    price = minute_prices(3000).round(-1)
+    price.iloc[100:130] = np.nan
+    # not sorted, and not all doublings
+    list_of_lookbacks = [320, 10, 20, 7, 40, 13, 80, 160, 33]
+    list_of_min_periods = [5] * len(list_of_lookbacks)
+
+    list_of_max_and_min = rolling_max_and_min_for_lookbacks(
+        price, list_of_lookbacks, list_of_min_periods=list_of_min_periods
+    )
+
+    for lookback, (roll_max, roll_min) in zip(list_of_lookbacks, list_of_max_and_min):
+        rolling = price.rolling(lookback, min_periods=5)
+        pd.testing.assert_series_equal(roll_max, rolling.max())
+        pd.testing.assert_series_equal(roll_min, rolling.min())
+
+
+def test_rolling_ols_slopes_match_single_lookbacks():
+    price = minute_prices(3000)
+    list_of_lookbacks = [12, 60, 240, 960]
+
+    slopes = rolling_ols_slopes(price, list_of_lookbacks, block_size=500)
+
+    for lookback, slope in zip(list_of_lookbacks, slopes):
+        expected = rolling_ols_slope(price, lookback, block_size=500)
+        # prefix sums run over the longest lookback, so short windows round a
+        # little differently; the same happens with the default block_size
+        pd.testing.assert_series_equal(slope, expected, rtol=1e-7, atol=1e-8)
+
+
+@pytest.mark.parametrize(
+    "rule_name",
+    [
+        "logit_ols_slope",
+        "logit_ols_slope_inverted_when_trend_is_weak",
+        "logit_breakout",
+    ],
+)
+def test_logit_rule_families_match_each_variation(rule_name):
+    price = minute_prices(3000)
+    list_of_lookbacks = [60, 120, 240, 480]
+    rule_function = getattr(logit_rules, rule_name)
+
+    assert rule_function.family_argument == "lookback"
+    forecasts = rule_function.family_function(price, list_of_lookbacks)
+
+    for lookback, forecast in zip(list_of_lookbacks, forecasts):
+        expected = rule_function(price, lookback=lookback)
+        pd.testing.assert_series_equal(forecast, expected, rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_breakout_family_matches_each_variation(invert):
+    price = minute_prices(3000)
+    list_of_lookbacks = [10, 20, 40, 80, 160, 320]
+
+    forecasts = breakout_for_lookbacks(price, list_of_lookbacks, invert=invert)
+
+    for lookback, forecast in zip(list_of_lookbacks, forecasts):
+        expected = breakout(price, lookback=lookback, invert=invert)
+        pd.testing.assert_series_equal(forecast, expected)
+
+
+@pytest.mark.parametrize("invert", [False, True])
+def test_accel_family_matches_each_variation(invert):
+    price = minute_prices(3000)
+    vol = minute_vol(price)
+    # Lslow is 4 * Lfast, so these share spans
+    list_of_Lfast = [4, 16, 64]
+
+    assert accel.family_argument == "Lfast"
+    forecasts = accel.family_function(price, vol, list_of_Lfast, invert=invert)
+
+    for Lfast, forecast in zip(list_of_Lfast, forecasts):
+        expected = accel(price, vol, Lfast=Lfast, invert=invert)
+        pd.testing.assert_series_equal(forecast, expected)
+
+
+def test_mr_wings_family_matches_each_variation():
+    price = minute_prices(20000)
+    vol = minute_vol(price)
+    list_of_Lfast = [4, 16, 64]
+
+    assert mr_wings.family_argument == "Lfast"
+    forecasts = mr_wings.family_function(price, vol, list_of_Lfast)
+
+    for Lfast, forecast in zip(list_of_Lfast, forecasts):
+        expected = mr_wings(price, vol, Lfast=Lfast)
+        # the wings must be in the test data
+        assert (expected != 0.0).any()
+        pd.testing.assert_series_equal(forecast, expected)
+
+
+@pytest.mark.slow
+def test_benchmark_logit_ols_slope_family():
+    # a year of minute bars
+    price = minute_prices(365 * 24 * 60)
+    list_of_lookbacks = [60, 120, 240, 480, 960]
+
+    start = time.perf_counter()
+    for lookback in list_of_lookbacks:
+        logit_rules.logit_ols_slope(price, lookback)
+    one_at_a_time_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    logit_rules.logit_ols_slope_for_lookbacks(price, list_of_lookbacks)
+    family_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for lookback in [10, 20, 40, 80, 160, 320]:
+        breakout(price, lookback)
+    breakout_one_at_a_time_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    breakout_for_lookbacks(price, [10, 20, 40, 80, 160, 320])
+    breakout_family_seconds = time.perf_counter() - start
+
+    print(
+        "logit_ols_slope x%d: %.2fs one at a time, %.2fs as a family; "
+        "breakout x6: %.2fs one at a time, %.2fs as a family"
+        % (
+            len(list_of_lookbacks),
+            one_at_a_time_seconds,
+            family_seconds,
+            breakout_one_at_a_time_seconds,
+            breakout_family_seconds,
+        )
+    )
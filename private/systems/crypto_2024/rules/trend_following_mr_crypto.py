@@ -3,11 +3,11 @@ import numpy as np
 
 
 def buy_at_max_and_min(price, lookback_days: int=10):
-    daily_price = price.resample('D').agg('last').shift(1)
-    daily_max = daily_price.rolling(lookback_days).max()
-    daily_min = daily_price.rolling(lookback_days).min()
+    daily_price, daily_max, daily_min, daily_position = _daily_channel(price, lookback_days)
 
-    high_forecast = daily_price.eq(daily_max).astype(int).astype(float).reindex(price.index, method='ffill').fillna(0.0)
+    high_forecast = _daily_to_price_index(
+        daily_price.eq(daily_max).astype(float), daily_position, fill_value=0.0
+    )
     low_forecast = 0.0 #daily_price.eq(daily_min).astype(int).astype(float).reindex(price.index, method='ffill').fillna(0.0)
     # below_high_forecast = -(
     #         daily_price.lt(daily_max) & daily_price.gt(daily_min)
@@ -19,14 +19,10 @@ def buy_at_max_and_min(price, lookback_days: int=10):
 
 
 def buy_at_max_mean_reversion_below(price, vol, lookback_days: int=10):
-    daily_price = price.resample('D').agg('last').shift(1)
-    daily_max = daily_price.rolling(lookback_days).max()
-    daily_min = daily_price.rolling(lookback_days).min()
-
-    high_forecast = daily_price.eq(daily_max).astype(int).astype(float).reindex(price.index, method='ffill').fillna(0.0)
+    daily_price, daily_max, daily_min, daily_position = _daily_channel(price, lookback_days)
 
     daily_mean = (daily_max + daily_min) / 2.0
-    equilibrium = daily_mean.reindex(price.index, method='ffill')
+    equilibrium = _daily_to_price_index(daily_mean, daily_position)
     risk_adjusted_forecast = (equilibrium - price) / vol
 
     threshold = 3.0
@@ -39,8 +35,29 @@ def buy_at_max_mean_reversion_below(price, vol, lookback_days: int=10):
     risk_adjusted_forecast = risk_adjusted_forecast.ffill().fillna(0)
 
     mr_forecast = risk_adjusted_forecast.where(
-        daily_price.lt(daily_max).reindex(price.index, method='ffill').fillna(False), 0.0
+        _daily_to_price_index(daily_price.lt(daily_max), daily_position, fill_value=False), 0.0
     )
 
     return mr_forecast
 
+
+def _daily_channel(price, lookback_days: int) -> tuple:
+    ## yesterday's close, its rolling max and min, and for each bar of price the daily
+    ## row to use, which is the same as reindexing with method='ffill'
+    daily_price = price.resample('D').agg('last').shift(1)
+    daily_max = daily_price.rolling(lookback_days).max()
+    daily_min = daily_price.rolling(lookback_days).min()
+    daily_position = pd.Series(
+        daily_price.index.searchsorted(price.index, side='right') - 1, index=price.index
+    )
+
+    return daily_price, daily_max, daily_min, daily_position
+
+
+def _daily_to_price_index(daily_values: pd.Series, daily_position: pd.Series, fill_value=np.nan) -> pd.Series:
+    position = daily_position.values
+    values = daily_values.values[np.maximum(position, 0)]
+    values = np.where(position >= 0, values, fill_value)
+
+    return pd.Series(values, index=daily_position.index)
+
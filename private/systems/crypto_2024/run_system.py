@@ -63,7 +63,33 @@ if __name__ == "__main__":
     import matplotlib.pyplot as plt
     from private.systems.crypto_2024.utils import drawdown
 
-    system = crypto_system(attenuate_vol=False)
+    ## set to a run saved with save_system_for_incremental_refresh (or
+    ## system.cache.pickle) to only calculate the new bars. With the estimated
+    ## forecast scalars in config.yaml only the raw data and some raw forecasts are
+    ## reused, and everything from the scaled forecasts on is recalculated in full;
+    ## the log lists what was spliced
+    previous_cache_filename = None
+    if previous_cache_filename is not None:
+        from private.systems.crypto_2024.incremental_run import (
+            refresh_system_incrementally,
+        )
+
+        system = refresh_system_incrementally(
+            crypto_system, previous_cache_filename, attenuate_vol=False
+        )
+    else:
+        system = crypto_system(attenuate_vol=False)
+
+    ## set to a number of processes to calculate instruments in parallel
+    n_threads = None
+    if n_threads is not None:
+        from private.systems.crypto_2024.parallel import (
+            calculate_subsystem_positions_in_parallel,
+        )
+
+        calculate_subsystem_positions_in_parallel(
+            system, crypto_system, n_threads=n_threads, attenuate_vol=False
+        )
 
     portfolio = system.accounts.portfolio(delayfill=False, roundpositions=False)
     curve = portfolio.curve()
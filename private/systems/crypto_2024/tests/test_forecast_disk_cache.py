@@ -0,0 +1,181 @@
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from private.systems.crypto_2024.forecast_disk_cache import (
+    ConfigForecastDiskCache,
+    forecastDiskCache,
+    key_for_trading_rule,
+)
+
+
+def ewmac(price, fast=16, slow=64):
+    return price.ewm(span=fast).mean() - price.ewm(span=slow).mean()
+
+
+class fakeTradingRule(object):
+    def __init__(self, function, other_args):
+        self.function = function
+        self.other_args = other_args
+        self.data = ["rawdata.get_aggregated_minute_final_prices"]
+        self.data_args = [{}]
+        self.number_of_calls = 0
+
+    def call_with_data(self, list_of_data_for_call):
+        self.number_of_calls += 1
+        return self.function(*list_of_data_for_call, **self.other_args)
+
+
+@pytest.fixture
+def price():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2024-01-01", periods=20000, freq="min", tz="utc")
+
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.001, 20000))), index)
+
+
+def _cache(tmp_path, **kwargs):
+    return forecastDiskCache(ConfigForecastDiskCache(datapath=str(tmp_path), **kwargs))
+
+
+def test_unchanged_data_is_not_recalculated(tmp_path, price):
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    first = _cache(tmp_path).get_forecast(rule, "BTC", [price])
+    second = _cache(tmp_path).get_forecast(rule, "BTC", [price])
+
+    assert rule.number_of_calls == 1
+    pd.testing.assert_series_equal(first, second, check_freq=False)
+    pd.testing.assert_series_equal(
+        second, ewmac(price, fast=16, slow=64), check_freq=False
+    )
+
+
+def test_appended_bars_extend_saved_forecast(tmp_path, price):
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    cache = _cache(tmp_path, warmup_bars=2000)
+    cache.get_forecast(rule, "BTC", [price.iloc[:15000]])
+    extended = cache.get_forecast(rule, "BTC", [price])
+
+    pd.testing.assert_series_equal(
+        extended,
+        ewmac(price, fast=16, slow=64),
+        check_exact=False,
+        atol=1e-9,
+        check_freq=False,
+    )
+
+
+def test_changed_history_or_args_are_recalculated(tmp_path, price):
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    cache = _cache(tmp_path)
+    cache.get_forecast(rule, "BTC", [price.iloc[:15000]])
+
+    changed_price = price.copy()
+    changed_price.iloc[100] = 1.0
+    pd.testing.assert_series_equal(
+        cache.get_forecast(rule, "BTC", [changed_price]),
+        ewmac(changed_price, fast=16, slow=64),
+    )
+
+    other_rule = fakeTradingRule(ewmac, dict(fast=32, slow=128))
+    pd.testing.assert_series_equal(
+        cache.get_forecast(other_rule, "BTC", [price]),
+        ewmac(price, fast=32, slow=128),
+    )
+
+
+def test_least_recently_used_are_evicted(tmp_path, price):
+    cache = _cache(tmp_path, max_size_mb=0.5)
+    for fast in [2, 4, 8, 16]:
+        rule = fakeTradingRule(ewmac, dict(fast=fast, slow=64))
+        cache.get_forecast(rule, "BTC", [price])
+
+    assert cache.size_in_bytes() <= 0.5 * 1024 * 1024
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    cache.get_forecast(rule, "BTC", [price])
+    assert rule.number_of_calls == 0
+
+
+def test_each_entry_is_one_file(tmp_path, price):
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    cache = _cache(tmp_path)
+    cache.get_forecast(rule, "BTC", [price.iloc[:15000]])
+    cache.get_forecast(rule, "BTC", [price])
+
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_unreadable_entry_is_recalculated(tmp_path, price):
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    cache = _cache(tmp_path)
+    cache.get_forecast(rule, "BTC", [price])
+    [filename] = os.listdir(tmp_path)
+    with open(tmp_path / filename, "wb") as forecast_file:
+        forecast_file.write(b"not a forecast")
+
+    pd.testing.assert_series_equal(
+        cache.get_forecast(rule, "BTC", [price]), ewmac(price, fast=16, slow=64)
+    )
+    assert rule.number_of_calls == 2
+
+
+HELPER_SOURCE = """
+def helper(price):
+    return price.ewm(span=%d).mean()
+"""
+
+RULE_SOURCE = """
+from cache_key_helper import helper
+
+
+def rule_using_helper(price):
+    return price - helper(price)
+"""
+
+
+def test_key_changes_when_helper_module_is_edited(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    helper_filename = tmp_path / "cache_key_helper.py"
+    helper_filename.write_text(HELPER_SOURCE % 16)
+    (tmp_path / "cache_key_rule.py").write_text(RULE_SOURCE)
+    for module_name in ["cache_key_helper", "cache_key_rule"]:
+        monkeypatch.delitem(sys.modules, module_name, raising=False)
+    rule_module = importlib.import_module("cache_key_rule")
+
+    rule = fakeTradingRule(rule_module.rule_using_helper, {})
+    key = key_for_trading_rule(rule, instrument_code="BTC")
+    assert key_for_trading_rule(rule, instrument_code="BTC") == key
+
+    helper_filename.write_text(HELPER_SOURCE % 32)
+    # same size, so make sure the modification time is different
+    helper_stat = os.stat(helper_filename)
+    os.utime(
+        helper_filename,
+        ns=(helper_stat.st_atime_ns, helper_stat.st_mtime_ns + 1000000),
+    )
+
+    assert key_for_trading_rule(rule, instrument_code="BTC") != key
+
+
+def test_forecast_with_index_not_in_nanoseconds_round_trips(tmp_path, price):
+    # as pd.read_parquet returns them
+    price = price.copy()
+    price.index = price.index.as_unit("us")
+    rule = fakeTradingRule(ewmac, dict(fast=16, slow=64))
+    _cache(tmp_path, warmup_bars=2000).get_forecast(rule, "BTC", [price.iloc[:15000]])
+
+    for data_for_call in [price.iloc[:15000], price]:
+        pd.testing.assert_series_equal(
+            _cache(tmp_path, warmup_bars=2000).get_forecast(
+                rule, "BTC", [data_for_call]
+            ),
+            ewmac(data_for_call, fast=16, slow=64),
+            check_exact=False,
+            atol=1e-9,
+            check_freq=False,
+        )
+    assert rule.number_of_calls == 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysdata.config.configdata import Config
+from sysdata.sim.sim_data import simData
+from systems.basesystem import System
+from private.systems.crypto_2024.forecast_combine import ForecastCombine
+from private.systems.crypto_2024.forecast_mapping import (
+    estimate_mapping_params,
+    map_forecast_value,
+    map_forecast_value_scalar,
+)
+from private.systems.crypto_2024.forecast_scale_cap import ForecastScaleCap
+
+
+def forecast_combine(forecast_cap: float, **forecast_mapping) -> ForecastCombine:
+    system = System(
+        [ForecastScaleCap(), ForecastCombine()],
+        data=simData(),
+        config=Config(
+            dict(forecast_cap=forecast_cap, forecast_mapping=forecast_mapping)
+        ),
+    )
+
+    return system.combForecast
+
+
+def test_mapping_whole_series_matches_one_value_at_a_time():
+    a_param, b_param, threshold, capped_value = estimate_mapping_params(1.5)
+    rng = np.random.default_rng(0)
+    values = np.concatenate(
+        [
+            rng.standard_normal(10000) * 15.0,
+            [0.0, -0.0, np.nan, threshold, -threshold, capped_value, -capped_value],
+            [np.nextafter(capped_value, np.inf), np.inf, -np.inf],
+        ]
+    )
+    x = pd.Series(
+        values, index=pd.date_range("2024-01-01", periods=len(values), freq="min")
+    )
+    kwargs = dict(
+        threshold=threshold,
+        capped_value=capped_value,
+        a_param=a_param,
+        b_param=b_param,
+    )
+
+    mapped = map_forecast_value(x, **kwargs)
+    mapped_one_at_a_time = x.apply(map_forecast_value_scalar, **kwargs)
+
+    pd.testing.assert_series_equal(mapped, mapped_one_at_a_time, rtol=0, atol=0)
+
+
+def test_mapping_parameters_are_estimated_from_a_param():
+    combine = forecast_combine(20.0, BTC=dict(a_param=1.5))
+    a_param, b_param, threshold, capped_value = estimate_mapping_params(1.5)
+
+    assert combine._get_forecast_mapping_parameters("BTC") == dict(
+        threshold=threshold, a_param=a_param, b_param=b_param
+    )
+    assert combine._get_forecast_mapping_parameters("ETH") is None
+
+
+def test_estimated_mapping_needs_the_forecast_cap_it_was_fitted_for():
+    with pytest.raises(AssertionError):
+        estimate_mapping_params(1.5, capped_value=30.0)
+
+    combine = forecast_combine(30.0, BTC=dict(a_param=1.5))
+    with pytest.raises(AssertionError):
+        combine._get_forecast_mapping_parameters("BTC")
+
+
+@pytest.mark.parametrize(
+    "partial_configuration", [dict(threshold=5.0), dict(b_param=2.0)]
+)
+def test_threshold_or_b_param_on_its_own_is_rejected(partial_configuration):
+    combine = forecast_combine(20.0, BTC=dict(a_param=1.5, **partial_configuration))
+
+    with pytest.raises(Exception, match="needs both threshold and b_param"):
+        combine._get_forecast_mapping_parameters("BTC")
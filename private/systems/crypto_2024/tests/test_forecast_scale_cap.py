@@ -0,0 +1,41 @@
+import pytest
+
+from sysdata.config.configdata import Config
+from sysdata.sim.sim_data import simData
+from systems.basesystem import System
+from private.systems.crypto_2024.forecast_scale_cap import ForecastScaleCap
+
+DEFAULT_FUNC = "sysquant.estimators.forecast_scalar.forecast_scalar"
+DEFAULT_BATCHED_FUNC = (
+    "sysquant.estimators.batched_forecast_scalar.batched_forecast_scalars"
+)
+CUSTOM_FUNC = "sysquant.estimators.vol.robust_vol_calc"
+CUSTOM_BATCHED_FUNC = "sysquant.estimators.vol.mixed_vol_calc"
+
+
+@pytest.fixture(scope="module")
+def forecast_scale_cap():
+    system = System([ForecastScaleCap()], data=simData(), config=Config(dict()))
+
+    return system.forecastScaleCap
+
+
+@pytest.mark.parametrize(
+    "func, batched_func, use_batched_func",
+    [
+        (DEFAULT_FUNC, DEFAULT_BATCHED_FUNC, True),
+        (DEFAULT_FUNC, None, False),
+        # only func changed, so the default batched_func is inherited
+        (CUSTOM_FUNC, DEFAULT_BATCHED_FUNC, False),
+        (CUSTOM_FUNC, CUSTOM_BATCHED_FUNC, True),
+    ],
+)
+def test_batched_func_only_replaces_the_func_it_batches(
+    forecast_scale_cap, func, batched_func, use_batched_func
+):
+    forecast_scalar_config = dict(func=func, batched_func=batched_func)
+
+    assert (
+        forecast_scale_cap._use_batched_forecast_scalar_function(forecast_scalar_config)
+        is use_batched_func
+    )
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysdata.config.configdata import Config
+from sysdata.sim.sim_data import simData
+from syscore.pandas.chunked_window import chunkedDiff, run_in_chunks
+from systems.basesystem import System
+from private.systems.crypto_2024.forecasting import Rules
+from private.systems.crypto_2024.trading_rules import (
+    TradingRule,
+    group_trading_rules_into_families,
+)
+
+MINUTE_PRICES = "data.minute_prices"
+HOURLY_PRICES = "data.hourly_prices"
+
+
+def ewmac(price, fast=4, slow=16):
+    return price.ewm(span=fast).mean() - price.ewm(span=slow).mean()
+
+
+def ewmac_for_fasts(price, list_of_fast: list, slow=16) -> list:
+    ewmac_for_fasts.list_of_calls.append(list_of_fast)
+    return [ewmac(price, fast=fast, slow=slow) for fast in list_of_fast]
+
+
+ewmac.family_argument = "fast"
+ewmac.family_function = ewmac_for_fasts
+
+
+def momentum(price, lookback=10):
+    return price.diff(lookback)
+
+
+def momentum_in_chunks(price, lookback=10, chunk_size: int = 1000):
+    momentum_in_chunks.list_of_chunk_sizes.append(chunk_size)
+    return run_in_chunks(chunkedDiff(lookback).process, price, chunk_size=chunk_size)
+
+
+momentum.chunked_function = momentum_in_chunks
+
+
+def rule(function, data=MINUTE_PRICES, **other_args) -> TradingRule:
+    return TradingRule(dict(function=function, data=[data], other_args=other_args))
+
+
+TRADING_RULES = dict(
+    ewmac2=rule(ewmac, fast=2),
+    ewmac4=rule(ewmac, fast=4),
+    ewmac8=rule(ewmac, fast=8),
+    ewmac4_slow64=rule(ewmac, fast=4, slow=64),
+    momentum10=rule(momentum, lookback=10),
+)
+
+
+class minutePricesData(simData):
+    def __init__(self, price: pd.Series):
+        super().__init__()
+        self._price = price
+
+    def minute_prices(self, instrument_code: str) -> pd.Series:
+        return self._price
+
+
+@pytest.fixture
+def price():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2024-01-01", periods=2000, freq="min", tz="utc")
+
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.001, 2000))), index)
+
+
+@pytest.fixture
+def chunk_sizes_used():
+    momentum_in_chunks.list_of_chunk_sizes = []
+
+    return momentum_in_chunks.list_of_chunk_sizes
+
+
+@pytest.fixture
+def family_calls():
+    ewmac_for_fasts.list_of_calls = []
+
+    return ewmac_for_fasts.list_of_calls
+
+
+def rules_stage(
+    price: pd.Series, trading_rules: dict = TRADING_RULES, **config_items
+) -> Rules:
+    system = System(
+        [Rules(trading_rules)],
+        data=minutePricesData(price),
+        config=Config(config_items),
+    )
+
+    return system.rules
+
+
+def test_variations_differing_only_by_family_argument_are_grouped():
+    trading_rules = dict(
+        TRADING_RULES,
+        ewmac8_slow64=rule(ewmac, fast=8, slow=64),
+        # different data
+        ewmac2_hourly=rule(ewmac, data=HOURLY_PRICES, fast=2),
+        # no family argument to vary
+        ewmac_default_fast=rule(ewmac, slow=16),
+        # no family function
+        momentum20=rule(momentum, lookback=20),
+    )
+
+    assert group_trading_rules_into_families(trading_rules) == dict(
+        ewmac2=["ewmac2", "ewmac4", "ewmac8"],
+        ewmac4_slow64=["ewmac4_slow64", "ewmac8_slow64"],
+    )
+
+
+def test_family_is_calculated_once_for_all_its_variations(price, family_calls):
+    rules = rules_stage(price)
+
+    for rule_variation_name, fast in [("ewmac8", 8), ("ewmac2", 2), ("ewmac4", 4)]:
+        pd.testing.assert_series_equal(
+            rules.get_raw_forecast("BTC", rule_variation_name),
+            ewmac(price, fast=fast),
+        )
+    assert family_calls == [[2, 4, 8]]
+
+    # on its own, with a single variation of slow=64
+    pd.testing.assert_series_equal(
+        rules.get_raw_forecast("BTC", "ewmac4_slow64"), ewmac(price, fast=4, slow=64)
+    )
+    pd.testing.assert_series_equal(
+        rules.get_raw_forecast("BTC", "momentum10"), momentum(price, lookback=10)
+    )
+    assert family_calls == [[2, 4, 8]]
+
+
+def test_disk_cache_calculates_only_missing_variations_as_a_family(
+    price, family_calls, tmp_path
+):
+    forecast_disk_cache = dict(datapath=str(tmp_path))
+    rules = rules_stage(price, forecast_disk_cache=forecast_disk_cache)
+    rules.get_raw_forecast("BTC", "ewmac2")
+    assert family_calls == [[2, 4, 8]]
+
+    # a new backtest, with another variation in the family
+    trading_rules = dict(TRADING_RULES, ewmac16=rule(ewmac, fast=16))
+    rules = rules_stage(
+        price, trading_rules=trading_rules, forecast_disk_cache=forecast_disk_cache
+    )
+    for rule_variation_name, fast in [("ewmac2", 2), ("ewmac16", 16), ("ewmac8", 8)]:
+        pd.testing.assert_series_equal(
+            rules.get_raw_forecast("BTC", rule_variation_name),
+            ewmac(price, fast=fast),
+            check_freq=False,
+        )
+    assert family_calls == [[2, 4, 8], [16]]
+
+
+def test_rules_with_chunked_function_run_in_chunks_when_configured(
+    price, family_calls, chunk_sizes_used
+):
+    rules = rules_stage(price)
+    rules.get_raw_forecast("BTC", "momentum10")
+    assert chunk_sizes_used == []
+
+    rules = rules_stage(price, rule_chunk_size=300)
+    pd.testing.assert_series_equal(
+        rules.get_raw_forecast("BTC", "momentum10"),
+        momentum(price, lookback=10),
+        check_freq=False,
+    )
+    assert chunk_sizes_used == [300]
+
+    # rules without a chunked function are unaffected
+    pd.testing.assert_series_equal(
+        rules.get_raw_forecast("BTC", "ewmac2"), ewmac(price, fast=2)
+    )
+    assert family_calls == [[2, 4, 8]]
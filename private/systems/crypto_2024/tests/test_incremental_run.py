@@ -0,0 +1,157 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from systems.system_cache import cacheElement, cacheRef
+from private.systems.crypto_2024.incremental_run import (
+    refresh_system_incrementally_given_previous_cache,
+    splice_summary,
+)
+
+INSTRUMENTS = ["BTC", "ETH"]
+
+
+class fakeConfig(object):
+    start_date = None
+
+
+class fakePositionSize(object):
+    ## raw data, forecast, scaling and position, like the real stages but smaller
+    def __init__(self, system):
+        self._system = system
+
+    def get_subsystem_position(self, instrument_code):
+        # depends on the whole history, so can't be spliced
+        self._cached(
+            "get_expanding_forecast_scalar",
+            instrument_code,
+            lambda: 10.0 / self.get_forecast(instrument_code).abs().expanding().mean(),
+        )
+
+        return self._cached(
+            "get_subsystem_position",
+            instrument_code,
+            lambda: 10.0
+            * self.get_forecast(instrument_code)
+            / self.get_vol(instrument_code),
+        )
+
+    def get_forecast(self, instrument_code):
+        return self._cached(
+            "get_forecast",
+            instrument_code,
+            lambda: self.get_price(instrument_code).ewm(span=16).mean()
+            - self.get_price(instrument_code).ewm(span=64).mean(),
+        )
+
+    def get_vol(self, instrument_code):
+        return self._cached(
+            "get_vol",
+            instrument_code,
+            lambda: self.get_price(instrument_code).diff().ewm(span=35).std(),
+        )
+
+    def get_price(self, instrument_code):
+        price = self._system.prices[instrument_code]
+        start_date = self._system.config.start_date
+        if start_date is not None:
+            price = price[start_date:]
+
+        return price
+
+    def _cached(self, itemname, instrument_code, calculation):
+        cache_ref = cacheRef("positionSize", itemname, instrument_code)
+        if cache_ref not in self._system.cache:
+            self._system.cache[cache_ref] = cacheElement(calculation())
+
+        return self._system.cache[cache_ref].value
+
+
+class fakeSystem(object):
+    def __init__(self, prices):
+        self.prices = prices
+        self.cache = {}
+        self.config = fakeConfig()
+        self.log = logging.getLogger("fakeSystem")
+        self.positionSize = fakePositionSize(self)
+
+    def get_instrument_list(self):
+        return INSTRUMENTS
+
+
+@pytest.fixture(scope="module")
+def prices():
+    rng = np.random.default_rng(4)
+    index = pd.date_range("2024-01-01", periods=20000, freq="min", tz="utc")
+
+    return dict(
+        [
+            (
+                instrument_code,
+                pd.Series(100 + np.cumsum(rng.normal(0, 0.1, len(index))), index),
+            )
+            for instrument_code in INSTRUMENTS
+        ]
+    )
+
+
+def test_incremental_refresh_matches_full_recompute(prices):
+    previous_prices = dict(
+        [(code, price.iloc[:15000]) for code, price in prices.items()]
+    )
+    previous_system = fakeSystem(previous_prices)
+    for instrument_code in INSTRUMENTS:
+        previous_system.positionSize.get_subsystem_position(instrument_code)
+
+    refreshed_system = refresh_system_incrementally_given_previous_cache(
+        fakeSystem,
+        previous_cache_items=previous_system.cache,
+        warmup=pd.Timedelta("3000min"),
+        prices=prices,
+    )
+    spliced_itemnames = set(
+        [cache_ref.itemname for cache_ref in refreshed_system.cache.keys()]
+    )
+    assert spliced_itemnames == {"get_subsystem_position", "get_forecast", "get_vol"}
+
+    full_system = fakeSystem(prices)
+    for instrument_code in INSTRUMENTS:
+        full_system.positionSize.get_subsystem_position(instrument_code)
+
+    for cache_ref, cache_element in full_system.cache.items():
+        refreshed_system.positionSize.get_subsystem_position(cache_ref.instrument_code)
+        pd.testing.assert_series_equal(
+            refreshed_system.cache[cache_ref].value,
+            cache_element.value,
+            check_exact=False,
+            rtol=1e-8,
+            atol=1e-8,
+            check_freq=False,
+        )
+
+
+def test_splice_summary_counts_spliced_and_recalculated_results_by_item():
+    tail_cache_items = dict(
+        [
+            (cacheRef("positionSize", itemname, instrument_code), cacheElement(None))
+            for itemname in ["get_forecast", "get_expanding_forecast_scalar"]
+            for instrument_code in INSTRUMENTS
+        ]
+    )
+    spliced_cache_items = dict(
+        [
+            (cache_ref, cache_element)
+            for cache_ref, cache_element in tail_cache_items.items()
+            if cache_ref.itemname == "get_forecast"
+        ]
+    )
+
+    summary = splice_summary(spliced_cache_items, tail_cache_items=tail_cache_items)
+
+    assert summary.loc[("positionSize", "get_forecast")].tolist() == [2, 0]
+    assert summary.loc[("positionSize", "get_expanding_forecast_scalar")].tolist() == [
+        0,
+        2,
+    ]
@@ -0,0 +1,183 @@
+import os
+
+import pytest
+
+from sysdata.config.configdata import Config
+from systems.basesystem import ALL_KEYNAME
+from systems.system_cache import cacheElement, cacheRef
+from private.systems.crypto_2024.parallel import (
+    calculate_subsystem_positions_in_parallel,
+    merge_cache_items_into_system,
+)
+
+
+class fakeStage(object):
+    ## caches like the real stages, with the process each result was calculated in
+    stage_name = "fake"
+
+    def __init__(self, system):
+        self._system = system
+
+    def _cached(self, itemname, instrument_code, calculation, not_pickable=False):
+        cache_ref = cacheRef(self.stage_name, itemname, instrument_code)
+        cache = self._system.cache
+        if cache_ref not in cache:
+            cache[cache_ref] = cacheElement(calculation(), not_pickable=not_pickable)
+
+        return cache[cache_ref].value
+
+
+class fakeRules(fakeStage):
+    stage_name = "rules"
+
+    def get_raw_forecast(self, instrument_code, rule_variation_name):
+        return self._cached(
+            "get_raw_forecast",
+            instrument_code,
+            lambda: (len(instrument_code), os.getpid()),
+        )
+
+
+class fakeCombForecast(fakeStage):
+    stage_name = "combForecast"
+
+    def get_trading_rule_list(self, instrument_code):
+        return ["ewmac"]
+
+
+class fakeForecastScaleCap(fakeStage):
+    stage_name = "forecastScaleCap"
+
+    def get_forecast_scalar(self, instrument_code, rule_variation_name):
+        if not self._system.config.use_forecast_scale_estimates:
+            return (1.0, os.getpid())
+
+        # pooled, so needs the raw forecasts of every instrument
+        return self._cached(
+            "_get_forecast_scalar_estimated_from_instrument_code",
+            ALL_KEYNAME,
+            lambda: (
+                sum(
+                    self._system.rules.get_raw_forecast(code, rule_variation_name)[0]
+                    for code in self._system.get_instrument_list()
+                ),
+                os.getpid(),
+            ),
+        )
+
+
+class fakePositionSize(fakeStage):
+    stage_name = "positionSize"
+
+    def get_subsystem_position(self, instrument_code):
+        raw_forecast, _ = self._system.rules.get_raw_forecast(instrument_code, "ewmac")
+        forecast_scalar, scalar_pid = self._system.forecastScaleCap.get_forecast_scalar(
+            instrument_code, "ewmac"
+        )
+        self._cached("simulator", instrument_code, lambda: lambda x: x, True)
+
+        return self._cached(
+            "get_subsystem_position",
+            instrument_code,
+            lambda: (raw_forecast * forecast_scalar, os.getpid(), scalar_pid),
+        )
+
+
+class fakeSystem(object):
+    def __init__(self, instrument_list, use_forecast_scale_estimates):
+        self.cache = {}
+        self.config = Config(
+            dict(
+                use_forecast_scale_estimates=use_forecast_scale_estimates,
+                forecast_scalar_estimate=dict(pool_instruments=True),
+            )
+        )
+        self.rules = fakeRules(self)
+        self.combForecast = fakeCombForecast(self)
+        self.forecastScaleCap = fakeForecastScaleCap(self)
+        self.positionSize = fakePositionSize(self)
+        self._instrument_list = instrument_list
+
+    def get_instrument_list(self):
+        return self._instrument_list
+
+
+INSTRUMENTS = ["BTC", "ETH", "SOL", "DOGE", "XRP", "LINK"]
+
+
+def fake_system_function(
+    instrument_list=INSTRUMENTS, use_forecast_scale_estimates=False
+):
+    return fakeSystem(instrument_list, use_forecast_scale_estimates)
+
+
+def position_ref(instrument_code):
+    return cacheRef("positionSize", "get_subsystem_position", instrument_code)
+
+
+@pytest.mark.parametrize("use_forecast_scale_estimates", [False, True])
+def test_worker_cache_entries_are_merged_into_parent(use_forecast_scale_estimates):
+    system = fake_system_function(
+        use_forecast_scale_estimates=use_forecast_scale_estimates
+    )
+    calculate_subsystem_positions_in_parallel(
+        system,
+        fake_system_function,
+        n_threads=3,
+        use_forecast_scale_estimates=use_forecast_scale_estimates,
+    )
+
+    for instrument_code in INSTRUMENTS:
+        position, worker_pid, _ = system.cache[position_ref(instrument_code)].value
+        expected_position = system_position(
+            instrument_code, use_forecast_scale_estimates
+        )
+        assert position == expected_position
+        assert worker_pid != os.getpid()
+
+        # not pickable items stay in the workers
+        assert (
+            cacheRef("positionSize", "simulator", instrument_code) not in system.cache
+        )
+
+
+def system_position(instrument_code, use_forecast_scale_estimates):
+    system = fake_system_function(
+        use_forecast_scale_estimates=use_forecast_scale_estimates
+    )
+    return system.positionSize.get_subsystem_position(instrument_code)[0]
+
+
+def test_pooled_forecast_scalars_are_estimated_once_in_the_parent():
+    system = fake_system_function(use_forecast_scale_estimates=True)
+    calculate_subsystem_positions_in_parallel(
+        system,
+        fake_system_function,
+        n_threads=3,
+        use_forecast_scale_estimates=True,
+    )
+
+    for instrument_code in INSTRUMENTS:
+        _, raw_forecast_pid = system.cache[
+            cacheRef("rules", "get_raw_forecast", instrument_code)
+        ].value
+        assert raw_forecast_pid != os.getpid()
+
+        # the workers used the scalar from the parent, rather than estimating their own
+        _, _, scalar_pid = system.cache[position_ref(instrument_code)].value
+        assert scalar_pid == os.getpid()
+
+
+def test_merge_never_overwrites_parent_cache():
+    system = fake_system_function()
+    pooled_ref = cacheRef("forecastScaleCap", "pooled_scalar", ALL_KEYNAME)
+    new_ref = cacheRef("forecastScaleCap", "new", ALL_KEYNAME)
+    system.cache[pooled_ref] = cacheElement(1.0)
+
+    merge_cache_items_into_system(
+        system,
+        {pooled_ref: cacheElement(2.0), new_ref: cacheElement(3.0)},
+    )
+
+    assert system.cache[pooled_ref].value == 1.0
+    assert system.cache[new_ref].value == 3.0
@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.constants import arg_not_supplied
+from syscore.pandas.step_function import stepFunctionSeries
+from sysdata.config.configdata import Config
+from sysdata.sim.sim_data import simData
+from sysquant.estimators.correlations import CorrelationList, correlationEstimate
+from sysquant.fitting_dates import fitDates, listOfFittingDates
+from systems.basesystem import System
+from private.systems.crypto_2024.portfolio import Portfolios
+from private.systems.crypto_2024.risk_overlay import (
+    positions_of_risk_overlay_schedule,
+)
+
+INSTRUMENTS = ["BTC", "ETH"]
+NUMBER_OF_BARS = 2000
+VOL_JUMP_BAR = 1010
+
+RISK_OVERLAY_CONFIG = dict(
+    max_risk_fraction_normal_risk=1.0,
+    max_risk_fraction_stdev_risk=3.0,
+    max_risk_limit_sum_abs_risk=2.0,
+    max_risk_leverage=2.0,
+    every_n_bars=24,
+    vol_change_trigger=0.2,
+)
+
+
+def _fake_inputs():
+    rng = np.random.default_rng(11)
+    index = pd.date_range("2024-01-01", periods=NUMBER_OF_BARS, freq="h")
+
+    positions = {}
+    values = {}
+    vol = {}
+    for instrument_code in INSTRUMENTS:
+        trades = rng.choice([-1.0, 0.0, 1.0], p=[0.05, 0.9, 0.05], size=len(index))
+        positions[instrument_code] = pd.Series(4.0 + np.cumsum(trades), index=index)
+        values[instrument_code] = pd.Series(
+            0.1 * np.exp(np.cumsum(rng.normal(0.0, 0.002, len(index)))), index=index
+        )
+        vol[instrument_code] = pd.Series(
+            0.5 * np.exp(np.cumsum(rng.normal(0.0, 0.005, len(index)))), index=index
+        )
+    vol["BTC"].iloc[VOL_JUMP_BAR:] *= 1.5
+
+    correlation_start = index[200]
+    correlations = CorrelationList(
+        corr_list=[
+            correlationEstimate(np.array([[1.0, 0.6], [0.6, 1.0]]), columns=INSTRUMENTS)
+        ],
+        column_names=INSTRUMENTS,
+        fit_dates=listOfFittingDates(
+            [
+                fitDates(
+                    fit_start=index[0],
+                    fit_end=correlation_start,
+                    period_start=correlation_start,
+                    period_end=index[-1],
+                )
+            ]
+        ),
+    )
+
+    return index, positions, values, vol, correlations
+
+
+class portfoliosWithFakeInputs(Portfolios):
+    def __init__(self):
+        super().__init__()
+        (
+            self._index,
+            self._positions,
+            self._values,
+            self._vol,
+            self._correlations,
+        ) = _fake_inputs()
+
+    def get_instrument_list(
+        self, for_instrument_weights=False, auto_remove_bad_instruments=False
+    ) -> list:
+        return INSTRUMENTS
+
+    def get_notional_position_before_risk_scaling_as_step_function(
+        self, instrument_code: str
+    ) -> stepFunctionSeries:
+        return stepFunctionSeries.from_series(self._positions[instrument_code])
+
+    def get_per_contract_value_as_proportion_of_capital(
+        self, instrument_code: str
+    ) -> pd.Series:
+        return self._values[instrument_code]
+
+    def annualised_percentage_vol(self, instrument_code: str) -> pd.Series:
+        return self._vol[instrument_code]
+
+    def get_list_of_instrument_returns_correlations(
+        self, correlation_estimation_parameters: dict = arg_not_supplied
+    ) -> CorrelationList:
+        return self._correlations
+
+    def get_percentage_vol_target(self) -> float:
+        return 20.0
+
+
+def _portfolio() -> portfoliosWithFakeInputs:
+    config = Config(dict(instruments=INSTRUMENTS, risk_overlay=RISK_OVERLAY_CONFIG))
+    system = System([portfoliosWithFakeInputs()], data=simData(), config=config)
+
+    return system.portfolio
+
+
+@pytest.fixture(scope="module")
+def portfolio():
+    return _portfolio()
+
+
+def test_scalar_calculated_every_bar_is_per_bar_scalar(portfolio):
+    per_bar_risk_scalar = portfolio.get_per_bar_risk_scalar()
+    schedule = portfolio.get_risk_overlay_schedule_given_parameters(every_n_bars=1)
+
+    assert len(schedule) == NUMBER_OF_BARS
+    # the test data should need some scaling
+    assert per_bar_risk_scalar.min() < 1.0
+    pd.testing.assert_series_equal(
+        portfolio.get_risk_scalar_for_schedule(schedule), per_bar_risk_scalar
+    )
+
+
+@pytest.mark.parametrize(
+    "every_n_bars, vol_change_trigger", [(24, arg_not_supplied), (24, 0.2), (7, 0.2)]
+)
+def test_scheduled_scalar_is_per_bar_scalar_carried_forward(
+    portfolio, every_n_bars, vol_change_trigger
+):
+    per_bar_risk_scalar = portfolio.get_per_bar_risk_scalar()
+    schedule = portfolio.get_risk_overlay_schedule_given_parameters(
+        every_n_bars=every_n_bars, vol_change_trigger=vol_change_trigger
+    )
+    scheduled_risk_scalar = portfolio.get_risk_scalar_for_schedule(schedule)
+
+    expected = (
+        per_bar_risk_scalar.reindex(schedule).reindex(per_bar_risk_scalar.index).ffill()
+    )
+    pd.testing.assert_series_equal(scheduled_risk_scalar, expected)
+    assert (scheduled_risk_scalar != per_bar_risk_scalar).any()
+
+
+def test_vol_change_adds_calculation_to_schedule(portfolio):
+    index = portfolio.common_index()
+    every_24_bars = portfolio.get_risk_overlay_schedule_given_parameters(
+        every_n_bars=24
+    )
+    with_vol_trigger = portfolio.get_risk_overlay_schedule_given_parameters(
+        every_n_bars=24, vol_change_trigger=0.2
+    )
+
+    assert index[VOL_JUMP_BAR] not in every_24_bars
+    assert index[VOL_JUMP_BAR] in with_vol_trigger
+
+
+def test_risk_scalar_uses_schedule_from_config(portfolio):
+    schedule = portfolio.get_risk_overlay_schedule_given_parameters(
+        every_n_bars=RISK_OVERLAY_CONFIG["every_n_bars"],
+        vol_change_trigger=RISK_OVERLAY_CONFIG["vol_change_trigger"],
+    )
+
+    pd.testing.assert_index_equal(portfolio.get_risk_overlay_schedule(), schedule)
+    pd.testing.assert_series_equal(
+        portfolio.get_risk_scalar(), portfolio.get_risk_scalar_for_schedule(schedule)
+    )
+
+
+def test_scheduled_risk_scalar_does_not_use_weights_for_every_bar(monkeypatch):
+    def for_every_bar(*args, **kwargs):
+        raise Exception("Not needed for a risk overlay on a schedule")
+
+    for method_name in [
+        "get_original_portfolio_weight_df",
+        "get_per_contract_value_as_proportion_of_capital_df",
+    ]:
+        monkeypatch.setattr(portfoliosWithFakeInputs, method_name, for_every_bar)
+
+    assert len(_portfolio().get_risk_scalar()) == NUMBER_OF_BARS
+
+
+def test_drift_report(portfolio):
+    per_bar_risk_scalar = portfolio.get_per_bar_risk_scalar()
+    drift_report = portfolio.risk_scalar_drift_for_schedules(
+        list_of_every_n_bars=[1, 24]
+    )
+
+    assert list(drift_report.index) == [1, 24]
+    assert drift_report.loc[1, "number_of_calculations"] == NUMBER_OF_BARS
+    assert drift_report.loc[1, "max_abs_drift"] == 0.0
+    assert drift_report.loc[1, "proportion_of_bars_with_drift"] == 0.0
+
+    schedule = portfolio.get_risk_overlay_schedule_given_parameters(every_n_bars=24)
+    drift = portfolio.get_risk_scalar_for_schedule(schedule) - per_bar_risk_scalar
+    assert drift_report.loc[24, "number_of_calculations"] == len(
+        range(0, NUMBER_OF_BARS, 24)
+    )
+    assert drift_report.loc[24, "max_abs_drift"] == pytest.approx(drift.abs().max())
+    assert drift_report.loc[24, "max_positive_drift"] == pytest.approx(drift.max())
+    assert drift_report.loc[24, "mean_abs_drift"] == pytest.approx(drift.abs().mean())
+    assert drift_report.loc[24, "max_abs_drift"] > 0.0
+
+
+def test_schedule_must_have_at_least_one_bar_between_calculations():
+    with pytest.raises(Exception):
+        positions_of_risk_overlay_schedule(10, every_n_bars=0)
@@ -95,15 +95,28 @@ class TradingRule(object):
     def __repr__(self):
         return _repr_trading_rule(self)
 
-    def call(self, system: "System", instrument_code: str) -> pd.Series:
+    def call(
+        self,
+        system: "System",
+        instrument_code: str,
+        forecast_disk_cache=arg_not_supplied,
+    ) -> pd.Series:
         """
         Actually call a trading rule
 
-        To do this we need some data from the system
+        To do this we need some data from the system; if a forecastDiskCache is passed
+        the rule is only called if the cache doesn't already have the answer
         """
 
         list_of_data_for_call = self._get_data_from_system(system, instrument_code)
-        result = self._call_with_data(list_of_data_for_call)
+        if forecast_disk_cache is arg_not_supplied:
+            result = self.call_with_data(list_of_data_for_call)
+        else:
+            result = forecast_disk_cache.get_forecast(
+                self,
+                instrument_code=instrument_code,
+                list_of_data_for_call=list_of_data_for_call,
+            )
 
         # Check for all zeros
         # result = replace_all_zeros_with_nan(result)
@@ -164,11 +177,148 @@ class TradingRule(object):
 
         return list_of_data_for_call
 
-    def _call_with_data(self, list_of_data_for_call: list) -> pd.Series:
+    def call_with_data(self, list_of_data_for_call: list) -> pd.Series:
         other_args = self.other_args
         result = self.function(*list_of_data_for_call, **other_args)
         return result
 
+    def call_for_family(
+        self,
+        system: "System",
+        instrument_code: str,
+        list_of_family_values: list,
+        forecast_disk_cache=arg_not_supplied,
+    ) -> list:
+        """
+        Call the rule for several values of its family argument at once, with the
+        family function of the rule (see group_trading_rules_into_families)
+
+        Returns a list of forecasts, one for each value, in the same order. If a
+        forecastDiskCache is passed, only the values it doesn't have are calculated
+        """
+
+        list_of_data_for_call = self._get_data_from_system(system, instrument_code)
+        if forecast_disk_cache is arg_not_supplied:
+            return self._call_family_function_with_data(
+                list_of_data_for_call, list_of_family_values
+            )
+
+        family_argument = self.function.family_argument
+        list_of_trading_rules = [
+            self._variation_with_family_value(family_value)
+            for family_value in list_of_family_values
+        ]
+
+        return forecast_disk_cache.get_forecasts(
+            list_of_trading_rules,
+            instrument_code=instrument_code,
+            list_of_data_for_call=list_of_data_for_call,
+            calculate_forecasts=lambda list_of_missing_rules: (
+                self._call_family_function_with_data(
+                    list_of_data_for_call,
+                    [
+                        trading_rule.other_args[family_argument]
+                        for trading_rule in list_of_missing_rules
+                    ],
+                )
+            ),
+        )
+
+    def _call_family_function_with_data(
+        self, list_of_data_for_call: list, list_of_family_values: list
+    ) -> list:
+        other_args = copy(self.other_args)
+        other_args.pop(self.function.family_argument)
+
+        return self.function.family_function(
+            *list_of_data_for_call, list_of_family_values, **other_args
+        )
+
+    def _variation_with_family_value(self, family_value) -> "TradingRule":
+        variation = copy(self)
+        variation._other_args = copy(self.other_args)
+        variation._other_args[self.function.family_argument] = family_value
+
+        return variation
+
+    @property
+    def has_chunked_function(self) -> bool:
+        return hasattr(self.function, "chunked_function")
+
+    def call_in_chunks(
+        self, system: "System", instrument_code: str, chunk_size: int
+    ) -> pd.Series:
+        """
+        Call the chunked version of the rule (its chunked_function attribute), which
+        runs over chunk_size bars at a time; see syscore.pandas.chunked_window. The
+        forecast matches that of call to within rounding
+        """
+
+        list_of_data_for_call = self._get_data_from_system(system, instrument_code)
+
+        return self.function.chunked_function(
+            *list_of_data_for_call, chunk_size=chunk_size, **self.other_args
+        )
+
+
+def group_trading_rules_into_families(trading_rules: dict) -> dict:
+    """
+    Find rule variations that can be evaluated together
+
+    A rule function can have a version that evaluates it for several values of one of
+    its arguments at once, sharing whatever work they have in common; the function then
+    has the attributes family_argument (eg "lookback") and family_function, called as
+    family_function(*data, list_of_values, **other_args).
+
+    Variations of such a function with the same data, data args, and other args
+    apart from the family argument form a family. Returns a dict of family name
+    (the name of its first variation) -> list of rule variation names, for families
+    of more than one variation.
+    """
+
+    variations_by_family_key = {}
+    for rule_variation_name, trading_rule in trading_rules.items():
+        family_key = _family_key_for_trading_rule(trading_rule)
+        if family_key is None:
+            continue
+        variations_by_family_key.setdefault(family_key, []).append(rule_variation_name)
+
+    rule_families = dict(
+        [
+            (list_of_rule_variations[0], list_of_rule_variations)
+            for list_of_rule_variations in variations_by_family_key.values()
+            if len(list_of_rule_variations) > 1
+        ]
+    )
+
+    return rule_families
+
+
+def _family_key_for_trading_rule(trading_rule: TradingRule):
+    function = trading_rule.function
+    family_argument = getattr(function, "family_argument", None)
+    if family_argument is None or not hasattr(function, "family_function"):
+        return None
+
+    other_args = trading_rule.other_args
+    if family_argument not in other_args:
+        return None
+
+    shared_other_args = sorted(
+        [
+            (arg_name, repr(arg_value))
+            for arg_name, arg_value in other_args.items()
+            if arg_name != family_argument
+        ]
+    )
+
+    return (
+        function,
+        tuple(trading_rule.data),
+        repr(trading_rule.data_args),
+        tuple(shared_other_args),
+    )
+
 
 def _repr_trading_rule(rule: TradingRule):
     data = rule.data
@@ -12,7 +12,7 @@ from private.systems.orion.accounts.order_simulator.simple_orders import (
     ListOfSimpleOrdersWithDate,
     SimpleOrderWithDate,
 )
-from sysobjects.fills import ListOfFills, Fill
+from sysobjects.fills import ListOfFills, ListOfFillsAsArrays, Fill
 from private.systems.orion.accounts.order_simulator.fills_and_orders import (
     ListOfSimpleOrdersAndResultingFill,
     empty_list_of_orders_with_no_fills,
@@ -109,6 +109,7 @@ class OrderSimulator:
         return self.cache.get(self._positions_orders_and_fills_from_series_data)
 
     def _positions_orders_and_fills_from_series_data(self) -> PositionsOrdersFills:
+        self._simulation_count = self.simulation_count + 1
         series_data = self.series_data
         return generate_positions_orders_and_fills_from_series_data(
             series_data=series_data,
@@ -125,7 +126,34 @@ class OrderSimulator:
 
     @property
     def cache(self) -> Cache:
-        return getattr(self, "_cache", Cache(self))
+        ## The simulator lives in the system cache, keyed on instrument_code and
+        ## is_subsystem, so this memoises each simulation for the whole backtest.
+        ## If the upstream unrounded positions change we start again.
+        upstream_positions = self.upstream_unrounded_positions()
+        cache = getattr(self, "_cache", None)
+        if cache is None or _positions_have_changed(
+            upstream_positions, self._upstream_positions_in_cache
+        ):
+            cache = Cache(self)
+            self._cache = cache
+            self._upstream_positions_in_cache = upstream_positions
+
+        return cache
+
+    def upstream_unrounded_positions(self) -> pd.Series:
+        if self.is_subsystem:
+            return self.system_accounts_stage.get_unrounded_subsystem_position_for_order_simulator(
+                self.instrument_code
+            )
+        else:
+            return self.system_accounts_stage.get_unrounded_instrument_position_for_order_simulator(
+                self.instrument_code
+            )
+
+    @property
+    def simulation_count(self) -> int:
+        ## number of times the path dependent simulation has actually been run
+        return getattr(self, "_simulation_count", 0)
 
     @property
     def orders_fills_function(self) -> Callable:
@@ -136,6 +164,15 @@ class OrderSimulator:
         return get_order_sim_daily_data_at_idx_point
 
 
+def _positions_have_changed(
+    upstream_positions: pd.Series, positions_in_cache: pd.Series
+) -> bool:
+    if upstream_positions is positions_in_cache:
+        return False
+
+    return not upstream_positions.equals(positions_in_cache)
+
+
 def generate_positions_orders_and_fills_from_series_data(
     series_data: OrdersSeriesData,
     passed_idx_data_function: Callable,
@@ -175,7 +212,8 @@ def generate_positions_orders_and_fills_from_series_data(
 
     positions = pd.Series(list_of_positions, master_index)
     list_of_orders = ListOfSimpleOrdersWithDate(list_of_orders)
-    list_of_fills = ListOfFills(list_of_fills)
+    # held as columns, so we don't keep an object for every fill
+    list_of_fills = ListOfFillsAsArrays.from_list_of_fills(list_of_fills)
 
     return PositionsOrdersFills(
         positions=positions, list_of_orders=list_of_orders, list_of_fills=list_of_fills
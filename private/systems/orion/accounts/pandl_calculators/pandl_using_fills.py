@@ -7,7 +7,12 @@ from private.systems.orion.accounts.pandl_calculators.pandl_calculation import (
     apply_weighting,
 )
 
-from sysobjects.fills import ListOfFills, Fill
+from sysobjects.fills import (
+    ListOfFills,
+    ListOfFillsAsArrays,
+    Fill,
+    fill_arrays_from_fills,
+)
 
 
 class pandlCalculationWithFills(pandlCalculation):
@@ -64,7 +69,7 @@ class pandlCalculationWithFills(pandlCalculation):
         if positions is arg_not_supplied:
             raise Exception("Need to pass fills or positions")
 
-        fills = ListOfFills.from_position_series_and_prices(
+        fills = ListOfFillsAsArrays.from_position_series_and_prices(
             positions=positions, price=self.price
         )
         return fills
@@ -126,9 +131,8 @@ def unique_trades_df(trade_df: pd.DataFrame) -> pd.DataFrame:
 
 
 def infer_positions_from_fills(fills: ListOfFills) -> pd.Series:
-    date_index = [fill.date for fill in fills]
-    qty_trade = [fill.qty for fill in fills]
-    trade_series = pd.Series(qty_trade, index=date_index)
+    fill_arrays = fill_arrays_from_fills(fills)
+    trade_series = pd.Series(fill_arrays["qty"], index=fill_arrays["date"])
     trade_series = trade_series.sort_index()
     position_series = trade_series.cumsum()
 
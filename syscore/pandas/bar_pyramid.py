@@ -0,0 +1,276 @@
+"""
+Minute bars aggregated to several bar sizes at once
+
+Each level is aggregated from the one below rather than from minutes, so building all
+the levels costs little more than building the first. OHLCV aggregation is associative,
+and every level divides the ones above it with bins anchored at midnight, so any level
+is the same as resampling the minutes directly (up to float rounding in summed volume).
+
+The pyramid is built when prices are ingested and stored (see
+sysdata.parquet.parquet_bar_pyramid); a backtest joins the stored levels to its minute
+prices with barPyramid.from_stored_levels, and a price update only recalculates the
+last bar of each level onwards with update_stored_levels.
+"""
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from syscore.constants import arg_not_supplied
+
+BAR_AGGREGATION = {
+    "OPEN": "first",
+    "HIGH": "max",
+    "LOW": "min",
+    "FINAL": "last",
+    "VOLUME": "sum",
+}
+
+DEFAULT_PYRAMID_LEVELS = ["5min", "15min", "1h", "1D"]
+MINUTE_LEVEL = "1min"
+
+
+class barPyramid(object):
+    """
+    >>> index = pd.date_range("2024-01-01", periods=120, freq="min", tz="utc")
+    >>> minutes = pd.DataFrame(dict(OPEN=1.0, HIGH=2.0, LOW=0.5, FINAL=1.5, VOLUME=1.0), index=index)
+    >>> pyramid = barPyramid(minutes)
+    >>> pyramid.bars_at_frequency("30min").VOLUME.tolist()
+    [30.0, 30.0, 30.0, 30.0]
+    """
+
+    def __init__(self, minute_prices: pd.DataFrame, levels: list = arg_not_supplied):
+        if levels is arg_not_supplied:
+            levels = DEFAULT_PYRAMID_LEVELS
+
+        minute_prices = _bar_columns(minute_prices)
+        bars = [minute_prices]
+        for level in levels:
+            bars.append(aggregate_bars(bars[-1], level))
+
+        self._set_levels_and_bars(levels, bars)
+
+    @classmethod
+    def from_stored_levels(cls, minute_prices: pd.DataFrame, stored_levels: dict):
+        """
+        Pyramid for minute_prices, using levels aggregated earlier from a longer (or
+        shorter) history of the same minutes, eg stored when prices were ingested.
+
+        Stored bars are used where they fall wholly inside minute_prices; the first and
+        last bar of each level, and any bars the store doesn't have yet, are aggregated
+        from the level below, so the result is the same as barPyramid(minute_prices).
+        """
+        minute_prices = _bar_columns(minute_prices)
+        levels = list(stored_levels.keys())
+        if len(minute_prices) == 0:
+            return cls(minute_prices, levels=levels)
+
+        first_minute = minute_prices.index[0]
+        last_minute = minute_prices.index[-1]
+        bars = [minute_prices]
+        for level, stored_bars in stored_levels.items():
+            offset = to_offset(level)
+            lower_bars = bars[-1]
+
+            ## bars wholly inside the minutes, and not the last one stored, which may
+            ## have been partial
+            stored_index = stored_bars.index
+            first_usable_idx = stored_index.searchsorted(first_minute.ceil(offset))
+            end_usable_idx = min(
+                stored_index.searchsorted(last_minute.floor(offset)),
+                len(stored_index) - 1,
+            )
+            if end_usable_idx <= first_usable_idx:
+                bars.append(aggregate_bars(lower_bars, offset))
+                continue
+
+            usable_bars = stored_bars.iloc[first_usable_idx:end_usable_idx]
+            lower_index = lower_bars.index
+            bars_before = aggregate_bars(
+                lower_bars.iloc[: lower_index.searchsorted(usable_bars.index[0])],
+                offset,
+            )
+            bars_after = aggregate_bars(
+                lower_bars.iloc[
+                    lower_index.searchsorted(usable_bars.index[-1] + offset) :
+                ],
+                offset,
+            )
+            bars.append(
+                _join_consecutive_bars([bars_before, usable_bars, bars_after], offset)
+            )
+
+        pyramid = cls.__new__(cls)
+        pyramid._set_levels_and_bars(levels, bars)
+
+        return pyramid
+
+    @property
+    def minute_prices(self) -> pd.DataFrame:
+        return self._bars[0]
+
+    @property
+    def last_minute(self) -> pd.Timestamp:
+        return self.minute_prices.index[-1]
+
+    @property
+    def aggregated_levels(self) -> dict:
+        ## level: bars, from finest to coarsest, as used by from_stored_levels
+        return dict(zip(self._levels, self._bars[1:]))
+
+    def bars_at_frequency(self, frequency: str) -> pd.DataFrame:
+        """
+        Same as minute_prices.resample(frequency).agg(BAR_AGGREGATION), but resampling
+        the coarsest level that divides frequency
+        """
+        offset = to_offset(frequency)
+        level_idx = self._coarsest_level_dividing(offset)
+        bars = self._bars[level_idx]
+        if level_idx > 0 and self._level_offsets[level_idx] == offset:
+            # minutes have gaps where there was no price, aggregated levels have NaN
+            return bars
+
+        return aggregate_bars(bars, offset)
+
+    def update(self, new_minute_prices: pd.DataFrame) -> dict:
+        """
+        Add minutes after the last one we have; only the last bar of each level, and
+        the bars after it, are recalculated. Returns the recalculated bars of each level.
+        """
+        new_minute_prices = _bar_columns(
+            new_minute_prices[new_minute_prices.index > self.last_minute]
+        )
+        if len(new_minute_prices) == 0:
+            return {}
+
+        self._bars[0] = pd.concat([self._bars[0], new_minute_prices])
+        levels_before_update = self.aggregated_levels
+        updated_levels = _recalculate_last_bars(self._bars[0], levels_before_update)
+        for level_idx, level in enumerate(self._levels):
+            self._bars[level_idx + 1] = updated_levels[level]
+
+        return _bars_from_last_bar(levels_before_update, updated_levels)
+
+    def _set_levels_and_bars(self, levels: list, bars: list):
+        self._levels = list(levels)
+        self._level_offsets = [to_offset(MINUTE_LEVEL)] + [
+            to_offset(level) for level in levels
+        ]
+        self._check_levels_divide()
+        self._bars = bars
+
+    def _coarsest_level_dividing(self, offset) -> int:
+        if not isinstance(offset, Tick):
+            # calendar frequencies like weeks and months have their own bin closing
+            # rules, so only minutes are guaranteed to give the same answer
+            return 0
+
+        dividing_levels = [
+            level_idx
+            for level_idx, level_offset in enumerate(self._level_offsets)
+            if offset.nanos % level_offset.nanos == 0
+        ]
+
+        return dividing_levels[-1]
+
+    def _check_levels_divide(self):
+        one_day = to_offset("1D").nanos
+        for lower_offset, higher_offset in zip(
+            self._level_offsets[:-1], self._level_offsets[1:]
+        ):
+            if not isinstance(higher_offset, Tick):
+                raise Exception("Pyramid level %s must be fixed size" % higher_offset)
+            if (
+                higher_offset.nanos % lower_offset.nanos != 0
+                or one_day % higher_offset.nanos != 0
+            ):
+                raise Exception(
+                    "Pyramid level %s must be a multiple of %s, and divide one day"
+                    % (higher_offset.freqstr, lower_offset.freqstr)
+                )
+
+
+def update_stored_levels(stored_levels: dict, minute_prices: pd.DataFrame) -> dict:
+    """
+    Recalculate the last bar of each stored level, and add bars after it, from
+    minute_prices; returns just the recalculated bars of each level, which replace
+    the stored bars with the same index.
+
+    minute_prices need only start at the last stored bar of the coarsest level, so a
+    price update doesn't need to read the whole history.
+    """
+    updated_levels = _recalculate_last_bars(_bar_columns(minute_prices), stored_levels)
+
+    return _bars_from_last_bar(stored_levels, updated_levels)
+
+
+def first_minute_needed_to_update(stored_levels: dict) -> pd.Timestamp:
+    coarsest_bars = list(stored_levels.values())[-1]
+
+    return coarsest_bars.index[-1]
+
+
+def aggregate_bars(bars: pd.DataFrame, offset) -> pd.DataFrame:
+    return bars.resample(offset).agg(BAR_AGGREGATION)
+
+
+def _recalculate_last_bars(minute_prices: pd.DataFrame, levels: dict) -> dict:
+    ## each level from its last bar, which may have been partial; the level below has
+    ## every bar from there, whether it was recalculated or not
+    updated_levels = {}
+    lower_bars = minute_prices
+    for level, bars in levels.items():
+        offset = to_offset(level)
+        if len(bars) == 0:
+            updated_bars = aggregate_bars(lower_bars, offset)
+        else:
+            last_bar = bars.index[-1]
+            new_bars = aggregate_bars(
+                lower_bars.iloc[lower_bars.index.searchsorted(last_bar) :], offset
+            )
+            updated_bars = _join_consecutive_bars(
+                [bars.iloc[: bars.index.searchsorted(last_bar)], new_bars], offset
+            )
+
+        updated_levels[level] = updated_bars
+        lower_bars = updated_bars
+
+    return updated_levels
+
+
+def _bars_from_last_bar(levels: dict, updated_levels: dict) -> dict:
+    bars_from_last_bar = {}
+    for level, updated_bars in updated_levels.items():
+        bars = levels[level]
+        if len(bars) == 0:
+            bars_from_last_bar[level] = updated_bars
+        else:
+            bars_from_last_bar[level] = updated_bars.iloc[
+                updated_bars.index.searchsorted(bars.index[-1]) :
+            ]
+
+    return bars_from_last_bar
+
+
+def _join_consecutive_bars(list_of_bars: list, offset) -> pd.DataFrame:
+    ## resampling leaves out empty bins at the ends of a range, so put them back as
+    ## they would be if resampled together
+    list_of_bars = [bars for bars in list_of_bars if len(bars) > 0]
+    bars = pd.concat(list_of_bars)
+    all_bins = pd.date_range(
+        bars.index[0], bars.index[-1], freq=offset, name=bars.index.name
+    )
+    if len(all_bins) == len(bars):
+        return bars
+
+    bars = bars.reindex(all_bins)
+    bars["VOLUME"] = bars["VOLUME"].fillna(0.0)
+
+    return bars
+
+
+def _bar_columns(minute_prices: pd.DataFrame) -> pd.DataFrame:
+    if list(minute_prices.columns) == list(BAR_AGGREGATION.keys()):
+        # selecting columns copies, so don't unless we need to
+        return minute_prices
+
+    return minute_prices[list(BAR_AGGREGATION.keys())]
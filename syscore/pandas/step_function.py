@@ -0,0 +1,241 @@
+"""
+Series that only change at some points, eg positions, stored as the points where they
+change and the value from each one
+
+On a minute index most bars repeat the value before, so this is far smaller than a
+dense Series or DataFrame. The full index a series came from is kept by reference, not
+copied; it is usually shared with prices and forecasts, so as_series gives back exactly
+the original without holding any extra data.
+"""
+import datetime
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+
+
+class stepFunctionSeries(object):
+    """
+    >>> index = pd.date_range("2024-01-01", periods=6, freq="min")
+    >>> position = pd.Series([np.nan, 1.0, 1.0, 1.0, 0.0, 0.0], index=index)
+    >>> step_position = stepFunctionSeries.from_series(position)
+    >>> len(step_position)
+    3
+    >>> step_position.as_series().equals(position)
+    True
+    >>> (step_position * 2.0).value_at(index[3])
+    2.0
+    """
+
+    def __init__(
+        self,
+        change_index: pd.DatetimeIndex,
+        change_values: np.ndarray,
+        index: pd.Index = arg_not_supplied,
+        name=None,
+    ):
+        self._change_index = change_index
+        self._change_values = np.asarray(change_values, dtype=np.float64)
+        self._index = index
+        self._name = name
+        self._last_series = _no_series
+
+    def __getstate__(self):
+        ## the weak reference can't be pickled
+        state = self.__dict__.copy()
+        state["_last_series"] = _no_series
+
+        return state
+
+    def __repr__(self):
+        return "stepFunctionSeries with %d changes" % len(self)
+
+    def __len__(self):
+        return len(self._change_index)
+
+    @classmethod
+    def from_series(cls, series: pd.Series):
+        values = series.values.astype(np.float64)
+        changed = np.ones(len(values), dtype=bool)
+        both_nan = np.isnan(values[1:]) & np.isnan(values[:-1])
+        changed[1:] = ~((values[1:] == values[:-1]) | both_nan)
+
+        return cls(
+            series.index[changed],
+            values[changed],
+            index=series.index,
+            name=series.name,
+        )
+
+    @property
+    def change_index(self) -> pd.DatetimeIndex:
+        return self._change_index
+
+    @property
+    def change_values(self) -> np.ndarray:
+        return self._change_values
+
+    @property
+    def index(self) -> pd.Index:
+        if self._index is arg_not_supplied:
+            return self._change_index
+
+        return self._index
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def nbytes(self) -> int:
+        ## excluding the full index, which is shared
+        return self._change_index.nbytes + self._change_values.nbytes
+
+    def as_series(self) -> pd.Series:
+        ## the same Series is given back while anything still holds it, without the
+        ## step function keeping it alive, so don't modify it in place
+        series = self._last_series()
+        if series is None:
+            series = self.reindex(self.index)
+            self._last_series = weakref.ref(series)
+
+        return series
+
+    def reindex(self, new_index: pd.Index) -> pd.Series:
+        ## value at the last change on or before each date; NaN before the first
+        return pd.Series(
+            self._values_at_dates(new_index), index=new_index, name=self.name
+        )
+
+    def value_at(self, relevant_date: datetime.datetime = arg_not_supplied) -> float:
+        if relevant_date is arg_not_supplied:
+            if len(self) == 0:
+                return np.nan
+            return self._change_values[-1]
+
+        return self._values_at_dates(pd.DatetimeIndex([relevant_date]))[0]
+
+    def abs(self):
+        return self._with_change_values(np.abs(self._change_values))
+
+    def __mul__(self, other):
+        return self._combine(other, np.multiply)
+
+    __rmul__ = __mul__
+
+    def __add__(self, other):
+        return self._combine(other, np.add)
+
+    __radd__ = __add__
+
+    def _combine(self, other, operator):
+        if not isinstance(other, stepFunctionSeries):
+            return self._with_change_values(operator(self._change_values, other))
+
+        union_index = self._change_index.union(other.change_index)
+        combined = pd.Series(
+            operator(
+                self._values_at_dates(union_index),
+                other._values_at_dates(union_index),
+            ),
+            index=union_index,
+        )
+        combined_step_function = stepFunctionSeries.from_series(combined)
+        combined_step_function._index = _shared_index(self, other)
+
+        return combined_step_function
+
+    def _with_change_values(self, change_values: np.ndarray):
+        ## may repeat values, eg after abs, which is harmless
+        return stepFunctionSeries(
+            self._change_index, change_values, index=self._index, name=self.name
+        )
+
+    def _values_at_dates(self, dates: pd.Index) -> np.ndarray:
+        if len(self) == 0:
+            return np.full(len(dates), np.nan)
+
+        positions = self._change_index.searchsorted(dates, side="right") - 1
+        values = self._change_values[np.maximum(positions, 0)]
+
+        return np.where(positions >= 0, values, np.nan)
+
+
+class dictOfStepFunctionSeries(dict):
+    """
+    Step functions by instrument, standing in for a wide DataFrame which would be
+    forward filled
+    """
+
+    def common_index(self) -> pd.Index:
+        if len(self) == 0:
+            return pd.DatetimeIndex([])
+
+        common_index = None
+        for step_function in self.values():
+            if common_index is None:
+                common_index = step_function.index
+            elif common_index is not step_function.index:
+                common_index = common_index.union(step_function.index)
+
+        return common_index
+
+    def reindex(self, new_index: pd.Index) -> pd.DataFrame:
+        return pd.DataFrame(
+            dict(
+                [
+                    (key, step_function.reindex(new_index))
+                    for key, step_function in self.items()
+                ]
+            ),
+            index=new_index,
+        )
+
+    def row_at(self, relevant_date: datetime.datetime = arg_not_supplied) -> dict:
+        return dict(
+            [
+                (key, step_function.value_at(relevant_date))
+                for key, step_function in self.items()
+            ]
+        )
+
+    def sum(self) -> stepFunctionSeries:
+        ## as DataFrame.sum(axis=1): NaN is ignored, and all NaN gives zero
+        if len(self) == 0:
+            return stepFunctionSeries(pd.DatetimeIndex([]), np.array([]))
+
+        list_of_change_indices = [
+            step_function.change_index for step_function in self.values()
+        ]
+        union_index = list_of_change_indices[0]
+        for change_index in list_of_change_indices[1:]:
+            union_index = union_index.union(change_index)
+
+        all_values = np.array(
+            [
+                step_function._values_at_dates(union_index)
+                for step_function in self.values()
+            ]
+        )
+        summed = pd.Series(np.nansum(all_values, axis=0), index=union_index)
+        summed_step_function = stepFunctionSeries.from_series(summed)
+        summed_step_function._index = self.common_index()
+
+        return summed_step_function
+
+    @property
+    def nbytes(self) -> int:
+        return sum([step_function.nbytes for step_function in self.values()])
+
+
+def _no_series():
+    return None
+
+
+def _shared_index(step_function: stepFunctionSeries, other: stepFunctionSeries):
+    if step_function.index is other.index or step_function.index.equals(other.index):
+        return step_function.index
+
+    return step_function.index.union(other.index)
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+
+def minute_prices(periods: int, seed: int = 42, with_gaps: bool = False) -> pd.Series:
+    """
+    A random walk of minute prices for testing, optionally with NaN at the start, in
+    a long block, and scattered through
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=periods, freq="min", tz="UTC")
+    returns = rng.normal(0.0, 0.001, periods)
+    price = pd.Series(30000.0 * np.exp(np.cumsum(returns)), index=index)
+
+    if with_gaps:
+        price.iloc[:25] = np.nan
+        price.iloc[500:700] = np.nan
+        price.iloc[rng.integers(0, periods, periods // 50)] = np.nan
+
+    return price
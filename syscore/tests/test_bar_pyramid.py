@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.pandas.bar_pyramid import (
+    barPyramid,
+    BAR_AGGREGATION,
+    first_minute_needed_to_update,
+    update_stored_levels,
+)
+
+
+@pytest.fixture(scope="module")
+def minute_prices():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2024-01-01 13:07", periods=20000, freq="min", tz="utc")
+    # some missing minutes
+    index = index[rng.random(len(index)) > 0.05]
+    # and a gap longer than the coarsest level
+    index = index[(index < "2024-01-08 02:13") | (index > "2024-01-09 17:41")]
+    final = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, len(index))))
+    noise = np.abs(rng.normal(0, 0.001, len(index)))
+
+    return pd.DataFrame(
+        dict(
+            OPEN=final * (1 + rng.normal(0, 0.0005, len(index))),
+            HIGH=final * (1 + noise),
+            LOW=final * (1 - noise),
+            FINAL=final,
+            VOLUME=rng.random(len(index)),
+        ),
+        index=index,
+    )
+
+
+def assert_same_levels(pyramid, expected):
+    for frequency in ["1min", "5min", "15min", "1h", "1D"]:
+        pd.testing.assert_frame_equal(
+            pyramid.bars_at_frequency(frequency),
+            expected.bars_at_frequency(frequency),
+            check_freq=False,
+        )
+
+
+@pytest.mark.parametrize(
+    "frequency", ["1min", "5min", "1h", "2h", "90min", "7min", "1D", "W"]
+)
+def test_pyramid_matches_resampling_minutes(minute_prices, frequency):
+    expected = minute_prices.resample(frequency).agg(BAR_AGGREGATION)
+    result = barPyramid(minute_prices).bars_at_frequency(frequency)
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_updated_pyramid_matches_one_built_from_all_minutes(minute_prices):
+    pyramid = barPyramid(minute_prices.iloc[:15000])
+    pyramid.update(minute_prices.iloc[14000:16000])
+    # new minutes starting after the gap
+    pyramid.update(minute_prices.iloc[16000:16400])
+    for minute in range(16400, len(minute_prices), 997):
+        pyramid.update(minute_prices.iloc[minute : minute + 997])
+
+    assert_same_levels(pyramid, barPyramid(minute_prices))
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [
+        # from the start of the stored history, but at a later time of day
+        ("2024-01-01 13:07", "2024-01-12 11:19"),
+        # not on a bar boundary of any level
+        ("2024-01-03 07:53", "2024-01-14 05:00"),
+        # within the gap, to after the end of what was stored
+        ("2024-01-08 10:00", "2024-01-20"),
+        # shorter than the coarsest level
+        ("2024-01-05 10:02", "2024-01-05 16:31"),
+    ],
+)
+def test_pyramid_from_stored_levels_matches_one_built_from_minutes(
+    minute_prices, start, end
+):
+    stored_levels = barPyramid(
+        minute_prices[minute_prices.index <= "2024-01-13 17:22"]
+    ).aggregated_levels
+    minutes_in_backtest = minute_prices[start:end]
+
+    pyramid = barPyramid.from_stored_levels(minutes_in_backtest, stored_levels)
+
+    assert_same_levels(pyramid, barPyramid(minutes_in_backtest))
+
+
+def test_updated_stored_levels_match_pyramid_built_from_all_minutes(minute_prices):
+    stored_levels = barPyramid(minute_prices.iloc[:9000]).aggregated_levels
+    for minute in [9000, 11000, 16000, len(minute_prices)]:
+        first_minute_needed = first_minute_needed_to_update(stored_levels)
+        minutes_for_update = minute_prices.iloc[:minute]
+        minutes_for_update = minutes_for_update[
+            minutes_for_update.index >= first_minute_needed
+        ]
+
+        updated_bars = update_stored_levels(stored_levels, minutes_for_update)
+
+        # as a store would, replacing bars with the same index
+        for level, bars in updated_bars.items():
+            assert bars.index[0] == stored_levels[level].index[-1]
+            stored_bars = pd.concat([stored_levels[level], bars])
+            stored_levels[level] = stored_bars[
+                ~stored_bars.index.duplicated(keep="last")
+            ]
+
+    expected = barPyramid(minute_prices).aggregated_levels
+    for level, bars in expected.items():
+        pd.testing.assert_frame_equal(stored_levels[level], bars, check_freq=False)
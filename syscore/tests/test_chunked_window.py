@@ -0,0 +1,139 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.pandas.chunked_window import (
+    chunkedDiff,
+    chunkedEwmMean,
+    chunkedFfill,
+    chunkedRolling,
+    chunkedShift,
+    run_in_chunks,
+)
+from syscore.tests.minute_prices import minute_prices
+
+
+CHUNK_SIZES = [1, 7, 499, 1000, 20000]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("span, min_periods", [(4, 0), (64, 10), (4000, 1)])
+def test_chunked_ewm_mean_matches_pandas(chunk_size, span, min_periods):
+    price = minute_prices(10000, with_gaps=True)
+
+    ewm_mean = chunkedEwmMean(span=span, min_periods=min_periods)
+    result = run_in_chunks(ewm_mean.process, price, chunk_size=chunk_size)
+
+    expected = price.ewm(span=span, min_periods=min_periods).mean()
+    pd.testing.assert_series_equal(result, expected, rtol=1e-12, check_names=False)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("statistic", ["mean", "std", "sum", "max"])
+def test_chunked_rolling_matches_pandas(chunk_size, statistic):
+    returns = minute_prices(10000, with_gaps=True).diff()
+
+    rolling = chunkedRolling(250, min_periods=3, statistic=statistic)
+    result = run_in_chunks(rolling.process, returns, chunk_size=chunk_size)
+
+    expected = getattr(returns.rolling(250, min_periods=3), statistic)()
+    pd.testing.assert_series_equal(
+        result, expected, rtol=1e-9, atol=1e-15, check_names=False
+    )
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_chunked_shift_diff_and_ffill_match_pandas(chunk_size):
+    price = minute_prices(3000, with_gaps=True)
+
+    for chunked_step, expected in [
+        (chunkedShift(5), price.shift(5)),
+        (chunkedDiff(), price.diff()),
+        (chunkedFfill(), price.ffill()),
+    ]:
+        result = run_in_chunks(chunked_step.process, price, chunk_size=chunk_size)
+        pd.testing.assert_series_equal(result, expected, check_names=False)
+
+
+def test_chunked_rolling_unaffected_by_later_changes_to_chunk():
+    # as mr_wings does, zeroing the signal after taking its rolling std
+    signal = minute_prices(3000, with_gaps=True).diff()
+
+    rolling_std = chunkedRolling(500, min_periods=3, statistic="std")
+
+    def zero_small_values(signal_chunk):
+        signal_chunk = signal_chunk.copy()
+        signal_std = rolling_std.process(signal_chunk)
+        signal_chunk[signal_chunk.abs() < signal_std] = 0.0
+
+        return signal_chunk
+
+    result = run_in_chunks(zero_small_values, signal, chunk_size=700)
+
+    expected = signal.copy()
+    expected[signal.abs() < signal.rolling(500, min_periods=3).std()] = 0.0
+    pd.testing.assert_series_equal(result, expected, check_names=False)
+
+
+def test_run_in_chunks_writes_to_file(tmp_path):
+    price = minute_prices(5000, with_gaps=True)
+    filename = str(tmp_path / "ewm.npy")
+
+    ewm_mean = chunkedEwmMean(span=32)
+    result = run_in_chunks(
+        ewm_mean.process, price, chunk_size=1000, output_filename=filename
+    )
+
+    saved = np.load(filename)
+    np.testing.assert_array_equal(saved, result.values)
+    pd.testing.assert_series_equal(
+        result, price.ewm(span=32).mean(), rtol=1e-12, check_names=False
+    )
+
+
+def test_run_in_chunks_needs_aligned_inputs():
+    price = minute_prices(100, with_gaps=True)
+
+    with pytest.raises(Exception):
+        run_in_chunks(lambda x, y: x - y, price, price.iloc[1:])
+
+
+@pytest.mark.slow
+def test_benchmark_memory_of_chunked_ewm_and_rolling():
+    # ten years of minute bars
+    price = minute_prices(10 * 365 * 24 * 60, with_gaps=True)
+
+    def in_memory():
+        returns = price.diff()
+        return returns.rolling(5000, min_periods=3).std() * price.ewm(span=64).mean()
+
+    def in_chunks():
+        returns_diff = chunkedDiff()
+        rolling_std = chunkedRolling(5000, min_periods=3, statistic="std")
+        ewm_mean = chunkedEwmMean(span=64)
+
+        def for_chunk(price_chunk):
+            return rolling_std.process(
+                returns_diff.process(price_chunk)
+            ) * ewm_mean.process(price_chunk)
+
+        return run_in_chunks(for_chunk, price, chunk_size=100000)
+
+    peaks = {}
+    for name, function in [("in memory", in_memory), ("in chunks", in_chunks)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            "%s: %.2fs, peak %.0fMB above the inputs"
+            % (name, seconds, peaks[name] / 1e6)
+        )
+
+    # only the output array is the length of the history
+    assert peaks["in chunks"] < peaks["in memory"] / 2
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.pandas.expanding_rank import fast_quantile_of_points_in_data_series
+
+
+def quadratic_quantile_of_points(data_series: pd.Series) -> pd.Series:
+    ## the original O(N^2) calculation
+    numpy_series = np.array(data_series)
+    results = []
+    for irow in range(len(data_series)):
+        current_value = numpy_series[irow]
+        count_less_than = (numpy_series < current_value)[:irow].sum()
+        results.append(count_less_than / (irow + 1))
+
+    return pd.Series(results, index=data_series.index)
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 17, 1000, 4097])
+def test_fast_quantile_matches_quadratic(length):
+    rng = np.random.default_rng(length)
+    # lots of ties, and some NaN
+    values = rng.integers(0, 30, length).astype(float)
+    values[rng.random(length) < 0.1] = np.nan
+    series = pd.Series(values, index=pd.date_range("2024-01-01", periods=length))
+
+    pd.testing.assert_series_equal(
+        fast_quantile_of_points_in_data_series(series),
+        quadratic_quantile_of_points(series),
+    )
+
+
+@pytest.mark.slow
+def test_benchmark_fast_quantile_multi_year_minutes():
+    rng = np.random.default_rng(1)
+    # five years of minute bars
+    normalised_vol = pd.Series(rng.lognormal(size=5 * 365 * 24 * 60))
+
+    start = time.perf_counter()
+    fast_quantile_of_points_in_data_series(normalised_vol)
+    fast_seconds = time.perf_counter() - start
+
+    print("Five years of minutes: %.1f seconds" % fast_seconds)
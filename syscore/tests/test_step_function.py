@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.pandas.step_function import stepFunctionSeries, dictOfStepFunctionSeries
+
+
+@pytest.fixture(scope="module")
+def positions():
+    rng = np.random.default_rng(2)
+    index = pd.date_range("2024-01-01", periods=50000, freq="min", tz="utc")
+    positions = {}
+    for instrument_code in ["BTC", "ETH", "SOL"]:
+        trades = np.where(
+            rng.random(len(index)) < 0.01, rng.integers(-3, 4, len(index)), 0
+        )
+        position = pd.Series(np.cumsum(trades).astype(float), index=index)
+        position.iloc[: rng.integers(10, 1000)] = np.nan
+        positions[instrument_code] = position
+
+    return pd.DataFrame(positions)
+
+
+def test_round_trip_is_exact_and_smaller(positions):
+    for instrument_code in positions.columns:
+        position = positions[instrument_code]
+        step_position = stepFunctionSeries.from_series(position)
+
+        pd.testing.assert_series_equal(step_position.as_series(), position)
+        assert step_position.nbytes * 10 < position.values.nbytes
+
+
+def test_reindex_matches_ffill(positions):
+    position = positions["BTC"]
+    step_position = stepFunctionSeries.from_series(position)
+    new_index = pd.date_range(
+        position.index[0] - pd.Timedelta("1h"), position.index[-1], freq="7min"
+    )
+
+    pd.testing.assert_series_equal(
+        step_position.reindex(new_index),
+        position.reindex(new_index, method="ffill").rename(None),
+        check_names=False,
+    )
+
+
+def test_operations_match_dense(positions):
+    step_positions = dictOfStepFunctionSeries(
+        [
+            (
+                instrument_code,
+                stepFunctionSeries.from_series(positions[instrument_code]),
+            )
+            for instrument_code in positions.columns
+        ]
+    )
+
+    pd.testing.assert_frame_equal(
+        step_positions.reindex(step_positions.common_index()), positions
+    )
+    pd.testing.assert_series_equal(
+        step_positions.sum().as_series(), positions.sum(axis=1), check_names=False
+    )
+
+    product = step_positions["BTC"] * step_positions["ETH"].abs() + 1.0
+    pd.testing.assert_series_equal(
+        product.as_series(),
+        positions["BTC"] * positions["ETH"].abs() + 1.0,
+        check_names=False,
+    )
+
+    last_date = positions.index[-1]
+    assert step_positions.row_at(last_date) == positions.loc[last_date].to_dict()
+
+
+def test_empty():
+    index = pd.date_range("2024-01-01", periods=5, freq="min")
+    step_position = stepFunctionSeries.from_series(pd.Series([], dtype=float))
+
+    assert len(step_position) == 0
+    assert np.isnan(step_position.value_at())
+    assert step_position.reindex(index).isna().all()
+
+    summed = dictOfStepFunctionSeries().sum()
+    assert len(summed) == 0
+    assert len(summed.as_series()) == 0
+
+
+def test_dense_series_is_shared_while_held(positions):
+    step_position = stepFunctionSeries.from_series(positions["BTC"])
+    position = step_position.as_series()
+
+    assert step_position.as_series() is position
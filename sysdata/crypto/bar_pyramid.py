@@ -0,0 +1,90 @@
+"""
+Read / write minute prices aggregated to several bar sizes, see syscore.pandas.bar_pyramid
+
+Only the aggregated levels are stored; the minutes are in the crypto prices store.
+"""
+
+import pandas as pd
+
+from syscore.exceptions import missingData
+from syscore.pandas.bar_pyramid import (
+    barPyramid,
+    first_minute_needed_to_update,
+    update_stored_levels,
+)
+from sysdata.base_data import baseData
+from syslogging.logger import *
+
+USE_CHILD_CLASS_ERROR = "You need to use a child class of barPyramidData"
+
+
+class barPyramidData(baseData):
+    """
+    Read and write data class to get bar pyramids
+
+    We'd inherit from this class for a specific implementation
+
+    """
+
+    def __repr__(self):
+        return "barPyramidData base class - DO NOT USE"
+
+    def __init__(self, log=get_logger("barPyramidData")):
+        super().__init__(log=log)
+
+    def keys(self) -> list:
+        return self.get_list_of_instruments()
+
+    def has_bar_pyramid(self, instrument_code: str) -> bool:
+        return instrument_code in self.get_list_of_instruments()
+
+    def get_stored_levels(self, instrument_code: str) -> dict:
+        """
+        level: bars, from finest to coarsest, for barPyramid.from_stored_levels
+        """
+        if not self.has_bar_pyramid(instrument_code):
+            raise missingData("No bar pyramid stored for %s" % instrument_code)
+
+        return self._get_stored_levels_without_checking(instrument_code)
+
+    def write_bar_pyramid(self, instrument_code: str, bar_pyramid: barPyramid):
+        ## replaces all the levels
+        if self.has_bar_pyramid(instrument_code):
+            self._delete_bar_pyramid_without_any_warning_be_careful(instrument_code)
+
+        self._write_levels(instrument_code, bar_pyramid.aggregated_levels)
+
+    def first_minute_needed_to_update(self, instrument_code: str) -> pd.Timestamp:
+        return first_minute_needed_to_update(self.get_stored_levels(instrument_code))
+
+    def update_bar_pyramid(self, instrument_code: str, minute_prices: pd.DataFrame):
+        """
+        Add new minutes; minute_prices must start at or before
+        first_minute_needed_to_update, and include all the minutes after that
+        """
+        stored_levels = self.get_stored_levels(instrument_code)
+        updated_bars = update_stored_levels(stored_levels, minute_prices)
+        for level, bars in updated_bars.items():
+            self._replace_bars_from(instrument_code, level=level, bars=bars)
+
+        self.log.debug(
+            "Updated bar pyramid for %s from %s"
+            % (instrument_code, str(minute_prices.index[0])),
+            instrument_code=instrument_code,
+        )
+
+    def get_list_of_instruments(self) -> list:
+        raise NotImplementedError(USE_CHILD_CLASS_ERROR)
+
+    def _get_stored_levels_without_checking(self, instrument_code: str) -> dict:
+        raise NotImplementedError(USE_CHILD_CLASS_ERROR)
+
+    def _delete_bar_pyramid_without_any_warning_be_careful(self, instrument_code: str):
+        raise NotImplementedError(USE_CHILD_CLASS_ERROR)
+
+    def _write_levels(self, instrument_code: str, levels: dict):
+        raise NotImplementedError(USE_CHILD_CLASS_ERROR)
+
+    def _replace_bars_from(self, instrument_code: str, level: str, bars: pd.DataFrame):
+        ## bars replace any stored bars with the same index, and are added after them
+        raise NotImplementedError(USE_CHILD_CLASS_ERROR)
@@ -1,4 +1,5 @@
 import os
+import shutil
 import pandas as pd
 from syscore.fileutils import (
     files_with_extension_in_pathname,
@@ -10,6 +11,9 @@ from pathlib import Path
 
 EXTENSION = "parquet"
 
+## appended rows for <identifier>.parquet go in <identifier>.deltas/000001.parquet, ...
+DELTA_DIRECTORY_SUFFIX = ".deltas"
+
 
 class ParquetAccess(object):
     def __init__(self, parquet_store_path: str):
@@ -30,6 +34,10 @@ class ParquetAccess(object):
     def delete_data_given_data_type_and_identifier(
         self, data_type: str, identifier: str
     ):
+        ## deltas first, so they can't be left without their base file
+        self._delete_deltas_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
         filename = self._get_filename_given_data_type_and_identifier(
             data_type=data_type, identifier=identifier
         )
@@ -38,12 +46,19 @@ class ParquetAccess(object):
     def write_data_given_data_type_and_identifier(
         self, data_to_write: pd.DataFrame, data_type: str, identifier: str
     ):
+        ## replaces everything, including any appended rows. Reads let deltas override
+        ## the base file, so they are removed before the new base goes in with a
+        ## single rename: if this stops part way, reads give the old base (with or
+        ## without its deltas), never the new one with stale deltas
         filename = self._get_filename_given_data_type_and_identifier(
             data_type=data_type, identifier=identifier
         )
-        data_to_write.to_parquet(
-            filename, coerce_timestamps="us", allow_truncated_timestamps=True
+        new_filename = filename + ".writing"
+        _write_parquet_file(data_to_write, new_filename)
+        self._delete_deltas_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
         )
+        os.replace(new_filename, filename)
 
     def read_data_given_data_type_and_identifier(
         self, data_type: str, identifier: str
@@ -51,7 +66,225 @@ class ParquetAccess(object):
         filename = self._get_filename_given_data_type_and_identifier(
             data_type=data_type, identifier=identifier
         )
-        return pd.read_parquet(filename)
+        data = pd.read_parquet(filename)
+
+        delta_filenames = self._get_delta_filenames_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        if len(delta_filenames) == 0:
+            return data
+
+        data = pd.concat(
+            [data] + [pd.read_parquet(filename) for filename in delta_filenames]
+        )
+
+        # rows in both can only be left by a compaction that didn't finish
+        return data[~data.index.duplicated(keep="last")]
+
+    ## Appended data: new rows are written to small delta files, so adding to a long
+    ## history doesn't rewrite it. Reads give the base file and deltas together, and
+    ## compact_data_given_data_type_and_identifier merges them back into one file
+    def append_data_given_data_type_and_identifier(
+        self, data_to_append: pd.DataFrame, data_type: str, identifier: str
+    ):
+        ## rows must come after those already stored
+        if not self.does_idenitifier_with_data_type_exist(
+            data_type=data_type, identifier=identifier
+        ):
+            self.write_data_given_data_type_and_identifier(
+                data_to_write=data_to_append, data_type=data_type, identifier=identifier
+            )
+            return
+
+        delta_filenames = self._get_delta_filenames_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        if len(delta_filenames) == 0:
+            delta_number = 1
+        else:
+            last_delta = os.path.basename(delta_filenames[-1])
+            delta_number = int(last_delta.split(".")[0]) + 1
+
+        path = self._get_delta_pathname_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        Path(path).mkdir(parents=True, exist_ok=True)
+        _write_parquet_file(
+            data_to_append, os.path.join(path, "%06d.%s" % (delta_number, EXTENSION))
+        )
+
+    def number_of_deltas_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ) -> int:
+        return len(
+            self._get_delta_filenames_given_data_type_and_identifier(
+                data_type=data_type, identifier=identifier
+            )
+        )
+
+    def get_all_identifiers_with_deltas_given_data_type(self, data_type: str) -> list:
+        path = self._get_pathname_given_data_type(data_type)
+        return sorted(
+            [
+                name[: -len(DELTA_DIRECTORY_SUFFIX)]
+                for name in os.listdir(path)
+                if name.endswith(DELTA_DIRECTORY_SUFFIX)
+                and os.path.isdir(os.path.join(path, name))
+            ]
+        )
+
+    def compact_data_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ) -> int:
+        """
+        Merge appended rows into the base file; returns the number of deltas merged
+
+        The new base file replaces the old one in a single rename before the deltas
+        are removed, so readers never see rows missing. Deltas appended while this
+        runs are left for next time. If the base file is rewritten while this runs,
+        nothing is merged, so the rewrite isn't undone.
+        """
+        delta_filenames = self._get_delta_filenames_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        if len(delta_filenames) == 0:
+            return 0
+
+        filename = self._get_filename_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        base_file_version = _file_version(filename)
+        data = pd.concat(
+            [pd.read_parquet(filename)]
+            + [pd.read_parquet(delta_filename) for delta_filename in delta_filenames]
+        )
+        data = data[~data.index.duplicated(keep="last")]
+
+        compacted_filename = filename + ".compacting"
+        _write_parquet_file(data, compacted_filename)
+        if _file_version(filename) != base_file_version:
+            os.remove(compacted_filename)
+            return 0
+
+        os.replace(compacted_filename, filename)
+
+        for delta_filename in delta_filenames:
+            os.remove(delta_filename)
+
+        return len(delta_filenames)
+
+    ## Partitioned data: each identifier is a directory with one file per partition,
+    ## so a reader can load just the partitions it needs
+    def get_all_partitioned_identifiers_with_data_type(self, data_type: str) -> list:
+        path = self._get_pathname_given_data_type(data_type)
+        return [
+            name
+            for name in os.listdir(path)
+            if os.path.isdir(os.path.join(path, name))
+            and not name.endswith(DELTA_DIRECTORY_SUFFIX)
+        ]
+
+    def does_partitioned_identifier_with_data_type_exist(
+        self, data_type: str, identifier: str
+    ) -> bool:
+        path = self._get_pathname_given_data_type_and_partitioned_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        return os.path.isdir(path)
+
+    def get_partitions_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ) -> list:
+        if not self.does_partitioned_identifier_with_data_type_exist(
+            data_type=data_type, identifier=identifier
+        ):
+            return []
+
+        path = self._get_pathname_given_data_type_and_partitioned_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        return sorted(files_with_extension_in_pathname(path, extension=EXTENSION))
+
+    def delete_partitioned_data_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ):
+        path = self._get_pathname_given_data_type_and_partitioned_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        shutil.rmtree(path)
+
+    def write_partition_given_data_type_and_identifier(
+        self,
+        data_to_write: pd.DataFrame,
+        data_type: str,
+        identifier: str,
+        partition: str,
+        row_group_size: int = None,
+    ):
+        path = self._get_pathname_given_data_type_and_partitioned_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        Path(path).mkdir(parents=True, exist_ok=True)
+        filename = os.path.join(path, "%s.%s" % (partition, EXTENSION))
+        data_to_write.to_parquet(filename, index=False, row_group_size=row_group_size)
+
+    def read_partitions_given_data_type_and_identifier(
+        self,
+        data_type: str,
+        identifier: str,
+        partitions: list,
+        filters: list = None,
+    ) -> pd.DataFrame:
+        ## filters are pushed down to the row groups of each file, see pd.read_parquet
+        path = self._get_pathname_given_data_type_and_partitioned_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        list_of_data = [
+            pd.read_parquet(
+                os.path.join(path, "%s.%s" % (partition, EXTENSION)), filters=filters
+            )
+            for partition in partitions
+        ]
+        if len(list_of_data) == 0:
+            return pd.DataFrame()
+
+        return pd.concat(list_of_data, ignore_index=True)
+
+    def _get_delta_filenames_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ) -> list:
+        path = self._get_delta_pathname_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        if not os.path.isdir(path):
+            return []
+
+        return [
+            os.path.join(path, name)
+            for name in sorted(os.listdir(path))
+            if name.endswith("." + EXTENSION)
+        ]
+
+    def _delete_deltas_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ):
+        path = self._get_delta_pathname_given_data_type_and_identifier(
+            data_type=data_type, identifier=identifier
+        )
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def _get_delta_pathname_given_data_type_and_identifier(
+        self, data_type: str, identifier: str
+    ):
+        path = self._get_pathname_given_data_type(data_type)
+        return os.path.join(path, identifier + DELTA_DIRECTORY_SUFFIX)
+
+    def _get_pathname_given_data_type_and_partitioned_identifier(
+        self, data_type: str, identifier: str
+    ):
+        path = self._get_pathname_given_data_type(data_type)
+        return os.path.join(path, identifier)
 
     def _get_filename_given_data_type_and_identifier(
         self, data_type: str, identifier: str
@@ -67,3 +300,14 @@ class ParquetAccess(object):
         Path(path).mkdir(parents=True, exist_ok=True)
 
         return path
+
+
+def _write_parquet_file(data_to_write: pd.DataFrame, filename: str):
+    data_to_write.to_parquet(
+        filename, coerce_timestamps="us", allow_truncated_timestamps=True
+    )
+
+
+def _file_version(filename: str) -> tuple:
+    file_stat = os.stat(filename)
+    return file_stat.st_ino, file_stat.st_mtime_ns, file_stat.st_size
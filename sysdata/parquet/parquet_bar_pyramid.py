@@ -0,0 +1,108 @@
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+from sysdata.crypto.bar_pyramid import barPyramidData
+from sysdata.parquet.parquet_access import ParquetAccess
+from syslogging.logger import *
+
+BAR_PYRAMID_COLLECTION = "bar_pyramid"
+
+## each level is a separate identifier, eg BTCUSDT@5min, so an update appends to it
+LEVEL_SEPARATOR = "@"
+
+
+class parquetBarPyramidData(barPyramidData):
+    """
+    Updates append the recalculated bars of each level to a delta file (see
+    ParquetAccess.append_data_given_data_type_and_identifier), replacing the last bar
+    stored before, rather than rewriting the level.
+    """
+
+    def __init__(
+        self,
+        parquet_access: ParquetAccess,
+        log=get_logger("parquetBarPyramidData"),
+    ):
+        super().__init__(log=log)
+
+        self._parquet = parquet_access
+
+    def __repr__(self):
+        return "parquetBarPyramidData"
+
+    @property
+    def parquet(self) -> ParquetAccess:
+        return self._parquet
+
+    def get_list_of_instruments(self) -> list:
+        return sorted(
+            set(
+                [
+                    identifier.split(LEVEL_SEPARATOR)[0]
+                    for identifier in self._get_all_identifiers()
+                ]
+            )
+        )
+
+    def _get_stored_levels_without_checking(self, instrument_code: str) -> dict:
+        stored_levels = {}
+        for level in self._get_levels_for_instrument(instrument_code):
+            bars = self.parquet.read_data_given_data_type_and_identifier(
+                data_type=BAR_PYRAMID_COLLECTION,
+                identifier=_identifier(instrument_code, level),
+            )
+            # stored at microsecond resolution
+            bars.index = bars.index.as_unit("ns")
+            stored_levels[level] = bars
+
+        return stored_levels
+
+    def _delete_bar_pyramid_without_any_warning_be_careful(self, instrument_code: str):
+        for level in self._get_levels_for_instrument(instrument_code):
+            self.parquet.delete_data_given_data_type_and_identifier(
+                data_type=BAR_PYRAMID_COLLECTION,
+                identifier=_identifier(instrument_code, level),
+            )
+        self.log.debug(
+            "Deleted bar pyramid for %s from %s" % (instrument_code, str(self)),
+            instrument_code=instrument_code,
+        )
+
+    def _write_levels(self, instrument_code: str, levels: dict):
+        for level, bars in levels.items():
+            self.parquet.write_data_given_data_type_and_identifier(
+                data_to_write=bars,
+                data_type=BAR_PYRAMID_COLLECTION,
+                identifier=_identifier(instrument_code, level),
+            )
+        self.log.debug(
+            "Wrote bar pyramid with levels %s for %s to %s"
+            % (str(list(levels.keys())), instrument_code, str(self)),
+            instrument_code=instrument_code,
+        )
+
+    def _replace_bars_from(self, instrument_code: str, level: str, bars: pd.DataFrame):
+        ## reads keep the last of rows with the same index, so this replaces them
+        self.parquet.append_data_given_data_type_and_identifier(
+            data_to_append=bars,
+            data_type=BAR_PYRAMID_COLLECTION,
+            identifier=_identifier(instrument_code, level),
+        )
+
+    def _get_levels_for_instrument(self, instrument_code: str) -> list:
+        levels = [
+            identifier.split(LEVEL_SEPARATOR)[1]
+            for identifier in self._get_all_identifiers()
+            if identifier.split(LEVEL_SEPARATOR)[0] == instrument_code
+        ]
+
+        return sorted(levels, key=lambda level: to_offset(level).nanos)
+
+    def _get_all_identifiers(self) -> list:
+        return self.parquet.get_all_identifiers_with_data_type(
+            data_type=BAR_PYRAMID_COLLECTION
+        )
+
+
+def _identifier(instrument_code: str, level: str) -> str:
+    return "%s%s%s" % (instrument_code, LEVEL_SEPARATOR, level)
@@ -0,0 +1,197 @@
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from sysdata.parquet.parquet_access import ParquetAccess
+from sysdata.crypto.crypto import cryptoPricesData
+from sysobjects.crypto_prices import cryptoPrices, PRICE_DATA_COLUMNS
+from syscore.constants import arg_not_supplied
+from syslogging.logger import *
+
+CRYPTO_PRICES_COLLECTION = "crypto_prices"
+DATETIME_COLUMN = "datetime"
+
+## a week of minute bars, so date range filters can skip most of a month's file
+ROW_GROUP_SIZE = 7 * 24 * 60
+
+
+@dataclass
+class ConfigParquetCryptoPrices:
+    """
+    :param price_dtype: Stored type of the price and volume columns. float32 halves the
+    size on disk but only has around 7 significant figures, which is coarser than the
+    tick size of large prices, so float64 is the default. Prices are always returned
+    as float64.
+    """
+
+    price_dtype: str = "float64"
+
+
+class parquetCryptoPricesData(cryptoPricesData):
+    """
+    Class to read / write crypto prices to and from parquet
+
+    Each instrument is a directory with one file per calendar month, holding a UTC
+    int64 nanosecond datetime column and the price columns. Reading a date range only
+    opens the months in the range, and within those only the row groups in the range.
+    """
+
+    def __init__(
+        self,
+        parquet_access: ParquetAccess,
+        log=get_logger("parquetCryptoPricesData"),
+        config: ConfigParquetCryptoPrices = arg_not_supplied,
+    ):
+        super().__init__(log=log)
+
+        if config is arg_not_supplied:
+            config = ConfigParquetCryptoPrices()
+
+        self._parquet = parquet_access
+        self._config = config
+
+    def __repr__(self):
+        return "parquetCryptoPricesData"
+
+    @property
+    def parquet(self) -> ParquetAccess:
+        return self._parquet
+
+    @property
+    def config(self) -> ConfigParquetCryptoPrices:
+        return self._config
+
+    def get_list_of_instruments(self) -> list:
+        return self.parquet.get_all_partitioned_identifiers_with_data_type(
+            data_type=CRYPTO_PRICES_COLLECTION
+        )
+
+    def get_crypto_prices_in_date_range(
+        self,
+        code: str,
+        start_date: datetime.datetime = arg_not_supplied,
+        end_date: datetime.datetime = arg_not_supplied,
+    ) -> cryptoPrices:
+        """
+        Prices with start_date <= datetime <= end_date; naive dates are taken as UTC
+        """
+        all_months = self.parquet.get_partitions_given_data_type_and_identifier(
+            data_type=CRYPTO_PRICES_COLLECTION, identifier=code
+        )
+        filters = []
+        months = all_months
+        if start_date is not arg_not_supplied:
+            start_date = _utc_timestamp(start_date)
+            filters.append((DATETIME_COLUMN, ">=", start_date.value))
+            months = [
+                month for month in months if month >= _month_partition(start_date)
+            ]
+        if end_date is not arg_not_supplied:
+            end_date = _utc_timestamp(end_date)
+            filters.append((DATETIME_COLUMN, "<=", end_date.value))
+            months = [month for month in months if month <= _month_partition(end_date)]
+
+        return self._read_months(code, months=months, filters=filters)
+
+    def _get_crypto_prices_without_checking(self, code: str) -> cryptoPrices:
+        months = self.parquet.get_partitions_given_data_type_and_identifier(
+            data_type=CRYPTO_PRICES_COLLECTION, identifier=code
+        )
+        if len(months) == 0:
+            self.log.warning(
+                "Can't find crypto prices for %s in %s" % (code, str(self)),
+                instrument_code=code,
+            )
+            return cryptoPrices.create_empty()
+
+        return self._read_months(code, months=months)
+
+    def _read_months(self, code: str, months: list, filters: list = None):
+        if len(months) == 0:
+            return cryptoPrices.create_empty()
+
+        if filters is not None and len(filters) == 0:
+            filters = None
+
+        data = self.parquet.read_partitions_given_data_type_and_identifier(
+            data_type=CRYPTO_PRICES_COLLECTION,
+            identifier=code,
+            partitions=months,
+            filters=filters,
+        )
+        index = pd.DatetimeIndex(
+            pd.to_datetime(data[DATETIME_COLUMN].values, utc=True),
+            name=DATETIME_COLUMN,
+        )
+        crypto_data = pd.DataFrame(
+            data[PRICE_DATA_COLUMNS].values.astype(np.float64),
+            index=index,
+            columns=PRICE_DATA_COLUMNS,
+        )
+
+        return cryptoPrices(crypto_data)
+
+    def _delete_crypto_prices_without_any_warning_be_careful(self, code: str):
+        self.parquet.delete_partitioned_data_given_data_type_and_identifier(
+            data_type=CRYPTO_PRICES_COLLECTION, identifier=code
+        )
+        self.log.debug(
+            "Deleted crypto prices for %s from %s" % (code, str(self)),
+            instrument_code=code,
+        )
+
+    def _add_crypto_prices_without_checking_for_existing_entry(
+        self, code: str, crypto_price_data: cryptoPrices
+    ):
+        ## Overwrites, like the csv version; months no longer in the data are removed
+        if self.parquet.does_partitioned_identifier_with_data_type_exist(
+            data_type=CRYPTO_PRICES_COLLECTION, identifier=code
+        ):
+            self._delete_crypto_prices_without_any_warning_be_careful(code)
+
+        crypto_price_data = pd.DataFrame(crypto_price_data).sort_index()
+        index = crypto_price_data.index
+        if index.tz is None:
+            index = index.tz_localize("utc")
+        else:
+            index = index.tz_convert("utc")
+
+        data_to_write = crypto_price_data[PRICE_DATA_COLUMNS].astype(
+            self.config.price_dtype
+        )
+        data_to_write.insert(0, DATETIME_COLUMN, index.asi8)
+        data_to_write = data_to_write.reset_index(drop=True)
+
+        month_keys = index.year * 100 + index.month
+        unique_month_keys, month_starts = np.unique(month_keys, return_index=True)
+        month_ends = list(month_starts[1:]) + [len(data_to_write)]
+        for month_key, month_start, month_end in zip(
+            unique_month_keys, month_starts, month_ends
+        ):
+            self.parquet.write_partition_given_data_type_and_identifier(
+                data_to_write=data_to_write.iloc[month_start:month_end],
+                data_type=CRYPTO_PRICES_COLLECTION,
+                identifier=code,
+                partition=str(month_key),
+                row_group_size=ROW_GROUP_SIZE,
+            )
+
+        self.log.debug(
+            "Wrote %d lines of crypto prices in %d months for %s to %s"
+            % (len(data_to_write), len(unique_month_keys), code, str(self)),
+            instrument_code=code,
+        )
+
+
+def _utc_timestamp(some_datetime: datetime.datetime) -> pd.Timestamp:
+    timestamp = pd.Timestamp(some_datetime)
+    if timestamp.tz is None:
+        return timestamp.tz_localize("utc")
+
+    return timestamp.tz_convert("utc")
+
+
+def _month_partition(timestamp: pd.Timestamp) -> str:
+    return str(timestamp.year * 100 + timestamp.month)
@@ -11,6 +11,7 @@ from sysobjects.contracts import futuresContract
 from syslogging.logger import *
 
 
+import numpy as np
 import pandas as pd
 
 CONTRACT_COLLECTION = "futures_contract_prices"
@@ -28,6 +29,8 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
     ):
         super().__init__(log=log)
         self._parquet = parquet_access
+        # the last prices read, so that a write which only adds rows can append them
+        self._last_prices_read = (None, None)
 
     def __repr__(self):
         return "parquetFuturesContractPriceData"
@@ -57,6 +60,7 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
         data = self.parquet.read_data_given_data_type_and_identifier(
             data_type=CONTRACT_COLLECTION, identifier=ident
         )
+        self._last_prices_read = (ident, data)
 
         return futuresContractPrices(data)
 
@@ -91,16 +95,28 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
         )
         futures_price_data_as_pd = pd.DataFrame(futures_price_data)
 
-        self.parquet.write_data_given_data_type_and_identifier(
-            data_type=CONTRACT_COLLECTION,
-            identifier=ident,
-            data_to_write=futures_price_data_as_pd,
+        rows_already_stored = self._number_of_rows_already_stored_given_ident(
+            ident, futures_price_data_as_pd
         )
+        if rows_already_stored > 0:
+            # only the new rows are written; the file is compacted separately
+            self.parquet.append_data_given_data_type_and_identifier(
+                data_type=CONTRACT_COLLECTION,
+                identifier=ident,
+                data_to_append=futures_price_data_as_pd.iloc[rows_already_stored:],
+            )
+        else:
+            self.parquet.write_data_given_data_type_and_identifier(
+                data_type=CONTRACT_COLLECTION,
+                identifier=ident,
+                data_to_write=futures_price_data_as_pd,
+            )
+        self._last_prices_read = (ident, futures_price_data_as_pd)
 
         self.log.debug(
             "Wrote %s lines of prices for %s at %s to %s"
             % (
-                len(futures_price_data),
+                len(futures_price_data) - rows_already_stored,
                 str(futures_contract_object.key),
                 str(frequency),
                 str(self),
@@ -109,6 +125,32 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
             method="temp",
         )
 
+    def _number_of_rows_already_stored_given_ident(
+        self, ident: str, futures_price_data_as_pd: pd.DataFrame
+    ) -> int:
+        ## If the prices to write are the stored prices with rows added at the end,
+        ## how many are stored; otherwise 0 and everything is written. Updates read
+        ## the stored prices just before writing, so that read is used if we have it
+        last_ident_read, stored_prices = self._last_prices_read
+        if last_ident_read != ident:
+            if not self.parquet.does_idenitifier_with_data_type_exist(
+                data_type=CONTRACT_COLLECTION, identifier=ident
+            ):
+                return 0
+            stored_prices = self.parquet.read_data_given_data_type_and_identifier(
+                data_type=CONTRACT_COLLECTION, identifier=ident
+            )
+
+        rows_stored = len(stored_prices)
+        if rows_stored == 0 or rows_stored >= len(futures_price_data_as_pd):
+            return 0
+
+        first_rows_to_write = futures_price_data_as_pd.iloc[:rows_stored]
+        if not _same_prices(first_rows_to_write, pd.DataFrame(stored_prices)):
+            return 0
+
+        return rows_stored
+
     def get_contracts_with_merged_price_data(self) -> listOfFuturesContracts:
         """
 
@@ -194,6 +236,7 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
         self.parquet.delete_data_given_data_type_and_identifier(
             data_type=CONTRACT_COLLECTION, identifier=ident
         )
+        self._last_prices_read = (None, None)
         self.log.debug(
             "Deleted all prices for %s from %s"
             % (futures_contract_object.key, str(self)),
@@ -202,6 +245,24 @@ class parquetFuturesContractPriceData(futuresContractPriceData):
         )
 
 
+def _same_prices(some_prices: pd.DataFrame, other_prices: pd.DataFrame) -> bool:
+    ## stored timestamps come back in microseconds, so DataFrame.equals won't do
+    if list(some_prices.columns) != list(other_prices.columns):
+        return False
+    try:
+        if not (some_prices.index == other_prices.index).all():
+            return False
+    except TypeError:
+        # eg timezone aware against naive
+        return False
+
+    return np.array_equal(
+        some_prices.to_numpy(dtype=np.float64),
+        other_prices.to_numpy(dtype=np.float64),
+        equal_nan=True,
+    )
+
+
 def from_key_to_freq_and_contract(keyname) -> Tuple[Frequency, futuresContract]:
     first_split = keyname.split("@")
     if len(first_split) == 1:
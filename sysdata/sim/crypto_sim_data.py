@@ -2,7 +2,7 @@ import datetime
 
 import pandas as pd
 
-from syscore.exceptions import missingInstrument
+from syscore.exceptions import missingInstrument, missingData
 from sysdata.sim.sim_data import simData
 
 from sysobjects.instruments import (
@@ -104,6 +104,17 @@ class cryptoSimData(simData):
 
         raise NotImplementedError()
 
+    def get_bar_pyramid_levels(self, instrument_code: str) -> dict:
+        """
+        Minute prices already aggregated to several bar sizes, for
+        barPyramid.from_stored_levels; raises missingData if there aren't any
+
+        :param instrument_code:
+        :return: dict of level: bars
+        """
+
+        raise missingData("No stored bar pyramid for %s" % instrument_code)
+
     def get_instrument_object_with_meta_data(
         self, instrument_code: str
     ) -> cryptoInstrumentWithMetaData:
@@ -3,6 +3,7 @@ from sysdata.sim.crypto_sim_data import cryptoSimData
 from sysdata.crypto.crypto import cryptoPricesData
 from sysdata.crypto.instruments import cryptoInstrumentData
 from sysdata.crypto.spread_costs import spreadCostData
+from sysdata.crypto.bar_pyramid import barPyramidData
 from sysdata.data_blob import dataBlob
 
 
@@ -61,6 +62,15 @@ class genericBlobUsingCryptoSimData(cryptoSimData):
     def get_spread_cost(self, instrument_code: str) -> float:
         return self.db_spread_cost_data.get_spread_cost(instrument_code)
 
+    def get_bar_pyramid_levels(self, instrument_code: str) -> dict:
+        try:
+            db_bar_pyramid_data = self.db_bar_pyramid_data
+        except AttributeError:
+            ## dataBlob doesn't have a bar pyramid store
+            raise missingData("No stored bar pyramid for %s" % instrument_code)
+
+        return db_bar_pyramid_data.get_stored_levels(instrument_code)
+
     @property
     def data(self):
         return self._data
@@ -77,3 +87,7 @@ class genericBlobUsingCryptoSimData(cryptoSimData):
     def db_spread_cost_data(self) -> spreadCostData:
         return self.data.db_spread_cost
 
+    @property
+    def db_bar_pyramid_data(self) -> barPyramidData:
+        return self.data.db_bar_pyramid
+
@@ -0,0 +1,199 @@
+"""
+Crypto sim data with minute prices memory mapped from disk
+
+A multi year minute universe is too big to hold in memory as DataFrames for every
+instrument alongside the system cache. Here the minute prices for each instrument are
+stored as raw numpy arrays, which are memory mapped when read: the DataFrames and Series
+handed to the system are views onto the files, and the operating system pages in only the
+parts that are used.
+
+The files hold what minute_prices would return for the full history, so the views can
+be sliced from the start date without any copying. Write them with
+write_memmap_minute_prices_from_sim_data, eg from sysinit/crypto/crypto_prices_to_memmap.py
+"""
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+from syscore.dateutils import ARBITRARY_START
+from syscore.fileutils import get_resolved_pathname
+from syscore.pandas.frequency import get_intraday_pdf_at_frequency
+from sysdata.data_blob import dataBlob
+from sysdata.sim.crypto_sim_data import cryptoSimData
+from sysdata.sim.crypto_sim_data_with_data_blob import genericBlobUsingCryptoSimData
+from sysobjects.crypto_prices import PRICE_DATA_COLUMNS
+
+DATETIME_FILENAME = "datetime.npy"
+PRICES_FILENAME = "prices.npy"
+
+
+class memmapMinutePrices(object):
+    """
+    Minute prices for one instrument, as views onto memory mapped files
+
+    Prices are stored as one (column, time) array, so each column is contiguous and the
+    DataFrame pandas builds over it is a single block that is never copied.
+    """
+
+    def __init__(self, instrument_path: str):
+        datetime_ns = np.load(
+            os.path.join(instrument_path, DATETIME_FILENAME), mmap_mode="r"
+        )
+        self._prices = np.load(
+            os.path.join(instrument_path, PRICES_FILENAME), mmap_mode="r"
+        )
+
+        utc_datetimes = pd.arrays.DatetimeArray(
+            datetime_ns.view("M8[ns]"),
+            dtype=pd.DatetimeTZDtype(tz="UTC"),
+            copy=False,
+        )
+        self._datetime_ns = datetime_ns
+        self._index = pd.DatetimeIndex(utc_datetimes, copy=False)
+
+    def __len__(self):
+        return len(self._index)
+
+    def as_df(self, start_date=arg_not_supplied, end_date=arg_not_supplied):
+        start, end = self._slice_for_dates(start_date, end_date)
+
+        return pd.DataFrame(
+            self._prices[:, start:end].T,
+            index=self._index[start:end],
+            columns=PRICE_DATA_COLUMNS,
+            copy=False,
+        )
+
+    def column(
+        self, column_name: str, start_date=arg_not_supplied, end_date=arg_not_supplied
+    ) -> pd.Series:
+        start, end = self._slice_for_dates(start_date, end_date)
+        column_idx = PRICE_DATA_COLUMNS.index(column_name)
+
+        return pd.Series(
+            self._prices[column_idx, start:end],
+            index=self._index[start:end],
+            name=column_name,
+            copy=False,
+        )
+
+    def _slice_for_dates(self, start_date, end_date) -> tuple:
+        ## inclusive at both ends, like .loc
+        start = 0
+        end = len(self._datetime_ns)
+        if start_date is not arg_not_supplied:
+            start = np.searchsorted(
+                self._datetime_ns, _utc_timestamp(start_date).value, side="left"
+            )
+        if end_date is not arg_not_supplied:
+            end = np.searchsorted(
+                self._datetime_ns, _utc_timestamp(end_date).value, side="right"
+            )
+
+        return start, end
+
+
+class memmapCryptoSimData(genericBlobUsingCryptoSimData):
+    """
+    Instrument meta data and costs come from the dataBlob as usual; prices come from the
+    memory mapped files in memmap_datapath
+    """
+
+    def __init__(self, data: dataBlob, memmap_datapath: str):
+        super().__init__(data)
+        self._memmap_datapath = get_resolved_pathname(memmap_datapath)
+        self._memmap_prices = {}
+
+    def __repr__(self):
+        return "memmapCryptoSimData object with %d instruments" % len(
+            self.get_instrument_list()
+        )
+
+    def get_instrument_list(self) -> list:
+        return [
+            name
+            for name in os.listdir(self._memmap_datapath)
+            if os.path.isdir(os.path.join(self._memmap_datapath, name))
+        ]
+
+    def get_crypto_prices(self, instrument_code: str) -> pd.DataFrame:
+        return self.memmap_minute_prices(instrument_code).as_df()
+
+    def minute_prices(self, instrument_code: str) -> pd.DataFrame:
+        ## already at minute frequency, so no need to resample; a view from the start date
+        minute_prices = self.memmap_minute_prices(instrument_code).as_df(
+            start_date=self.start_date_for_data()
+        )
+        if len(minute_prices) == 0:
+            raise Exception("No adjusted minute prices for %s" % instrument_code)
+
+        return minute_prices
+
+    def minute_price_column(self, instrument_code: str, column_name: str) -> pd.Series:
+        return self.memmap_minute_prices(instrument_code).column(
+            column_name, start_date=self.start_date_for_data()
+        )
+
+    def memmap_minute_prices(self, instrument_code: str) -> memmapMinutePrices:
+        memmap_prices = self._memmap_prices.get(instrument_code, None)
+        if memmap_prices is None:
+            instrument_path = os.path.join(self._memmap_datapath, instrument_code)
+            if not os.path.isdir(instrument_path):
+                raise Exception(
+                    "Instrument code %s has no memmap data in %s"
+                    % (instrument_code, self._memmap_datapath)
+                )
+            memmap_prices = memmapMinutePrices(instrument_path)
+            self._memmap_prices[instrument_code] = memmap_prices
+
+        return memmap_prices
+
+
+def write_memmap_minute_prices_from_sim_data(
+    sim_data: cryptoSimData, memmap_datapath: str, instrument_code: str
+):
+    ## same as sim_data.minute_prices, but for the full history; prices are in UTC
+    raw_prices = sim_data.get_raw_price_from_start_date(
+        instrument_code, start_date=_utc_timestamp(ARBITRARY_START)
+    )
+    minute_prices = get_intraday_pdf_at_frequency(raw_prices, frequency="min")
+
+    write_memmap_minute_prices(
+        minute_prices,
+        memmap_datapath=memmap_datapath,
+        instrument_code=instrument_code,
+    )
+
+
+def write_memmap_minute_prices(
+    minute_prices: pd.DataFrame, memmap_datapath: str, instrument_code: str
+):
+    instrument_path = os.path.join(
+        get_resolved_pathname(memmap_datapath), instrument_code
+    )
+    Path(instrument_path).mkdir(parents=True, exist_ok=True)
+
+    minute_prices = minute_prices.sort_index()
+    index = minute_prices.index
+    if index.tz is None:
+        index = index.tz_localize("utc")
+    else:
+        index = index.tz_convert("utc")
+
+    prices = np.ascontiguousarray(
+        minute_prices[PRICE_DATA_COLUMNS].values.astype(np.float64).T
+    )
+
+    np.save(os.path.join(instrument_path, DATETIME_FILENAME), index.asi8)
+    np.save(os.path.join(instrument_path, PRICES_FILENAME), prices)
+
+
+def _utc_timestamp(some_datetime) -> pd.Timestamp:
+    timestamp = pd.Timestamp(some_datetime)
+    if timestamp.tz is None:
+        return timestamp.tz_localize("utc")
+
+    return timestamp.tz_convert("utc")
@@ -0,0 +1,144 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysdata.data_blob import dataBlob
+from sysdata.sim.crypto_sim_data import cryptoSimData
+from sysdata.sim.memmap_crypto_sim_data import (
+    memmapCryptoSimData,
+    write_memmap_minute_prices_from_sim_data,
+)
+from sysobjects.crypto_prices import PRICE_DATA_COLUMNS
+
+INSTRUMENT_CODES = ["BTCUSDT", "ETHUSDT"]
+START_DATE = datetime.datetime(2024, 1, 2, 6, 30)
+
+
+class inMemoryCryptoSimData(cryptoSimData):
+    def __init__(self, crypto_prices: dict):
+        super().__init__()
+        self._crypto_prices = crypto_prices
+
+    def get_instrument_list(self) -> list:
+        return list(self._crypto_prices.keys())
+
+    def get_crypto_prices(self, instrument_code: str) -> pd.DataFrame:
+        return self._crypto_prices[instrument_code]
+
+
+def crypto_prices_with_gaps(periods: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=periods, freq="min", tz="UTC")
+    final = 30000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.001, periods)))
+    prices = pd.DataFrame(
+        dict(
+            OPEN=final,
+            HIGH=final * 1.001,
+            LOW=final * 0.999,
+            FINAL=final,
+            VOLUME=rng.uniform(0.0, 10.0, periods),
+        ),
+        index=index,
+    )[PRICE_DATA_COLUMNS]
+
+    # missing minutes, as from an exchange outage
+    return prices.drop(prices.index[1000:1090])
+
+
+def set_start_date(sim_data, start_date: datetime.datetime):
+    ## as if read from the config of the parent system
+    sim_data._start_date_for_data_from_config = start_date
+
+
+@pytest.fixture
+def source_and_memmap_sim_data(tmp_path):
+    source_sim_data = inMemoryCryptoSimData(
+        {
+            instrument_code: crypto_prices_with_gaps(3 * 24 * 60, seed=seed)
+            for seed, instrument_code in enumerate(INSTRUMENT_CODES)
+        }
+    )
+    for instrument_code in INSTRUMENT_CODES:
+        write_memmap_minute_prices_from_sim_data(
+            source_sim_data,
+            memmap_datapath=str(tmp_path),
+            instrument_code=instrument_code,
+        )
+
+    memmap_sim_data = memmapCryptoSimData(
+        dataBlob(log_name="test"), memmap_datapath=str(tmp_path)
+    )
+    for sim_data in [source_sim_data, memmap_sim_data]:
+        set_start_date(sim_data, START_DATE)
+
+    return source_sim_data, memmap_sim_data
+
+
+def test_minute_prices_match_source_sim_data(source_and_memmap_sim_data):
+    source_sim_data, memmap_sim_data = source_and_memmap_sim_data
+
+    assert sorted(memmap_sim_data.get_instrument_list()) == INSTRUMENT_CODES
+    for instrument_code in INSTRUMENT_CODES:
+        expected = source_sim_data.minute_prices(instrument_code)
+        assert expected.index[0] >= pd.Timestamp(START_DATE, tz="UTC")
+
+        pd.testing.assert_frame_equal(
+            memmap_sim_data.minute_prices(instrument_code),
+            expected,
+            check_freq=False,
+            check_names=False,
+        )
+        pd.testing.assert_series_equal(
+            memmap_sim_data.minute_price_column(instrument_code, "FINAL"),
+            expected["FINAL"],
+            check_freq=False,
+            check_names=False,
+        )
+
+
+def test_views_are_not_copies(source_and_memmap_sim_data):
+    _, memmap_sim_data = source_and_memmap_sim_data
+    instrument_code = INSTRUMENT_CODES[0]
+    memmap_prices = memmap_sim_data.memmap_minute_prices(instrument_code)
+    stored_prices = memmap_prices._prices
+
+    assert isinstance(stored_prices, np.memmap)
+    assert not stored_prices.flags.writeable
+
+    minute_prices = memmap_sim_data.minute_prices(instrument_code)
+    for column_name in PRICE_DATA_COLUMNS:
+        assert np.shares_memory(minute_prices[column_name].values, stored_prices)
+
+    final = memmap_sim_data.minute_price_column(instrument_code, "FINAL")
+    assert np.shares_memory(final.values, stored_prices)
+    assert np.shares_memory(final.index.asi8, memmap_prices._datetime_ns)
+
+    # cached, so the files are only mapped once
+    assert memmap_sim_data.memmap_minute_prices(instrument_code) is memmap_prices
+
+
+def test_date_slices_are_inclusive(source_and_memmap_sim_data):
+    source_sim_data, memmap_sim_data = source_and_memmap_sim_data
+    instrument_code = INSTRUMENT_CODES[1]
+    memmap_prices = memmap_sim_data.memmap_minute_prices(instrument_code)
+
+    start_date = datetime.datetime(2024, 1, 1, 12, 0)
+    end_date = pd.Timestamp("2024-01-02 00:00", tz="UTC")
+    expected = source_sim_data.get_crypto_prices(instrument_code)
+
+    pd.testing.assert_frame_equal(
+        memmap_prices.as_df(start_date=start_date, end_date=end_date),
+        expected[pd.Timestamp(start_date, tz="UTC") : end_date],
+        check_freq=False,
+        check_names=False,
+    )
+    assert len(memmap_prices.as_df()) == len(expected)
+
+
+def test_missing_instrument_raises(source_and_memmap_sim_data):
+    _, memmap_sim_data = source_and_memmap_sim_data
+
+    with pytest.raises(Exception):
+        memmap_sim_data.minute_prices("XRPUSDT")
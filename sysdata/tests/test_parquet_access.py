@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysdata.parquet.parquet_access import ParquetAccess
+
+DATA_TYPE = "futures_contract_prices"
+IDENTIFIER = "Hour@BTC#20240300"
+
+
+def hourly_prices(start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="h")
+    index.name = "index"
+    final = 100.0 + np.arange(periods, dtype=float)
+
+    return pd.DataFrame(
+        dict(
+            OPEN=final,
+            HIGH=final + 1.0,
+            LOW=final - 1.0,
+            FINAL=final,
+            VOLUME=np.ones(periods),
+        ),
+        index=index,
+    )
+
+
+@pytest.fixture
+def parquet_access(tmp_path):
+    return ParquetAccess(str(tmp_path))
+
+
+def test_appended_rows_are_read_with_history(parquet_access):
+    history = hourly_prices("2024-01-01", 1000)
+    parquet_access.write_data_given_data_type_and_identifier(
+        history, data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+    all_prices = hourly_prices("2024-01-01", 1010)
+    for start, end in [(1000, 1003), (1003, 1004), (1004, 1010)]:
+        parquet_access.append_data_given_data_type_and_identifier(
+            all_prices.iloc[start:end], data_type=DATA_TYPE, identifier=IDENTIFIER
+        )
+
+    assert (
+        parquet_access.number_of_deltas_given_data_type_and_identifier(
+            data_type=DATA_TYPE, identifier=IDENTIFIER
+        )
+        == 3
+    )
+    pd.testing.assert_frame_equal(
+        parquet_access.read_data_given_data_type_and_identifier(
+            data_type=DATA_TYPE, identifier=IDENTIFIER
+        ),
+        all_prices,
+        check_freq=False,
+        check_index_type=False,
+    )
+    assert parquet_access.get_all_identifiers_with_data_type(DATA_TYPE) == [IDENTIFIER]
+
+
+def test_compaction_merges_deltas_into_one_file(parquet_access):
+    all_prices = hourly_prices("2024-01-01", 500)
+    parquet_access.append_data_given_data_type_and_identifier(
+        all_prices.iloc[:400], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    parquet_access.append_data_given_data_type_and_identifier(
+        all_prices.iloc[400:], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    assert parquet_access.get_all_identifiers_with_deltas_given_data_type(
+        DATA_TYPE
+    ) == [IDENTIFIER]
+
+    deltas_merged = parquet_access.compact_data_given_data_type_and_identifier(
+        data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+    assert deltas_merged == 1
+    assert (
+        parquet_access.number_of_deltas_given_data_type_and_identifier(
+            data_type=DATA_TYPE, identifier=IDENTIFIER
+        )
+        == 0
+    )
+    pd.testing.assert_frame_equal(
+        parquet_access.read_data_given_data_type_and_identifier(
+            data_type=DATA_TYPE, identifier=IDENTIFIER
+        ),
+        all_prices,
+        check_freq=False,
+        check_index_type=False,
+    )
+
+
+def test_overwrite_and_delete_remove_deltas(parquet_access):
+    all_prices = hourly_prices("2024-01-01", 200)
+    parquet_access.write_data_given_data_type_and_identifier(
+        all_prices.iloc[:100], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    parquet_access.append_data_given_data_type_and_identifier(
+        all_prices.iloc[100:], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+    replacement = hourly_prices("2024-02-01", 50)
+    parquet_access.write_data_given_data_type_and_identifier(
+        replacement, data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    pd.testing.assert_frame_equal(
+        parquet_access.read_data_given_data_type_and_identifier(
+            data_type=DATA_TYPE, identifier=IDENTIFIER
+        ),
+        replacement,
+        check_freq=False,
+        check_index_type=False,
+    )
+
+    parquet_access.append_data_given_data_type_and_identifier(
+        hourly_prices("2024-03-01", 5), data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    parquet_access.delete_data_given_data_type_and_identifier(
+        data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    assert parquet_access.get_all_identifiers_with_data_type(DATA_TYPE) == []
+    assert (
+        parquet_access.get_all_identifiers_with_deltas_given_data_type(DATA_TYPE) == []
+    )
+
+
+def _write_with_deltas(parquet_access, all_prices: pd.DataFrame):
+    parquet_access.write_data_given_data_type_and_identifier(
+        all_prices.iloc[:100], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+    parquet_access.append_data_given_data_type_and_identifier(
+        all_prices.iloc[100:], data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+
+def _read(parquet_access) -> pd.DataFrame:
+    return parquet_access.read_data_given_data_type_and_identifier(
+        data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+
+@pytest.mark.parametrize(
+    "failing_step, rows_read_after_failure",
+    [
+        # before anything is removed, the old base and its deltas
+        ("sysdata.parquet.parquet_access._write_parquet_file", 200),
+        (
+            "sysdata.parquet.parquet_access.ParquetAccess."
+            "_delete_deltas_given_data_type_and_identifier",
+            200,
+        ),
+        # after the deltas are removed, the old base on its own
+        ("sysdata.parquet.parquet_access.os.replace", 100),
+    ],
+)
+def test_failed_rewrite_never_mixes_new_base_with_old_deltas(
+    parquet_access, monkeypatch, failing_step, rows_read_after_failure
+):
+    all_prices = hourly_prices("2024-01-01", 200)
+    _write_with_deltas(parquet_access, all_prices)
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(failing_step, fail)
+    # the new history has the same timestamps, so old deltas would override it
+    with pytest.raises(OSError):
+        parquet_access.write_data_given_data_type_and_identifier(
+            all_prices * 2.0, data_type=DATA_TYPE, identifier=IDENTIFIER
+        )
+    monkeypatch.undo()
+
+    pd.testing.assert_frame_equal(
+        _read(parquet_access),
+        all_prices.iloc[:rows_read_after_failure],
+        check_freq=False,
+        check_index_type=False,
+    )
+
+
+def test_compaction_does_not_undo_rewrite_while_it_runs(parquet_access, monkeypatch):
+    all_prices = hourly_prices("2024-01-01", 200)
+    _write_with_deltas(parquet_access, all_prices)
+    replacement = hourly_prices("2024-02-01", 50)
+
+    from sysdata.parquet import parquet_access as parquet_access_module
+
+    write_parquet_file = parquet_access_module._write_parquet_file
+
+    def rewrite_then_write(data_to_write, filename):
+        if filename.endswith(".compacting"):
+            monkeypatch.setattr(
+                parquet_access_module, "_write_parquet_file", write_parquet_file
+            )
+            parquet_access.write_data_given_data_type_and_identifier(
+                replacement, data_type=DATA_TYPE, identifier=IDENTIFIER
+            )
+        write_parquet_file(data_to_write, filename)
+
+    monkeypatch.setattr(
+        parquet_access_module, "_write_parquet_file", rewrite_then_write
+    )
+    deltas_merged = parquet_access.compact_data_given_data_type_and_identifier(
+        data_type=DATA_TYPE, identifier=IDENTIFIER
+    )
+
+    assert deltas_merged == 0
+    pd.testing.assert_frame_equal(
+        _read(parquet_access),
+        replacement,
+        check_freq=False,
+        check_index_type=False,
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.exceptions import missingData
+from syscore.pandas.bar_pyramid import barPyramid
+from sysdata.parquet.parquet_access import ParquetAccess
+from sysdata.parquet.parquet_bar_pyramid import (
+    BAR_PYRAMID_COLLECTION,
+    parquetBarPyramidData,
+)
+
+INSTRUMENT_CODE = "BTCUSDT"
+
+
+def minute_prices(periods: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2024-01-01 09:13", periods=periods, freq="min", tz="UTC")
+    index = index[rng.random(len(index)) > 0.1]
+    final = 30000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.001, len(index))))
+
+    return pd.DataFrame(
+        dict(
+            OPEN=final,
+            HIGH=final * 1.001,
+            LOW=final * 0.999,
+            FINAL=final,
+            VOLUME=rng.uniform(0.0, 10.0, len(index)),
+        ),
+        index=index,
+    )
+
+
+@pytest.fixture
+def parquet_bar_pyramid(tmp_path):
+    return parquetBarPyramidData(ParquetAccess(str(tmp_path)))
+
+
+def assert_same_levels(stored_levels: dict, expected_levels: dict):
+    assert list(stored_levels.keys()) == list(expected_levels.keys())
+    for level, bars in expected_levels.items():
+        pd.testing.assert_frame_equal(
+            stored_levels[level], bars, check_freq=False, check_names=False
+        )
+
+
+def test_written_pyramid_is_read_back(parquet_bar_pyramid):
+    pyramid = barPyramid(minute_prices(5000))
+    parquet_bar_pyramid.write_bar_pyramid(INSTRUMENT_CODE, pyramid)
+
+    assert parquet_bar_pyramid.get_list_of_instruments() == [INSTRUMENT_CODE]
+    assert_same_levels(
+        parquet_bar_pyramid.get_stored_levels(INSTRUMENT_CODE),
+        pyramid.aggregated_levels,
+    )
+
+    with pytest.raises(missingData):
+        parquet_bar_pyramid.get_stored_levels("ETHUSDT")
+
+
+def test_updates_append_and_match_pyramid_from_all_minutes(parquet_bar_pyramid):
+    all_minutes = minute_prices(6 * 24 * 60)
+    parquet_bar_pyramid.write_bar_pyramid(
+        INSTRUMENT_CODE, barPyramid(all_minutes.iloc[:3000])
+    )
+
+    for minute in [3000, 3001, 5500, len(all_minutes)]:
+        first_minute_needed = parquet_bar_pyramid.first_minute_needed_to_update(
+            INSTRUMENT_CODE
+        )
+        minutes_so_far = all_minutes.iloc[:minute]
+        parquet_bar_pyramid.update_bar_pyramid(
+            INSTRUMENT_CODE, minutes_so_far[minutes_so_far.index >= first_minute_needed]
+        )
+
+    assert (
+        parquet_bar_pyramid.parquet.number_of_deltas_given_data_type_and_identifier(
+            data_type=BAR_PYRAMID_COLLECTION, identifier=INSTRUMENT_CODE + "@5min"
+        )
+        == 4
+    )
+    assert_same_levels(
+        parquet_bar_pyramid.get_stored_levels(INSTRUMENT_CODE),
+        barPyramid(all_minutes).aggregated_levels,
+    )
+
+
+def test_rewrite_replaces_levels(parquet_bar_pyramid):
+    parquet_bar_pyramid.write_bar_pyramid(
+        INSTRUMENT_CODE, barPyramid(minute_prices(5000), levels=["5min", "1h"])
+    )
+    pyramid = barPyramid(minute_prices(3000), levels=["15min", "1D"])
+    parquet_bar_pyramid.write_bar_pyramid(INSTRUMENT_CODE, pyramid)
+
+    assert_same_levels(
+        parquet_bar_pyramid.get_stored_levels(INSTRUMENT_CODE),
+        pyramid.aggregated_levels,
+    )
@@ -0,0 +1,156 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysdata.parquet.parquet_access import ParquetAccess
+from sysdata.parquet.parquet_crypto_prices import (
+    CRYPTO_PRICES_COLLECTION,
+    ConfigParquetCryptoPrices,
+    parquetCryptoPricesData,
+)
+from sysobjects.crypto_prices import PRICE_DATA_COLUMNS
+
+INSTRUMENT_CODE = "BTCUSDT"
+
+
+def minute_prices(start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="min", tz="UTC")
+    final = 30000.0 + np.arange(periods, dtype=float) / 7.0
+
+    return pd.DataFrame(
+        dict(
+            OPEN=final,
+            HIGH=final + 1.0,
+            LOW=final - 1.0,
+            FINAL=final,
+            VOLUME=np.arange(periods, dtype=float),
+        ),
+        index=index,
+    )[PRICE_DATA_COLUMNS]
+
+
+@pytest.fixture
+def parquet_crypto_prices(tmp_path):
+    return parquetCryptoPricesData(ParquetAccess(str(tmp_path)))
+
+
+def assert_prices_equal(crypto_prices, expected):
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(crypto_prices),
+        expected,
+        check_freq=False,
+        check_names=False,
+    )
+
+
+def test_round_trip_across_months(parquet_crypto_prices):
+    # 31 Jan 23:00 to 2 Mar, so three months
+    prices = minute_prices("2024-01-31 23:00", 31 * 24 * 60)
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE, prices, ignore_duplication=True
+    )
+
+    assert parquet_crypto_prices.get_list_of_instruments() == [INSTRUMENT_CODE]
+    assert parquet_crypto_prices.parquet.get_partitions_given_data_type_and_identifier(
+        data_type=CRYPTO_PRICES_COLLECTION, identifier=INSTRUMENT_CODE
+    ) == ["202401", "202402", "202403"]
+
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices(INSTRUMENT_CODE), prices
+    )
+
+
+def test_unsorted_and_naive_prices_are_stored_sorted_in_utc(parquet_crypto_prices):
+    prices = minute_prices("2024-01-31 23:00", 180)
+    naive_and_shuffled = prices.tz_localize(None).iloc[::-1]
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE, naive_and_shuffled, ignore_duplication=True
+    )
+
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices(INSTRUMENT_CODE), prices
+    )
+
+
+def test_date_range_filters_are_inclusive(parquet_crypto_prices):
+    prices = minute_prices("2024-01-31 23:00", 31 * 24 * 60)
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE, prices, ignore_duplication=True
+    )
+
+    start_date = datetime.datetime(2024, 2, 10, 12, 30)
+    end_date = pd.Timestamp("2024-03-01 01:15", tz="UTC")
+
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices_in_date_range(
+            INSTRUMENT_CODE, start_date=start_date, end_date=end_date
+        ),
+        prices[pd.Timestamp(start_date, tz="UTC") : end_date],
+    )
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices_in_date_range(
+            INSTRUMENT_CODE, start_date=start_date
+        ),
+        prices[pd.Timestamp(start_date, tz="UTC") :],
+    )
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices_in_date_range(
+            INSTRUMENT_CODE, end_date=end_date
+        ),
+        prices[:end_date],
+    )
+
+    # a range with no months stored
+    assert (
+        len(
+            parquet_crypto_prices.get_crypto_prices_in_date_range(
+                INSTRUMENT_CODE, start_date=datetime.datetime(2025, 1, 1)
+            )
+        )
+        == 0
+    )
+
+
+def test_overwrite_removes_months_no_longer_in_data(parquet_crypto_prices):
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE,
+        minute_prices("2024-01-31 23:00", 31 * 24 * 60),
+        ignore_duplication=True,
+    )
+
+    replacement = minute_prices("2024-02-05", 60)
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE, replacement, ignore_duplication=True
+    )
+
+    assert parquet_crypto_prices.parquet.get_partitions_given_data_type_and_identifier(
+        data_type=CRYPTO_PRICES_COLLECTION, identifier=INSTRUMENT_CODE
+    ) == ["202402"]
+    assert_prices_equal(
+        parquet_crypto_prices.get_crypto_prices(INSTRUMENT_CODE), replacement
+    )
+
+
+def test_float32_storage_is_read_back_as_float64(tmp_path):
+    parquet_crypto_prices = parquetCryptoPricesData(
+        ParquetAccess(str(tmp_path)),
+        config=ConfigParquetCryptoPrices(price_dtype="float32"),
+    )
+    prices = minute_prices("2024-01-01", 100)
+    parquet_crypto_prices.add_crypto_prices(
+        INSTRUMENT_CODE, prices, ignore_duplication=True
+    )
+
+    month_filename = os.path.join(
+        str(tmp_path), CRYPTO_PRICES_COLLECTION, INSTRUMENT_CODE, "202401.parquet"
+    )
+    assert pd.read_parquet(month_filename)["FINAL"].dtype == np.float32
+
+    read_back = pd.DataFrame(parquet_crypto_prices.get_crypto_prices(INSTRUMENT_CODE))
+    assert (read_back.dtypes == np.float64).all()
+    pd.testing.assert_frame_equal(
+        read_back, prices, check_freq=False, check_names=False, rtol=1e-6
+    )
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from syscore.dateutils import Frequency
+from sysdata.parquet.parquet_access import ParquetAccess
+from sysdata.parquet.parquet_futures_per_contract_prices import (
+    CONTRACT_COLLECTION,
+    parquetFuturesContractPriceData,
+    from_contract_and_freq_to_key,
+    _same_prices,
+)
+from sysobjects.contracts import futuresContract
+from sysobjects.futures_per_contract_prices import futuresContractPrices
+
+CONTRACT = futuresContract("BTC", "20240300")
+FREQUENCY = Frequency.Hour
+
+
+def hourly_prices(periods: int) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=periods, freq="h")
+    final = 100.0 + np.arange(periods, dtype=float)
+
+    return pd.DataFrame(
+        dict(
+            FINAL=final,
+            HIGH=final + 1.0,
+            LOW=final - 1.0,
+            OPEN=final,
+            VOLUME=np.ones(periods),
+        ),
+        index=index,
+    )
+
+
+@pytest.fixture
+def parquet_access(tmp_path):
+    return ParquetAccess(str(tmp_path))
+
+
+def write(price_data: parquetFuturesContractPriceData, prices: pd.DataFrame):
+    price_data._write_prices_at_frequency_for_contract_object_no_checking(
+        futures_contract_object=CONTRACT,
+        futures_price_data=futuresContractPrices(prices.copy()),
+        frequency=FREQUENCY,
+    )
+
+
+def read(price_data: parquetFuturesContractPriceData) -> pd.DataFrame:
+    return pd.DataFrame(
+        price_data._get_prices_at_frequency_for_contract_object_no_checking(
+            CONTRACT, frequency=FREQUENCY
+        )
+    )
+
+
+def number_of_deltas(parquet_access: ParquetAccess) -> int:
+    return parquet_access.number_of_deltas_given_data_type_and_identifier(
+        data_type=CONTRACT_COLLECTION,
+        identifier=from_contract_and_freq_to_key(CONTRACT, frequency=FREQUENCY),
+    )
+
+
+def assert_stored(price_data: parquetFuturesContractPriceData, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(
+        read(price_data),
+        expected,
+        check_freq=False,
+        check_index_type=False,
+        check_names=False,
+    )
+
+
+@pytest.mark.parametrize("read_before_write", [True, False])
+def test_rows_added_at_the_end_are_appended(parquet_access, read_before_write):
+    all_prices = hourly_prices(120)
+    write(parquetFuturesContractPriceData(parquet_access), all_prices.iloc[:100])
+
+    # as an update does; otherwise the stored prices are read to compare
+    price_data = parquetFuturesContractPriceData(parquet_access)
+    if read_before_write:
+        read(price_data)
+    write(price_data, all_prices.iloc[:110])
+    write(price_data, all_prices)
+
+    assert number_of_deltas(parquet_access) == 2
+    assert_stored(price_data, all_prices)
+
+
+def test_changed_history_is_rewritten(parquet_access):
+    price_data = parquetFuturesContractPriceData(parquet_access)
+    all_prices = hourly_prices(120)
+    write(price_data, all_prices.iloc[:100])
+    write(price_data, all_prices.iloc[:110])
+
+    changed_prices = all_prices.copy()
+    changed_prices.iloc[50, 0] = 1.0
+    write(price_data, changed_prices)
+
+    assert number_of_deltas(parquet_access) == 0
+    assert_stored(price_data, changed_prices)
+
+
+@pytest.mark.parametrize("rows_to_write", [100, 80])
+def test_no_new_rows_is_rewritten(parquet_access, rows_to_write):
+    price_data = parquetFuturesContractPriceData(parquet_access)
+    all_prices = hourly_prices(100)
+    write(price_data, all_prices)
+    write(price_data, all_prices.iloc[:rows_to_write])
+
+    assert number_of_deltas(parquet_access) == 0
+    assert_stored(price_data, all_prices.iloc[:rows_to_write])
+
+
+def test_same_prices():
+    prices = hourly_prices(10)
+    # as they come back from parquet
+    stored_prices = prices.copy()
+    stored_prices.index = stored_prices.index.as_unit("us")
+    stored_prices.iloc[3, 4] = np.nan
+    prices.iloc[3, 4] = np.nan
+
+    assert _same_prices(prices, stored_prices)
+
+    changed_prices = prices.copy()
+    changed_prices.iloc[5, 0] += 0.5
+    assert not _same_prices(changed_prices, stored_prices)
+
+    assert not _same_prices(prices[["FINAL", "OPEN"]], stored_prices)
+    assert not _same_prices(prices.tz_localize("UTC"), stored_prices)
+    assert not _same_prices(prices.shift(1, freq="h"), stored_prices)
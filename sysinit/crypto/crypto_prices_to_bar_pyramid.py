@@ -0,0 +1,78 @@
+"""
+Build the bar pyramid for each instrument from crypto minute prices, for use with
+genericBlobUsingCryptoSimData (add parquetBarPyramidData to its dataBlob)
+
+Building needs the whole history; once built, update_bar_pyramid_from_crypto_prices
+only reads prices from the start of the last day stored, so run it after new prices
+are added.
+"""
+from syscore.pandas.bar_pyramid import barPyramid
+from syscore.pandas.frequency import get_intraday_pdf_at_frequency
+from sysdata.crypto.bar_pyramid import barPyramidData
+from sysdata.data_blob import dataBlob
+from sysdata.parquet.parquet_bar_pyramid import parquetBarPyramidData
+from sysdata.parquet.parquet_crypto_prices import parquetCryptoPricesData
+
+
+def write_bar_pyramid_from_crypto_prices(
+    crypto_prices_data: parquetCryptoPricesData,
+    bar_pyramid_data: barPyramidData,
+    instrument_code: str,
+):
+    crypto_prices = crypto_prices_data.get_crypto_prices(instrument_code)
+    if len(crypto_prices) == 0:
+        return
+
+    ## same minutes as simData.minute_prices
+    minute_prices = get_intraday_pdf_at_frequency(crypto_prices, frequency="min")
+    bar_pyramid_data.write_bar_pyramid(instrument_code, barPyramid(minute_prices))
+
+
+def update_bar_pyramid_from_crypto_prices(
+    crypto_prices_data: parquetCryptoPricesData,
+    bar_pyramid_data: barPyramidData,
+    instrument_code: str,
+):
+    if not bar_pyramid_data.has_bar_pyramid(instrument_code):
+        write_bar_pyramid_from_crypto_prices(
+            crypto_prices_data, bar_pyramid_data, instrument_code=instrument_code
+        )
+        return
+
+    first_minute_needed = bar_pyramid_data.first_minute_needed_to_update(
+        instrument_code
+    )
+    crypto_prices = crypto_prices_data.get_crypto_prices_in_date_range(
+        instrument_code, start_date=first_minute_needed
+    )
+    minute_prices = get_intraday_pdf_at_frequency(crypto_prices, frequency="min")
+    bar_pyramid_data.update_bar_pyramid(instrument_code, minute_prices)
+
+
+if __name__ == "__main__":
+    data = dataBlob()
+    parquet_crypto_prices = parquetCryptoPricesData(data.parquet_access)
+    parquet_bar_pyramid = parquetBarPyramidData(data.parquet_access)
+
+    rebuild = input("Rebuild pyramids from the full history? (y/n) <return for n> ")
+
+    instrument_code = input("Instrument code? <return for ALL instruments> ")
+    if instrument_code == "":
+        instrument_list = parquet_crypto_prices.get_list_of_instruments()
+    else:
+        instrument_list = [instrument_code]
+
+    for instrument_code in instrument_list:
+        print(instrument_code)
+        if rebuild == "y":
+            write_bar_pyramid_from_crypto_prices(
+                parquet_crypto_prices,
+                parquet_bar_pyramid,
+                instrument_code=instrument_code,
+            )
+        else:
+            update_bar_pyramid_from_crypto_prices(
+                parquet_crypto_prices,
+                parquet_bar_pyramid,
+                instrument_code=instrument_code,
+            )
@@ -0,0 +1,27 @@
+"""
+Write minute prices to memory mapped files, for use with memmapCryptoSimData
+"""
+from sysdata.data_blob import dataBlob
+from sysdata.sim.crypto_sim_data_with_data_blob import genericBlobUsingCryptoSimData
+from sysdata.sim.memmap_crypto_sim_data import write_memmap_minute_prices_from_sim_data
+
+if __name__ == "__main__":
+    input("Will overwrite existing memmap prices are you sure?! CTL-C to abort")
+
+    ## MODIFY TO READ PRICES FROM SOMEWHERE OTHER THAN THE DEFAULT DATABASE
+    data = dataBlob()
+    sim_data = genericBlobUsingCryptoSimData(data)
+
+    memmap_datapath = input("Directory to write memmap files to? ")
+
+    instrument_code = input("Instrument code? <return for ALL instruments> ")
+    if instrument_code == "":
+        instrument_list = sim_data.get_instrument_list()
+    else:
+        instrument_list = [instrument_code]
+
+    for instrument_code in instrument_list:
+        print(instrument_code)
+        write_memmap_minute_prices_from_sim_data(
+            sim_data, memmap_datapath=memmap_datapath, instrument_code=instrument_code
+        )
@@ -0,0 +1,49 @@
+"""
+Copy from csv repo files to parquet for crypto prices
+
+Reading the parquet store is much quicker than parsing the csv files; to use it in a
+backtest add parquetCryptoPricesData to the dataBlob used by
+genericBlobUsingCryptoSimData. The bar pyramid of each instrument copied is rebuilt too;
+add parquetBarPyramidData to the dataBlob to use it.
+"""
+from syscore.constants import arg_not_supplied
+
+from sysdata.data_blob import dataBlob
+from sysdata.csv.csv_crypto import csvCryptoPricesData
+from sysdata.parquet.parquet_crypto_prices import parquetCryptoPricesData
+from sysdata.parquet.parquet_bar_pyramid import parquetBarPyramidData
+from sysinit.crypto.crypto_prices_to_bar_pyramid import (
+    write_bar_pyramid_from_crypto_prices,
+)
+
+if __name__ == "__main__":
+    input("Will overwrite existing prices are you sure?! CTL-C to abort")
+    data = dataBlob()
+    parquet_crypto_prices = parquetCryptoPricesData(data.parquet_access)
+    parquet_bar_pyramid = parquetBarPyramidData(data.parquet_access)
+
+    ## MODIFY PATH TO USE SOMETHING OTHER THAN DEFAULT
+    csv_crypto_datapath = arg_not_supplied
+    csv_crypto_prices = csvCryptoPricesData(csv_crypto_datapath)
+
+    instrument_code = input("Instrument code? <return for ALL instruments> ")
+    if instrument_code == "":
+        instrument_list = csv_crypto_prices.get_list_of_instruments()
+    else:
+        instrument_list = [instrument_code]
+
+    for instrument_code in instrument_list:
+        print(instrument_code)
+
+        crypto_prices = csv_crypto_prices.get_crypto_prices(instrument_code)
+
+        print(crypto_prices)
+
+        parquet_crypto_prices.add_crypto_prices(
+            instrument_code, crypto_prices, ignore_duplication=True
+        )
+
+        ## all the prices are replaced, so the pyramid is built again
+        write_bar_pyramid_from_crypto_prices(
+            parquet_crypto_prices, parquet_bar_pyramid, instrument_code=instrument_code
+        )
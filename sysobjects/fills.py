@@ -5,6 +5,7 @@ from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 
+from syscore.constants import arg_not_supplied
 from sysexecution.orders.named_order_objects import missing_order, named_object
 
 from sysexecution.orders.base_orders import Order
@@ -51,6 +52,9 @@ class ListOfFills(list):
 
         return dict(qty=qty_list, price=price_list, date=date_list)
 
+    def as_arrays(self) -> dict:
+        return list_of_fills_as_arrays(self)
+
     def as_pd_df(self) -> pd.DataFrame:
         self_as_dict = self._as_dict_of_lists()
         date_index = self_as_dict.pop("date")
@@ -68,6 +72,184 @@ class ListOfFills(list):
         return cls(list_of_fills)
 
 
+class ListOfFillsAsArrays(object):
+    """
+    Same methods as ListOfFills, but the fills are held as columns rather than as a
+    list of Fill objects, which are only created if the fills are iterated over
+
+    >>> dates = pd.date_range("2024-01-01", periods=3, freq="min")
+    >>> fills = ListOfFillsAsArrays(
+    ...     date=dates, qty=np.array([1.0, 0.0, -2.0]), price=np.array([10.0, np.nan, 11.0])
+    ... )
+    >>> len(fills)
+    2
+    >>> fills[1]
+    Fill(date=Timestamp('2024-01-01 00:02:00'), qty=-2.0, price=11.0, price_requires_slippage_adjustment=False)
+    """
+
+    def __init__(
+        self,
+        date: pd.DatetimeIndex,
+        qty: np.ndarray,
+        price: np.ndarray,
+        price_requires_slippage_adjustment: np.ndarray = arg_not_supplied,
+    ):
+        qty = np.asarray(qty, dtype=float)
+        price = np.asarray(price, dtype=float)
+        if price_requires_slippage_adjustment is arg_not_supplied:
+            price_requires_slippage_adjustment = np.full(len(qty), False)
+        price_requires_slippage_adjustment = np.asarray(
+            price_requires_slippage_adjustment, dtype=bool
+        )
+
+        # as ListOfFills, unfilled are removed
+        not_empty = qty != 0
+        if not not_empty.all():
+            date = date[not_empty]
+            qty = qty[not_empty]
+            price = price[not_empty]
+            price_requires_slippage_adjustment = price_requires_slippage_adjustment[
+                not_empty
+            ]
+
+        self._date = pd.DatetimeIndex(date)
+        self._qty = qty
+        self._price = price
+        self._price_requires_slippage_adjustment = price_requires_slippage_adjustment
+
+    def __repr__(self):
+        return "ListOfFillsAsArrays with %d fills" % len(self)
+
+    def __len__(self):
+        return len(self._qty)
+
+    def __iter__(self):
+        for date, qty, price, requires_slippage in zip(
+            self._date,
+            self._qty.tolist(),
+            self._price.tolist(),
+            self._price_requires_slippage_adjustment.tolist(),
+        ):
+            yield Fill(
+                date=date,
+                qty=qty,
+                price=price,
+                price_requires_slippage_adjustment=requires_slippage,
+            )
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return ListOfFillsAsArrays(
+                date=self._date[item],
+                qty=self._qty[item],
+                price=self._price[item],
+                price_requires_slippage_adjustment=self._price_requires_slippage_adjustment[
+                    item
+                ],
+            )
+
+        return Fill(
+            date=self._date[item],
+            qty=float(self._qty[item]),
+            price=float(self._price[item]),
+            price_requires_slippage_adjustment=bool(
+                self._price_requires_slippage_adjustment[item]
+            ),
+        )
+
+    def __add__(self, other) -> list:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> list:
+        return list(other) + list(self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    @classmethod
+    def from_list_of_fills(cls, list_of_fills: list):
+        return cls(**list_of_fills_as_arrays(list_of_fills))
+
+    @classmethod
+    def from_position_series_and_prices(cls, positions: pd.Series, price: pd.Series):
+        (
+            trades_without_zeros,
+            prices_aligned_to_trades,
+        ) = _get_valid_trades_and_aligned_prices(positions=positions, price=price)
+
+        return cls(
+            date=prices_aligned_to_trades.index,
+            qty=trades_without_zeros.values,
+            price=prices_aligned_to_trades.values,
+            price_requires_slippage_adjustment=np.full(len(trades_without_zeros), True),
+        )
+
+    def as_arrays(self) -> dict:
+        ## the columns themselves, not copies
+        return dict(
+            date=self._date,
+            qty=self._qty,
+            price=self._price,
+            price_requires_slippage_adjustment=self._price_requires_slippage_adjustment,
+        )
+
+    def as_pd_df(self) -> pd.DataFrame:
+        df = pd.DataFrame(
+            dict(qty=self._qty, price=self._price), index=self._date, copy=False
+        )
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+
+        return df
+
+
+def fill_arrays_from_fills(fills) -> dict:
+    ## ListOfFills and ListOfFillsAsArrays have their own; any other list of Fill
+    if isinstance(fills, (ListOfFills, ListOfFillsAsArrays)):
+        return fills.as_arrays()
+
+    return list_of_fills_as_arrays(fills)
+
+
+def list_of_fills_as_arrays(list_of_fills: list) -> dict:
+    ## unsorted, one entry per fill, for calculating over all fills at once
+    return dict(
+        date=pd.DatetimeIndex([fill.date for fill in list_of_fills]),
+        qty=np.array([fill.qty for fill in list_of_fills], dtype=float),
+        price=np.array([fill.price for fill in list_of_fills], dtype=float),
+        price_requires_slippage_adjustment=np.array(
+            [fill.price_requires_slippage_adjustment for fill in list_of_fills],
+            dtype=bool,
+        ),
+    )
+
+
+def concatenate_fill_arrays(list_of_fill_arrays: list) -> dict:
+    non_empty_fill_arrays = [
+        fill_arrays
+        for fill_arrays in list_of_fill_arrays
+        if len(fill_arrays["qty"]) > 0
+    ]
+    if len(non_empty_fill_arrays) > 0:
+        # an empty date index has no timezone, so would upset the others
+        list_of_fill_arrays = non_empty_fill_arrays
+
+    first_fill_arrays = list_of_fill_arrays[0]
+    other_fill_arrays = list_of_fill_arrays[1:]
+
+    return dict(
+        date=first_fill_arrays["date"].append(
+            [fill_arrays["date"] for fill_arrays in other_fill_arrays]
+        ),
+        **{
+            key: np.concatenate(
+                [fill_arrays[key] for fill_arrays in list_of_fill_arrays]
+            )
+            for key in ["qty", "price", "price_requires_slippage_adjustment"]
+        },
+    )
+
+
 def _list_of_fills_from_position_series_and_prices(
     positions: pd.Series, price: pd.Series
 ) -> ListOfFills:
@@ -0,0 +1,73 @@
+"""
+Merge rows appended to parquet files back into one file per identifier
+
+Price and bar pyramid updates append new rows to small delta files (see
+sysdata.parquet.parquet_access), so they don't rewrite the whole history each time.
+Reads still give the full history, but each delta is another file to open, so this is
+run separately from the updates to fold them back in.
+"""
+from syscore.constants import success
+
+from sysdata.data_blob import dataBlob
+from sysdata.parquet.parquet_futures_per_contract_prices import CONTRACT_COLLECTION
+from sysdata.parquet.parquet_bar_pyramid import BAR_PYRAMID_COLLECTION
+
+DATA_TYPES_TO_COMPACT = [CONTRACT_COLLECTION, BAR_PYRAMID_COLLECTION]
+
+## leave identifiers with fewer deltas than this until next time
+MIN_DELTAS_TO_COMPACT = 1
+
+
+def compact_parquet_data():
+    with dataBlob(log_name="Compact-Parquet-Data") as data:
+        compact_parquet_data_object = compactParquetData(data)
+        compact_parquet_data_object.compact_parquet_data()
+
+    return success
+
+
+class compactParquetData(object):
+    def __init__(self, data):
+        self.data = data
+
+    def compact_parquet_data(self, min_deltas_to_compact: int = MIN_DELTAS_TO_COMPACT):
+        for data_type in DATA_TYPES_TO_COMPACT:
+            compact_parquet_data_type(
+                self.data,
+                data_type=data_type,
+                min_deltas_to_compact=min_deltas_to_compact,
+            )
+
+
+def compact_parquet_data_type(
+    data: dataBlob, data_type: str, min_deltas_to_compact: int = MIN_DELTAS_TO_COMPACT
+):
+    parquet_access = data.parquet_access
+    for identifier in parquet_access.get_all_identifiers_with_deltas_given_data_type(
+        data_type
+    ):
+        number_of_deltas = (
+            parquet_access.number_of_deltas_given_data_type_and_identifier(
+                data_type=data_type, identifier=identifier
+            )
+        )
+        if number_of_deltas < min_deltas_to_compact:
+            continue
+
+        try:
+            deltas_merged = parquet_access.compact_data_given_data_type_and_identifier(
+                data_type=data_type, identifier=identifier
+            )
+        except Exception as e:
+            data.log.warning(
+                "Couldn't compact %s/%s: %s" % (data_type, identifier, str(e))
+            )
+            continue
+
+        data.log.debug(
+            "Compacted %d deltas into %s/%s" % (deltas_merged, data_type, identifier)
+        )
+
+
+if __name__ == "__main__":
+    compact_parquet_data()
@@ -19,6 +19,11 @@ from sysproduction.data.strategies import (
     get_valid_strategy_name_from_user,
     diagStrategiesConfig,
 )
+from systems.cache_store import (
+    save_cache_to_directory,
+    load_cache_from_directory,
+    is_cache_directory,
+)
 
 
 PICKLE_EXT = ".pck"
@@ -92,10 +97,12 @@ class dataBacktest(productionDataLayerGeneric):
 
 
 def get_list_of_timestamps_for_strategy(strategy_name):
-    list_of_files = get_list_of_pickle_files_for_strategy(strategy_name)
-    list_of_timestamps = [
-        rchop(file_name, PICKLE_FILE_SUFFIX) for file_name in list_of_files
-    ]
+    list_of_files = get_list_of_pickle_files_for_strategy(
+        strategy_name
+    ) + get_list_of_cache_directories_for_strategy(strategy_name)
+    list_of_timestamps = list(
+        set([rchop(file_name, PICKLE_FILE_SUFFIX) for file_name in list_of_files])
+    )
 
     return list_of_timestamps
 
@@ -175,17 +182,23 @@ def load_backtest_state(system, strategy_name, date_time_signature):
     :param system: a system object whose config is compatible
     :param strategy_name: str
 
-    :return: system with cache filled from pickled backtest state file
+    :return: system with cache filled from saved backtest state; items are only read
+        from file when they are used
     """
-    filename = get_backtest_pickle_filename(strategy_name, date_time_signature)
-    system.cache.unpickle(filename)
+    directory = get_backtest_cache_directory(strategy_name, date_time_signature)
+    if is_cache_directory(directory):
+        load_cache_from_directory(system.cache, directory)
+    else:
+        ## saved before backtests were stored as directories
+        filename = get_backtest_pickle_filename(strategy_name, date_time_signature)
+        system.cache.unpickle(filename)
 
     return system
 
 
 def store_backtest_state(data, system, strategy_name="default_strategy"):
     """
-    Store a pickled backtest state and backtest config for a system
+    Store a backtest state and backtest config for a system
 
     :param data: data object, used to access the log
     :param system: a system object which has run
@@ -199,8 +212,8 @@ def store_backtest_state(data, system, strategy_name="default_strategy"):
 
     datetime_marker = create_datetime_marker_string()
 
-    pickle_filename = get_backtest_pickle_filename(strategy_name, datetime_marker)
-    pickle_state(data, system, pickle_filename)
+    cache_directory = get_backtest_cache_directory(strategy_name, datetime_marker)
+    save_state(data, system, cache_directory)
 
     config_save_filename = get_backtest_config_filename(strategy_name, datetime_marker)
     system.config.save(config_save_filename)
@@ -229,6 +242,26 @@ def get_list_of_pickle_files_for_strategy(strategy_name):
     return list_of_files
 
 
+def get_list_of_cache_directories_for_strategy(strategy_name):
+    full_directory = get_backtest_directory_for_strategy(strategy_name)
+    list_of_directories = [
+        directory_name
+        for directory_name in os.listdir(full_directory)
+        if directory_name.endswith(PICKLE_FILE_SUFFIX)
+        and is_cache_directory(os.path.join(full_directory, directory_name))
+    ]
+
+    return list_of_directories
+
+
+def get_backtest_cache_directory(strategy_name, datetime_marker):
+    # eg
+    # '/home/rob/data/backtests/medium_speed_TF_carry/20200616_122543_backtest'
+    prefix = get_backtest_filename_prefix(strategy_name, datetime_marker)
+
+    return prefix + PICKLE_FILE_SUFFIX
+
+
 def get_backtest_pickle_filename(strategy_name, datetime_marker):
     # eg
     # '/home/rob/data/backtests/medium_speed_TF_carry/20200616_122543_backtest.pck'
@@ -272,6 +305,18 @@ def get_directory_store_backtests():
     return store_directory
 
 
+def save_state(data, system, backtest_directory):
+    try:
+        save_cache_to_directory(system.cache, backtest_directory)
+        data.log.debug("Saved backtest state to %s" % backtest_directory)
+        return success
+    except Exception as e:
+        data.log.warning(
+            "Couldn't save backtest state to %s error %s" % (backtest_directory, e)
+        )
+        return failure
+
+
 def pickle_state(data, system, backtest_filename):
     try:
         system.cache.pickle(backtest_filename)
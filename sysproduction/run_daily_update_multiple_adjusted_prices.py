@@ -1,5 +1,6 @@
 from syscontrol.run_process import processToRun
 from sysproduction.update_multiple_adjusted_prices import updateMultipleAdjustedPrices
+from sysproduction.compact_parquet_data import compactParquetData
 
 from sysdata.data_blob import dataBlob
 
@@ -17,8 +18,13 @@ def get_list_of_timer_functions_for_price_update():
 
     multiple_update_object = updateMultipleAdjustedPrices(data_multiple)
 
+    ## after the day's price updates have appended their deltas
+    data_compact = dataBlob(log_name="Compact-Parquet-Data")
+    compact_object = compactParquetData(data_compact)
+
     list_of_timer_names_and_functions = [
         ("update_multiple_adjusted_prices", multiple_update_object),
+        ("compact_parquet_data", compact_object),
     ]
 
     return list_of_timer_names_and_functions
@@ -0,0 +1,105 @@
+"""
+Portfolio risk for every date at once
+
+calc_portfolio_risk_series builds a covariance matrix and works out sqrt(w'Σw) one date
+at a time, which is far too slow on a minute index. Here the covariance matrices for a
+chunk of dates are built as one (T, N, N) stack, from the standard deviations on each
+date and the most recent correlation estimate before it, and the risk for the whole
+chunk comes from a single einsum. Chunks keep the stack to a bounded size whatever the
+length of the index.
+
+Missing values are taken as nothing: a NaN weight as no position, a NaN standard
+deviation as no risk, and a NaN correlation as zero. Before the first correlation
+estimate the correlation matrix is the identity, as it is when there is no estimate in
+the date by date version.
+"""
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+from sysquant.estimators.correlations import CorrelationList
+from sysquant.estimators.stdev_estimator import seriesOfStdevEstimates
+from sysquant.optimisation.weights import seriesOfPortfolioWeights
+
+## size of each (T, N, N) covariance stack
+MAX_BYTES_IN_COVARIANCE_CHUNK = 64 * 1024 * 1024
+
+
+def calc_portfolio_risk_series_batched(
+    portfolio_weights: seriesOfPortfolioWeights,
+    list_of_correlations: CorrelationList,
+    pd_of_stdev: seriesOfStdevEstimates,
+    chunk_size: int = arg_not_supplied,
+) -> pd.Series:
+    instrument_list = list(portfolio_weights.columns)
+    common_index = portfolio_weights.index
+
+    weights = np.nan_to_num(portfolio_weights[instrument_list].values.astype(float))
+    stdev = np.nan_to_num(
+        pd_of_stdev[instrument_list].reindex(common_index).values.astype(float)
+    )
+    correlation_stack, correlation_idx = stack_of_correlations_for_index(
+        list_of_correlations,
+        instrument_list=instrument_list,
+        index=common_index,
+    )
+
+    if chunk_size is arg_not_supplied:
+        chunk_size = max(
+            1, MAX_BYTES_IN_COVARIANCE_CHUNK // (8 * max(len(instrument_list), 1) ** 2)
+        )
+
+    portfolio_variance = np.empty(len(common_index))
+    for chunk_start in range(0, len(common_index), chunk_size):
+        chunk = slice(chunk_start, chunk_start + chunk_size)
+        covariance = covariance_stack(
+            correlation_stack[correlation_idx[chunk]], stdev=stdev[chunk]
+        )
+        portfolio_variance[chunk] = np.einsum(
+            "ti,tij,tj->t", weights[chunk], covariance, weights[chunk]
+        )
+
+    risk_series = pd.Series(
+        np.sqrt(np.maximum(portfolio_variance, 0.0)), index=common_index
+    )
+
+    return risk_series
+
+
+def covariance_stack(correlations: np.ndarray, stdev: np.ndarray) -> np.ndarray:
+    """
+    (T, N, N) correlations and (T, N) standard deviations to (T, N, N) covariances
+
+    >>> correlations = np.array([[[1.0, 0.5], [0.5, 1.0]]])
+    >>> covariance_stack(correlations, np.array([[0.1, 0.2]])).round(4).tolist()
+    [[[0.01, 0.01], [0.01, 0.04]]]
+    """
+    return stdev[:, :, np.newaxis] * correlations * stdev[:, np.newaxis, :]
+
+
+def stack_of_correlations_for_index(
+    list_of_correlations: CorrelationList,
+    instrument_list: list,
+    index: pd.DatetimeIndex,
+) -> tuple:
+    """
+    Returns a (K+1, N, N) array of correlation matrices, the first being the identity,
+    and for each date in index the position in the array of the estimate to use
+    """
+    size_of_matrix = len(instrument_list)
+    correlation_stack = [np.identity(size_of_matrix)]
+    for correlation in list_of_correlations.corr_list:
+        aligned_correlation = (
+            correlation.as_pd().reindex(index=instrument_list, columns=instrument_list)
+        ).values.astype(float)
+        aligned_correlation = np.nan_to_num(aligned_correlation)
+        np.fill_diagonal(aligned_correlation, 1.0)
+        correlation_stack.append(aligned_correlation)
+
+    period_starts = pd.DatetimeIndex(
+        [fit_period.period_start for fit_period in list_of_correlations.fit_dates]
+    )
+    # an estimate is used from the start of its period, until the next one starts
+    correlation_idx = period_starts.searchsorted(index, side="right")
+
+    return np.array(correlation_stack), correlation_idx
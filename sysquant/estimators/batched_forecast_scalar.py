@@ -0,0 +1,153 @@
+"""
+Forecast scalars for many rule variations at once
+
+Gives the same as sysquant.estimators.forecast_scalar.forecast_scalar, called once for
+each rule variation: zeros are taken as missing, the cross sectional median of the
+absolute (forward filled) forecasts is taken across instruments, then its rolling mean,
+and the scalar is the target over that.
+
+Rule variations with the same instruments and the same index are stacked into one
+(T, instruments, rules) array, and the median, rolling mean and backfill are done once
+for all of them. Stacks are built for chunks of rules, so they stay a bounded size.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+## size of each (T, instruments, rules) stack
+MAX_BYTES_IN_FORECAST_CHUNK = 256 * 1024 * 1024
+
+
+def batched_forecast_scalars(
+    dict_of_cs_forecasts: dict,
+    target_abs_forecast: float = 10.0,
+    window: int = 250000,  ## JUST A VERY LARGE NUMBER TO USE ALL DATA
+    min_periods=500,  # MINIMUM PERIODS BEFORE WE ESTIMATE A SCALAR,
+    backfill=True,  ## BACKFILL OUR FIRST ESTIMATE, SLIGHTLY CHEATING, BUT...
+) -> dict:
+    """
+    dict_of_cs_forecasts: rule variation name -> DataFrame of forecasts, one column
+    for each instrument. Returns rule variation name -> Series of scalars
+
+    >>> index = pd.date_range("2024-01-01", periods=4, freq="min")
+    >>> cs_forecasts = pd.DataFrame(dict(BTC=[1.0, 2.0, 0.0, 4.0]), index=index)
+    >>> scalars = batched_forecast_scalars(
+    ...     dict(fast=cs_forecasts, slow=cs_forecasts * 2.0), min_periods=2
+    ... )
+    >>> scalars["fast"].round(3).tolist()
+    [6.667, 6.667, 6.667, 4.286]
+    >>> scalars["slow"].round(3).tolist()
+    [3.333, 3.333, 3.333, 2.143]
+    """
+    scalars = {}
+    for list_of_rules in _groups_of_rules_with_same_shape(dict_of_cs_forecasts):
+        first_cs_forecasts = dict_of_cs_forecasts[list_of_rules[0]]
+        number_of_rows, number_of_instruments = first_cs_forecasts.shape
+        rules_per_chunk = max(
+            1,
+            MAX_BYTES_IN_FORECAST_CHUNK
+            // (8 * max(number_of_rows * number_of_instruments, 1)),
+        )
+
+        for chunk_start in range(0, len(list_of_rules), rules_per_chunk):
+            chunk_of_rules = list_of_rules[chunk_start : chunk_start + rules_per_chunk]
+            stacked_forecasts = np.stack(
+                [
+                    dict_of_cs_forecasts[rule_variation_name].values.astype(np.float64)
+                    for rule_variation_name in chunk_of_rules
+                ],
+                axis=2,
+            )
+            scaling_factors = _scaling_factors_for_stack(
+                stacked_forecasts,
+                target_abs_forecast=target_abs_forecast,
+                window=window,
+                min_periods=min_periods,
+                backfill=backfill,
+            )
+            for rule_number, rule_variation_name in enumerate(chunk_of_rules):
+                scalars[rule_variation_name] = pd.Series(
+                    scaling_factors[:, rule_number], index=first_cs_forecasts.index
+                )
+
+    return scalars
+
+
+def _groups_of_rules_with_same_shape(dict_of_cs_forecasts: dict) -> list:
+    groups = []
+    for rule_variation_name, cs_forecasts in dict_of_cs_forecasts.items():
+        for list_of_rules in groups:
+            group_cs_forecasts = dict_of_cs_forecasts[list_of_rules[0]]
+            if list(group_cs_forecasts.columns) == list(
+                cs_forecasts.columns
+            ) and group_cs_forecasts.index.equals(cs_forecasts.index):
+                list_of_rules.append(rule_variation_name)
+                break
+        else:
+            groups.append([rule_variation_name])
+
+    return groups
+
+
+def _scaling_factors_for_stack(
+    stacked_forecasts: np.ndarray,
+    target_abs_forecast: float,
+    window: int,
+    min_periods: int,
+    backfill: bool,
+) -> np.ndarray:
+    ## (T, instruments, rules) forecasts to (T, rules) scaling factors
+    stacked_forecasts[stacked_forecasts == 0.0] = np.nan
+
+    # Take CS average first, as forecast_scalar does, so the scalar doesn't jump
+    # when new markets are introduced
+    if stacked_forecasts.shape[1] == 1:
+        cs_average = np.abs(stacked_forecasts[:, 0, :])
+    else:
+        with warnings.catch_warnings():
+            # all NaN rows give NaN, which is what we want
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            cs_average = np.nanmedian(np.abs(_ffill(stacked_forecasts)), axis=1)
+
+    # now the TS
+    avg_abs_value = _rolling_nanmean(cs_average, window=window, min_periods=min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaling_factor = target_abs_forecast / avg_abs_value
+
+    if backfill:
+        scaling_factor = _ffill(scaling_factor[::-1])[::-1]
+
+    return scaling_factor
+
+
+def _ffill(values: np.ndarray) -> np.ndarray:
+    ## forward fill along the first axis
+    row_numbers = np.arange(values.shape[0]).reshape((-1,) + (1,) * (values.ndim - 1))
+    last_valid_row = np.where(np.isnan(values), 0, row_numbers)
+    np.maximum.accumulate(last_valid_row, axis=0, out=last_valid_row)
+
+    return np.take_along_axis(values, last_valid_row, axis=0)
+
+
+def _rolling_nanmean(values: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    ## as pd.DataFrame.rolling(window, min_periods).mean() along the first axis
+    is_valid = ~np.isnan(values)
+    cumulative_sum = _cumsum_from_zero(np.where(is_valid, values, 0.0))
+    cumulative_count = _cumsum_from_zero(is_valid.astype(np.int64))
+
+    window_start = np.maximum(np.arange(1, values.shape[0] + 1) - window, 0)
+    window_sum = cumulative_sum[1:] - cumulative_sum[window_start]
+    window_count = cumulative_count[1:] - cumulative_count[window_start]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rolling_mean = window_sum / window_count
+
+    return np.where(window_count >= max(min_periods, 1), rolling_mean, np.nan)
+
+
+def _cumsum_from_zero(values: np.ndarray) -> np.ndarray:
+    cumulative = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=values.dtype)
+    np.cumsum(values, axis=0, out=cumulative[1:])
+
+    return cumulative
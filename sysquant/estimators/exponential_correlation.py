@@ -1,4 +1,7 @@
 import datetime
+from bisect import bisect_right
+
+import numpy as np
 import pandas as pd
 from syscore.genutils import str2Bool
 from syscore.constants import arg_not_supplied
@@ -10,6 +13,8 @@ from sysquant.estimators.correlations import (
 )
 from sysquant.estimators.generic_estimator import exponentialEstimator
 
+MAX_ELEMENTS_IN_GAPPY_BLOCK = 2**20
+
 
 class exponentialCorrelation(exponentialEstimator):
     def __init__(
@@ -43,7 +48,7 @@ class exponentialCorrelation(exponentialEstimator):
         adjusted_min_periods=20,
         **other_kwargs,
     ):
-        correlation_calculations = exponentialCorrelationResults(
+        correlation_calculations = incrementalExponentialCorrelationResults(
             data_for_correlation,
             ew_lookback=adjusted_lookback,
             min_periods=adjusted_min_periods,
@@ -188,3 +193,193 @@ def last_valid_cor_matrix_for_date(
     )
 
     return correlationEstimate(values=corr_matrix_values, columns=columns)
+
+
+class incrementalExponentialCorrelationResults(object):
+    """
+    Same answers as exponentialCorrelationResults, without ever holding a correlation
+    matrix for every row of data (except before the first row, where this gives a
+    matrix of NaN rather than an empty one)
+
+    Running exponentially weighted sums of x, x^2 and xy are kept for every pair of
+    assets, over the rows where both have data (as pandas does with ignore_na=True).
+    A correlation matrix is only worked out for the dates asked for; each is stored,
+    with the sums at that point, so later dates carry on from the nearest earlier one.
+
+    Works with sums rather than the pandas recursion, so matches it to float precision
+    for returns, but would lose precision for series with a mean much larger than their
+    standard deviation.
+    """
+
+    def __init__(
+        self,
+        data_for_correlation: pd.DataFrame,
+        ew_lookback: int = 250,
+        min_periods: int = 20,
+        block_size: int = 1024,
+        **_ignored_kwargs,
+    ):
+        self._columns = data_for_correlation.columns
+        self._index = data_for_correlation.index
+        self._values = data_for_correlation.values.astype(np.float64)
+        self._decay = 1.0 - 2.0 / (ew_lookback + 1.0)
+        self._min_periods = max(int(min_periods), 1)
+        self._block_size = block_size
+
+        # row positions with a stored correlation matrix and sums, sorted
+        self._snapshot_positions = [0]
+        self._snapshot_sums = [exponentialCrossMoments(len(self._columns))]
+        self._snapshot_correlations = [
+            np.full((len(self._columns), len(self._columns)), np.nan)
+        ]
+
+    def last_valid_cor_matrix_for_date(
+        self, date_point: datetime.datetime
+    ) -> correlationEstimate:
+        ## as the pandas version, the correlation using rows before date_point
+        position = self._index.searchsorted(date_point, side="left")
+        corr_matrix_values = self._correlation_at_position(position)
+
+        return correlationEstimate(values=corr_matrix_values, columns=self.columns)
+
+    @property
+    def size_of_matrix(self) -> int:
+        return len(self.columns)
+
+    @property
+    def columns(self) -> list:
+        return self._columns
+
+    def _correlation_at_position(self, position: int) -> np.ndarray:
+        snapshot_idx = bisect_right(self._snapshot_positions, position) - 1
+        snapshot_position = self._snapshot_positions[snapshot_idx]
+        if snapshot_position == position:
+            return self._snapshot_correlations[snapshot_idx]
+
+        sums = self._snapshot_sums[snapshot_idx].copy()
+        sums.update_with_values(
+            self._values[snapshot_position:position],
+            decay=self._decay,
+            block_size=self._block_size,
+        )
+        correlation = sums.correlation(min_periods=self._min_periods)
+
+        insert_idx = snapshot_idx + 1
+        self._snapshot_positions.insert(insert_idx, position)
+        self._snapshot_sums.insert(insert_idx, sums)
+        self._snapshot_correlations.insert(insert_idx, correlation)
+
+        return correlation
+
+
+class exponentialCrossMoments(object):
+    ## exponentially weighted sums for every pair (i, j), over rows where both have data
+    def __init__(self, size_of_matrix: int):
+        shape = (size_of_matrix, size_of_matrix)
+        self.sum_of_weights = np.zeros(shape)
+        self.sum_x = np.zeros(shape)  ## [i, j] is the sum of x_i
+        self.sum_x_squared = np.zeros(shape)
+        self.sum_xy = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)
+
+    def copy(self):
+        new_moments = exponentialCrossMoments(0)
+        for name, value in self.__dict__.items():
+            setattr(new_moments, name, value.copy())
+
+        return new_moments
+
+    def update_with_values(self, values: np.ndarray, decay: float, block_size: int):
+        has_data = ~np.isnan(values)
+        ## rows in the gappy path use memory of size_of_matrix^2 each
+        size_of_matrix = values.shape[1]
+        gappy_block_size = max(
+            1, min(block_size, MAX_ELEMENTS_IN_GAPPY_BLOCK // size_of_matrix**2)
+        )
+
+        block_start = 0
+        while block_start < len(values):
+            block_end = min(block_start + block_size, len(values))
+            block_has_data = has_data[block_start:block_end]
+            if (block_has_data == block_has_data[0]).all():
+                self._update_with_complete_block(
+                    values[block_start:block_end],
+                    has_data=block_has_data[0],
+                    decay=decay,
+                )
+            else:
+                block_end = min(block_start + gappy_block_size, len(values))
+                self._update_with_gappy_block(
+                    values[block_start:block_end],
+                    has_data=has_data[block_start:block_end],
+                    decay=decay,
+                )
+            block_start = block_end
+
+    def _update_with_complete_block(
+        self, block: np.ndarray, has_data: np.ndarray, decay: float
+    ):
+        ## assets in has_data have data on every row, the others on none
+        assets = np.flatnonzero(has_data)
+        if len(assets) == 0:
+            return
+
+        block_length = len(block)
+        values = block[:, assets]
+        row_weights = decay ** np.arange(block_length - 1, -1, -1)
+        block_decay = decay**block_length
+        pairs = np.ix_(assets, assets)
+
+        weighted_values = row_weights[:, np.newaxis] * values
+        self._decay_and_add(
+            pairs,
+            decay=block_decay,
+            weight=row_weights.sum(),
+            x=weighted_values.sum(axis=0)[:, np.newaxis],
+            x_squared=(weighted_values * values).sum(axis=0)[:, np.newaxis],
+            xy=values.T @ weighted_values,
+            count=block_length,
+        )
+
+    def _update_with_gappy_block(
+        self, block: np.ndarray, has_data: np.ndarray, decay: float
+    ):
+        ## each pair only decays on the rows where both assets have data, so the
+        ## weights are worked out for every pair: [row, i, j]
+        both_have_data = has_data[:, :, np.newaxis] & has_data[:, np.newaxis, :]
+        pair_count = both_have_data.sum(axis=0)
+        rows_after = pair_count - np.cumsum(both_have_data, axis=0)
+        pair_weights = np.where(both_have_data, decay**rows_after, 0.0)
+
+        values = np.where(has_data, block, 0.0)
+        weighted_x = pair_weights * values[:, :, np.newaxis]
+        all_pairs = (slice(None), slice(None))
+        self._decay_and_add(
+            all_pairs,
+            decay=decay**pair_count,
+            weight=pair_weights.sum(axis=0),
+            x=weighted_x.sum(axis=0),
+            x_squared=(weighted_x * values[:, :, np.newaxis]).sum(axis=0),
+            xy=(weighted_x * values[:, np.newaxis, :]).sum(axis=0),
+            count=pair_count,
+        )
+
+    def _decay_and_add(self, pairs, decay, weight, x, x_squared, xy, count):
+        self.sum_of_weights[pairs] = decay * self.sum_of_weights[pairs] + weight
+        self.sum_x[pairs] = decay * self.sum_x[pairs] + x
+        self.sum_x_squared[pairs] = decay * self.sum_x_squared[pairs] + x_squared
+        self.sum_xy[pairs] = decay * self.sum_xy[pairs] + xy
+        self.count[pairs] += count
+
+    def correlation(self, min_periods: int) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sum_x / self.sum_of_weights
+            variance = self.sum_x_squared / self.sum_of_weights - mean * mean
+            covariance = self.sum_xy / self.sum_of_weights - mean * mean.T
+            correlation = covariance / np.sqrt(variance * variance.T)
+
+        correlation[self.count < min_periods] = np.nan
+        diagonal = np.diag_indices_from(correlation)
+        correlation[diagonal] = np.where(np.isnan(correlation[diagonal]), np.nan, 1.0)
+
+        return correlation
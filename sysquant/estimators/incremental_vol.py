@@ -0,0 +1,301 @@
+"""
+Volatility estimates that can be updated one bar at a time
+
+The batch functions in sysquant.estimators.vol recalculate over the whole history, which
+is fine for backtests but wasteful when a live system gets one new minute bar at a time.
+The objects here hold the state of the same exponentially weighted calculations, so an
+update is O(1), and the state can be saved and loaded between runs.
+
+They follow the pandas ewm recursions (adjust=True, ignore_na=False) step by step, so
+they match the batch functions to float precision; the batch functions remain the
+reference.
+"""
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+
+from syscore.constants import arg_not_supplied
+
+
+class ewmMeanState(object):
+    """
+    Same as series.ewm(span=span, min_periods=min_periods).mean()
+
+    >>> state = ewmMeanState(span=3)
+    >>> [round(state.update(x), 6) for x in [1.0, 2.0, 3.0]]
+    [1.0, 1.666667, 2.428571]
+    """
+
+    def __init__(self, span: float, min_periods: int = 0):
+        self.alpha = 2.0 / (span + 1.0)
+        self.min_periods = max(min_periods, 1)
+        self.mean = np.nan
+        self.old_weight = 1.0
+        self.observations = 0
+
+    def update(self, value: float) -> float:
+        is_observation = not np.isnan(value)
+        self.observations += int(is_observation)
+
+        if not np.isnan(self.mean):
+            self.old_weight *= 1.0 - self.alpha
+            if is_observation:
+                # avoid numerical errors on constant series
+                if self.mean != value:
+                    self.mean = (self.old_weight * self.mean + value) / (
+                        self.old_weight + 1.0
+                    )
+                self.old_weight += 1.0
+        elif is_observation:
+            self.mean = value
+
+        return self.current_value()
+
+    def current_value(self) -> float:
+        if self.observations < self.min_periods:
+            return np.nan
+
+        return self.mean
+
+    def as_dict(self) -> dict:
+        return dict(
+            alpha=self.alpha,
+            min_periods=self.min_periods,
+            mean=self.mean,
+            old_weight=self.old_weight,
+            observations=self.observations,
+        )
+
+    @classmethod
+    def from_dict(cls, state_dict: dict):
+        state = cls(span=1.0)
+        state.__dict__.update(state_dict)
+
+        return state
+
+
+class ewmStdevState(object):
+    """
+    Same as series.ewm(span=span, min_periods=min_periods).std()
+
+    >>> state = ewmStdevState(span=3, min_periods=2)
+    >>> [round(state.update(x), 6) for x in [1.0, 2.0, 4.0]]
+    [nan, 0.707107, 1.581139]
+    """
+
+    def __init__(self, span: float, min_periods: int = 0):
+        self.alpha = 2.0 / (span + 1.0)
+        self.min_periods = max(min_periods, 1)
+        self.mean = np.nan
+        self.variance = 0.0
+        self.sum_weights = 1.0
+        self.sum_weights_squared = 1.0
+        self.old_weight = 1.0
+        self.observations = 0
+
+    def update(self, value: float) -> float:
+        is_observation = not np.isnan(value)
+        self.observations += int(is_observation)
+        decay = 1.0 - self.alpha
+
+        if not np.isnan(self.mean):
+            self.sum_weights *= decay
+            self.sum_weights_squared *= decay * decay
+            self.old_weight *= decay
+            if is_observation:
+                old_mean = self.mean
+                # avoid numerical errors on constant series
+                if self.mean != value:
+                    self.mean = (self.old_weight * old_mean + value) / (
+                        self.old_weight + 1.0
+                    )
+                self.variance = (
+                    self.old_weight
+                    * (self.variance + (old_mean - self.mean) * (old_mean - self.mean))
+                    + (value - self.mean) * (value - self.mean)
+                ) / (self.old_weight + 1.0)
+                self.sum_weights += 1.0
+                self.sum_weights_squared += 1.0
+                self.old_weight += 1.0
+        elif is_observation:
+            self.mean = value
+
+        return self.current_value()
+
+    def current_value(self) -> float:
+        if self.observations < self.min_periods:
+            return np.nan
+
+        # bias correction for weighted variance
+        numerator = self.sum_weights * self.sum_weights
+        denominator = numerator - self.sum_weights_squared
+        if denominator <= 0:
+            return np.nan
+
+        variance = (numerator / denominator) * self.variance
+
+        return np.sqrt(max(variance, 0.0))
+
+    def as_dict(self) -> dict:
+        return dict(
+            alpha=self.alpha,
+            min_periods=self.min_periods,
+            mean=self.mean,
+            variance=self.variance,
+            sum_weights=self.sum_weights,
+            sum_weights_squared=self.sum_weights_squared,
+            old_weight=self.old_weight,
+            observations=self.observations,
+        )
+
+    @classmethod
+    def from_dict(cls, state_dict: dict):
+        state = cls(span=1.0)
+        state.__dict__.update(state_dict)
+
+        return state
+
+
+class incrementalVol(object):
+    """
+    Incremental version of mixed_minute_vol_calc (and simple_ewvol_calc, if
+    proportion_of_slow_vol is zero)
+
+    Backfilling needs future values so can't be done incrementally; the first few
+    values will be NaN as they would without backfill.
+    """
+
+    def __init__(
+        self,
+        minutes: int = 35,
+        min_periods: int = 10,
+        slow_vol_weeks: int = 20,
+        proportion_of_slow_vol: float = 0.3,
+        vol_abs_min: float = 0.0000000001,
+        **ignored_kwargs,
+    ):
+        self.proportion_of_slow_vol = proportion_of_slow_vol
+        self.vol_abs_min = vol_abs_min
+        self.last_datetime = None
+
+        self._fast_vol = ewmStdevState(span=minutes, min_periods=min_periods)
+        # same span as mixed_minute_vol_calc
+        self._slow_vol = ewmMeanState(span=slow_vol_weeks * 200)
+
+    @classmethod
+    def from_returns(cls, minute_returns: pd.Series, **vol_kwargs):
+        vol_state = cls(**vol_kwargs)
+        vol_state.update_with_series(minute_returns)
+
+        return vol_state
+
+    def update(
+        self,
+        minute_return: float,
+        return_datetime: datetime.datetime = arg_not_supplied,
+    ) -> float:
+        if return_datetime is not arg_not_supplied:
+            self._check_datetime_in_order(return_datetime)
+            self.last_datetime = return_datetime
+
+        fast_vol = self._fast_vol.update(minute_return)
+        if self.proportion_of_slow_vol == 0:
+            vol = fast_vol
+        else:
+            slow_vol = self._slow_vol.update(fast_vol)
+            vol = slow_vol * self.proportion_of_slow_vol + fast_vol * (
+                1 - self.proportion_of_slow_vol
+            )
+
+        if vol < self.vol_abs_min:
+            vol = self.vol_abs_min
+
+        self._current_vol = vol
+
+        return vol
+
+    def update_with_series(self, minute_returns: pd.Series) -> pd.Series:
+        vol_list = [self.update(value) for value in minute_returns.values]
+        if len(minute_returns) > 0:
+            self.last_datetime = minute_returns.index[-1]
+
+        return pd.Series(vol_list, index=minute_returns.index)
+
+    def update_with_new_returns_only(self, minute_returns: pd.Series) -> pd.Series:
+        ## Pass the full returns series, only those after the last update are used
+        if self.last_datetime is not None:
+            minute_returns = minute_returns[minute_returns.index > self.last_datetime]
+
+        return self.update_with_series(minute_returns)
+
+    @property
+    def current_vol(self) -> float:
+        return getattr(self, "_current_vol", np.nan)
+
+    def _check_datetime_in_order(self, return_datetime: datetime.datetime):
+        if self.last_datetime is None:
+            return
+        if return_datetime <= self.last_datetime:
+            raise Exception(
+                "Vol update at %s is not after last update at %s"
+                % (str(return_datetime), str(self.last_datetime))
+            )
+
+    def as_dict(self) -> dict:
+        last_datetime = self.last_datetime
+        if last_datetime is not None:
+            last_datetime = pd.Timestamp(last_datetime).isoformat()
+
+        return dict(
+            proportion_of_slow_vol=self.proportion_of_slow_vol,
+            vol_abs_min=self.vol_abs_min,
+            last_datetime=last_datetime,
+            current_vol=self.current_vol,
+            fast_vol=self._fast_vol.as_dict(),
+            slow_vol=self._slow_vol.as_dict(),
+        )
+
+    @classmethod
+    def from_dict(cls, state_dict: dict):
+        state_dict = dict(state_dict)
+        vol_state = cls(
+            proportion_of_slow_vol=state_dict.pop("proportion_of_slow_vol"),
+            vol_abs_min=state_dict.pop("vol_abs_min"),
+        )
+        last_datetime = state_dict.pop("last_datetime")
+        if last_datetime is not None:
+            last_datetime = pd.Timestamp(last_datetime)
+        vol_state.last_datetime = last_datetime
+        vol_state._current_vol = state_dict.pop("current_vol")
+        vol_state._fast_vol = ewmStdevState.from_dict(state_dict.pop("fast_vol"))
+        vol_state._slow_vol = ewmMeanState.from_dict(state_dict.pop("slow_vol"))
+
+        return vol_state
+
+    def save(self, filename: str):
+        with open(filename, "w") as state_file:
+            json.dump(self.as_dict(), state_file)
+
+    @classmethod
+    def load(cls, filename: str):
+        with open(filename, "r") as state_file:
+            state_dict = json.load(state_file)
+
+        return cls.from_dict(state_dict)
+
+
+def incremental_vol_for_vol_function(vol_function_name: str, **vol_kwargs):
+    ## returns an empty incremental estimator equivalent to a batch vol function
+    if vol_function_name.endswith("mixed_minute_vol_calc"):
+        return incrementalVol(**vol_kwargs)
+    elif vol_function_name.endswith("simple_ewvol_calc"):
+        return incrementalVol(
+            minutes=vol_kwargs.get("days", 35),
+            min_periods=vol_kwargs.get("min_periods", 10),
+            proportion_of_slow_vol=0.0,
+            vol_abs_min=0.0,
+        )
+    else:
+        raise Exception("No incremental version of vol function %s" % vol_function_name)
@@ -0,0 +1,202 @@
+"""
+Rolling quantiles for long, high frequency series
+
+The vol floor takes a low quantile of vol over a very long window; on minute data that
+window is tens of thousands of points and the rolling quantile is the slowest part of
+the vol calculation.
+
+rollingQuantile is an exact order statistic that can be updated one point at a time,
+for streaming use. approximate_rolling_quantile trades a bounded error for speed when
+calculating over a whole series.
+"""
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+EXACT = "exact"
+APPROXIMATE = "approximate"
+
+
+class rollingQuantile(object):
+    """
+    Exact rolling quantile, updated one value at a time
+
+    Keeps the values in the window in an indexable sorted list, so each update is a
+    binary search plus an insert and a delete. Uses linear interpolation and ignores
+    NaN, like pd.Series.rolling(window, min_periods).quantile(quantile)
+
+    >>> rolling = rollingQuantile(window=3, quantile=0.5, min_periods=2)
+    >>> [rolling.update(x) for x in [3.0, 1.0, np.nan, 2.0, 5.0]]
+    [nan, 2.0, 2.0, 1.5, 3.5]
+    """
+
+    def __init__(self, window: int, quantile: float, min_periods: int = 1):
+        self._window = window
+        self._quantile = quantile
+        self._min_periods = max(min_periods, 1)
+        self._values_in_window = deque()
+        self._sorted_values = []
+
+    def update(self, value: float) -> float:
+        self._values_in_window.append(value)
+        if not np.isnan(value):
+            insort(self._sorted_values, value)
+
+        if len(self._values_in_window) > self._window:
+            expired_value = self._values_in_window.popleft()
+            if not np.isnan(expired_value):
+                del self._sorted_values[bisect_left(self._sorted_values, expired_value)]
+
+        return self.current_quantile()
+
+    def update_with_series(self, series: pd.Series) -> pd.Series:
+        quantiles = [self.update(value) for value in series.values]
+
+        return pd.Series(quantiles, index=series.index)
+
+    def current_quantile(self) -> float:
+        sorted_values = self._sorted_values
+        count = len(sorted_values)
+        if count < self._min_periods:
+            return np.nan
+
+        position = self._quantile * (count - 1)
+        lower_idx = int(np.floor(position))
+        upper_idx = min(lower_idx + 1, count - 1)
+        fraction = position - lower_idx
+
+        lower_value = sorted_values[lower_idx]
+        upper_value = sorted_values[upper_idx]
+
+        return lower_value + (upper_value - lower_value) * fraction
+
+    @property
+    def count(self) -> int:
+        return len(self._sorted_values)
+
+
+def rolling_quantile(
+    series: pd.Series,
+    window: int,
+    quantile: float,
+    min_periods: int = 1,
+    method: str = EXACT,
+    relative_error: float = 0.01,
+    rank_error: float = 0.001,
+) -> pd.Series:
+    if method == EXACT:
+        # pandas' own rolling quantile is a compiled skiplist, so there is nothing
+        # to gain from reimplementing it for a whole series
+        return series.rolling(window=window, min_periods=min_periods).quantile(quantile)
+    elif method == APPROXIMATE:
+        return approximate_rolling_quantile(
+            series,
+            window=window,
+            quantile=quantile,
+            min_periods=min_periods,
+            relative_error=relative_error,
+            rank_error=rank_error,
+        )
+    else:
+        raise Exception(
+            "Rolling quantile method %s not recognised, use %s or %s"
+            % (method, EXACT, APPROXIMATE)
+        )
+
+
+def approximate_rolling_quantile(
+    series: pd.Series,
+    window: int,
+    quantile: float,
+    min_periods: int = 1,
+    relative_error: float = 0.01,
+    rank_error: float = 0.001,
+) -> pd.Series:
+    """
+    Rolling quantile from a histogram of log spaced buckets, in the spirit of a
+    t-digest but with fixed buckets so that windows can be slid by adding and
+    subtracting counts.
+
+    Values are put in buckets that are (1+relative_error) wide, and the window is moved
+    in steps of stride = window * rank_error points. The value at each point is then:
+
+    - within relative_error of the true quantile of its window, where the quantile is
+      within rank_error of the one asked for
+    - taken from a window that ends up to stride points earlier (never later) and whose
+      length is within stride of window
+
+    Values must be positive, as vols are; anything else is reported as zero. If the
+    window is too short for stride to be more than one we fall back to the exact
+    calculation.
+    """
+    stride = int(window * rank_error)
+    if stride <= 1:
+        return rolling_quantile(
+            series, window=window, quantile=quantile, min_periods=min_periods
+        )
+
+    values = series.values.astype(np.float64)
+    buckets, bucket_values = _log_buckets(values, relative_error=relative_error)
+    number_of_buckets = len(bucket_values)
+
+    length = len(values)
+    blocks_in_window = max(int(round(window / stride)), 1)
+    number_of_blocks = int(np.ceil(length / stride))
+
+    def _counts_for_block(block_number: int) -> np.ndarray:
+        block_buckets = buckets[block_number * stride : (block_number + 1) * stride]
+        block_buckets = block_buckets[block_buckets >= 0]
+        return np.bincount(block_buckets, minlength=number_of_buckets)
+
+    quantile_at_block_end = np.full(number_of_blocks, np.nan)
+    window_counts = np.zeros(number_of_buckets, dtype=np.int64)
+    for block_number in range(number_of_blocks):
+        window_counts += _counts_for_block(block_number)
+        if block_number >= blocks_in_window:
+            window_counts -= _counts_for_block(block_number - blocks_in_window)
+
+        cumulative_counts = np.cumsum(window_counts)
+        total_count = cumulative_counts[-1]
+        if total_count < min_periods or total_count == 0:
+            continue
+
+        rank = int(quantile * (total_count - 1))
+        bucket = np.searchsorted(cumulative_counts, rank, side="right")
+        quantile_at_block_end[block_number] = bucket_values[bucket]
+
+    # each value is only known at the end of its block
+    result = np.full(length, np.nan)
+    block_ends = np.minimum(np.arange(1, number_of_blocks + 1) * stride, length) - 1
+    result[block_ends] = quantile_at_block_end
+    result = pd.Series(result, index=series.index).ffill()
+
+    return result
+
+
+def _log_buckets(values: np.ndarray, relative_error: float = 0.01) -> tuple:
+    ## Returns bucket number for each value (-1 for NaN, 0 for non positive) and the
+    ## value we report for each bucket
+    is_nan = np.isnan(values)
+    is_positive = values > 0
+    buckets = np.where(is_nan, -1, 0)
+
+    if not is_positive.any():
+        return buckets, np.zeros(1)
+
+    positive_values = values[is_positive]
+    smallest_value = positive_values.min()
+    log_growth = np.log1p(relative_error)
+
+    positive_buckets = 1 + np.floor(
+        np.log(positive_values / smallest_value) / log_growth
+    ).astype(np.int64)
+    buckets[is_positive] = positive_buckets
+
+    # report the geometric middle of each bucket, so the error is at most half a bucket
+    bucket_number = np.arange(1, positive_buckets.max() + 1)
+    bucket_values = smallest_value * np.exp((bucket_number - 0.5) * log_growth)
+    bucket_values = np.concatenate([np.zeros(1), bucket_values])
+
+    return buckets, bucket_values
@@ -3,6 +3,7 @@ import pandas as pd
 
 from syscore.dateutils import BUSINESS_DAYS_IN_YEAR, MINUTES_IN_A_WEEK
 from syscore.pandas.frequency import resample_prices_to_business_day_index, resample_prices_to_minute_index
+from sysquant.estimators.rolling_quantile import rolling_quantile, EXACT
 
 
 def robust_daily_vol_given_price(price: pd.Series, **kwargs):
@@ -32,6 +33,9 @@ def robust_vol_calc(
     floor_min_quant: float = 0.05,
     floor_min_periods: int = 100,
     floor_days: int = 500,
+    floor_method: str = EXACT,
+    floor_relative_error: float = 0.01,
+    floor_rank_error: float = 0.001,
     backfill: bool = False,
     **ignored_kwargs,
 ) -> pd.Series:
@@ -68,6 +72,18 @@ def robust_vol_calc(
       floor is zero (*default* 100)
     :type floor_min_periods: int
 
+    :param floor_method: 'exact' or 'approximate' rolling quantile for the floor.
+      Approximate is much quicker for long minute windows (*default* 'exact')
+    :type floor_method: str
+
+    :param floor_relative_error: For approximate floor, error in the floor level
+      (*default* 0.01)
+    :type floor_relative_error: float
+
+    :param floor_rank_error: For approximate floor, error in the quantile used
+      (*default* 0.001)
+    :type floor_rank_error: float
+
     :returns: pd.DataFrame -- volatility measure
     """
 
@@ -81,6 +97,9 @@ def robust_vol_calc(
             floor_min_quant=floor_min_quant,
             floor_min_periods=floor_min_periods,
             floor_days=floor_days,
+            floor_method=floor_method,
+            floor_relative_error=floor_relative_error,
+            floor_rank_error=floor_rank_error,
         )
 
     if backfill:
@@ -101,10 +120,19 @@ def apply_vol_floor(
     floor_min_quant: float = 0.05,
     floor_min_periods: int = 100,
     floor_days: int = 500,
+    floor_method: str = EXACT,
+    floor_relative_error: float = 0.01,
+    floor_rank_error: float = 0.001,
 ) -> pd.Series:
     # Find the rolling 5% quantile point to set as a minimum
-    vol_min = vol.rolling(min_periods=floor_min_periods, window=floor_days).quantile(
-        q=floor_min_quant
+    vol_min = rolling_quantile(
+        vol,
+        window=floor_days,
+        quantile=floor_min_quant,
+        min_periods=floor_min_periods,
+        method=floor_method,
+        relative_error=floor_relative_error,
+        rank_error=floor_rank_error,
     )
 
     # set this to zero for the first value then propagate forward, ensures
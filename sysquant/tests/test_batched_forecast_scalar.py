@@ -0,0 +1,69 @@
+from copy import copy
+
+import numpy as np
+import pandas as pd
+
+from sysquant.estimators.batched_forecast_scalar import batched_forecast_scalars
+
+
+def _forecast_scalar_one_rule(
+    cs_forecasts: pd.DataFrame,
+    target_abs_forecast: float = 10.0,
+    window: int = 250000,
+    min_periods=500,
+    backfill=True,
+) -> pd.Series:
+    ## as sysquant.estimators.forecast_scalar.forecast_scalar
+    copy_cs_forecasts = copy(cs_forecasts)
+    copy_cs_forecasts[copy_cs_forecasts == 0.0] = np.nan
+    if copy_cs_forecasts.shape[1] == 1:
+        x = copy_cs_forecasts.abs().iloc[:, 0]
+    else:
+        x = copy_cs_forecasts.ffill().abs().median(axis=1)
+
+    avg_abs_value = x.rolling(window=window, min_periods=min_periods).mean()
+    scaling_factor = target_abs_forecast / avg_abs_value
+    if backfill:
+        scaling_factor = scaling_factor.bfill()
+
+    return scaling_factor
+
+
+def _example_cs_forecasts(instrument_list: list, scale: float, seed: int):
+    index = pd.date_range("2024-01-01", periods=3000, freq="min")
+    rng = np.random.default_rng(seed)
+    cs_forecasts = pd.DataFrame(
+        rng.standard_normal((len(index), len(instrument_list))) * scale,
+        index=index,
+        columns=instrument_list,
+    )
+    # instruments which start later, gaps and flat forecasts
+    cs_forecasts.iloc[:700, -1] = np.nan
+    cs_forecasts.iloc[1000:1100, 0] = np.nan
+    cs_forecasts.iloc[2000:2050, 0] = 0.0
+
+    return cs_forecasts
+
+
+def test_batched_scalars_match_one_rule_at_a_time():
+    dict_of_cs_forecasts = dict(
+        fast=_example_cs_forecasts(["BTC", "ETH", "SOL"], scale=3.0, seed=1),
+        slow=_example_cs_forecasts(["BTC", "ETH", "SOL"], scale=0.5, seed=2),
+        carry=_example_cs_forecasts(["BTC", "ETH"], scale=1.0, seed=3),
+        unpooled=_example_cs_forecasts(["BTC"], scale=2.0, seed=4),
+        shorter=_example_cs_forecasts(["BTC", "ETH", "SOL"], scale=1.0, seed=5).iloc[
+            500:
+        ],
+    )
+
+    for kwargs in [dict(), dict(window=400, min_periods=100, backfill=False)]:
+        scalars = batched_forecast_scalars(dict_of_cs_forecasts, **kwargs)
+        assert set(scalars.keys()) == set(dict_of_cs_forecasts.keys())
+        for rule_variation_name, cs_forecasts in dict_of_cs_forecasts.items():
+            pd.testing.assert_series_equal(
+                scalars[rule_variation_name],
+                _forecast_scalar_one_rule(cs_forecasts, **kwargs),
+                check_names=False,
+                check_freq=False,
+                rtol=1e-9,
+            )
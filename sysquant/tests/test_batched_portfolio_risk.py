@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from sysquant.batched_portfolio_risk import calc_portfolio_risk_series_batched
+from sysquant.estimators.correlations import CorrelationList, correlationEstimate
+from sysquant.fitting_dates import fitDates, listOfFittingDates
+
+
+PERIOD_STARTS = [100, 400, 700]
+
+
+def _correlation_list(index, instrument_list, rng):
+    period_starts = [index[start] for start in PERIOD_STARTS]
+    period_ends = period_starts[1:] + [index[-1]]
+    corr_list = []
+    for _ in period_starts:
+        random_factors = rng.normal(size=(len(instrument_list), 3))
+        covariance = random_factors @ random_factors.T + np.identity(
+            len(instrument_list)
+        )
+        stdev = np.sqrt(np.diag(covariance))
+        corr_list.append(
+            correlationEstimate(
+                covariance / np.outer(stdev, stdev), columns=instrument_list
+            )
+        )
+
+    return CorrelationList(
+        corr_list=corr_list,
+        column_names=instrument_list,
+        fit_dates=listOfFittingDates(
+            [
+                fitDates(
+                    fit_start=index[0],
+                    fit_end=period_start,
+                    period_start=period_start,
+                    period_end=period_end,
+                )
+                for period_start, period_end in zip(period_starts, period_ends)
+            ]
+        ),
+    )
+
+
+def test_batched_risk_matches_date_by_date():
+    rng = np.random.default_rng(7)
+    instrument_list = ["A", "B", "C", "D"]
+    index = pd.date_range("2024-01-01", periods=1000, freq="min")
+    weights = pd.DataFrame(
+        rng.normal(size=(1000, 4)), index=index, columns=instrument_list
+    )
+    weights.iloc[:50, 1] = np.nan
+    stdev = pd.DataFrame(
+        rng.uniform(0.1, 1.0, size=(1000, 4)), index=index, columns=instrument_list
+    )
+    list_of_correlations = _correlation_list(index, instrument_list, rng)
+
+    result = calc_portfolio_risk_series_batched(
+        weights, list_of_correlations, stdev, chunk_size=64
+    )
+
+    expected = []
+    for date_idx, relevant_date in enumerate(index):
+        estimates_started = sum(date_idx >= start for start in PERIOD_STARTS)
+        if estimates_started == 0:
+            correlation = np.identity(4)
+        else:
+            correlation = list_of_correlations.corr_list[estimates_started - 1].values
+        stdev_on_date = stdev.loc[relevant_date].values
+        weights_on_date = weights.loc[relevant_date].fillna(0.0).values
+        covariance = np.outer(stdev_on_date, stdev_on_date) * correlation
+        expected.append(np.sqrt(weights_on_date @ covariance @ weights_on_date))
+
+    np.testing.assert_allclose(result.values, expected, rtol=1e-12)
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysquant.estimators.exponential_correlation import (
+    exponentialCorrelationResults,
+    incrementalExponentialCorrelationResults,
+)
+
+
+@pytest.fixture(scope="module")
+def returns():
+    rng = np.random.default_rng(3)
+    index = pd.date_range("2024-01-01", periods=6000, freq="min")
+    mixing = rng.normal(size=(5, 5))
+    values = rng.normal(size=(6000, 5)) @ mixing
+    values[:500, 2] = np.nan
+    values[3000:3100, 4] = np.nan
+    values[rng.random(values.shape) < 0.01] = np.nan
+
+    return pd.DataFrame(values, index=index, columns=list("ABCDE"))
+
+
+def test_incremental_correlation_matches_pandas(returns):
+    expected = exponentialCorrelationResults(returns, ew_lookback=100, min_periods=20)
+    result = incrementalExponentialCorrelationResults(
+        returns, ew_lookback=100, min_periods=20, block_size=64
+    )
+
+    # out of order, so some dates carry on from a later snapshot than the last one
+    index = returns.index
+    dates = [index[10], index[600], index[5999], index[2000], index[3050], index[1500]]
+    dates.append(index[-1] + pd.Timedelta("1min"))
+    for date_point in dates:
+        np.testing.assert_allclose(
+            result.last_valid_cor_matrix_for_date(date_point).values,
+            expected.last_valid_cor_matrix_for_date(date_point).values,
+            rtol=1e-9,
+            atol=1e-11,
+            equal_nan=True,
+        )
+
+
+def test_same_date_reuses_snapshot(returns):
+    result = incrementalExponentialCorrelationResults(returns, ew_lookback=100)
+    first = result.last_valid_cor_matrix_for_date(returns.index[4000]).values
+    second = result.last_valid_cor_matrix_for_date(returns.index[4000]).values
+
+    assert first is second
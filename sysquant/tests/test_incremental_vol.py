@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysquant.estimators.vol import mixed_minute_vol_calc, simple_ewvol_calc
+from sysquant.estimators.incremental_vol import (
+    incrementalVol,
+    incremental_vol_for_vol_function,
+)
+
+VOL_KWARGS = dict(
+    minutes=35,
+    min_periods=10,
+    slow_vol_weeks=20,
+    proportion_of_slow_vol=0.35,
+    vol_abs_min=0.0000000001,
+)
+
+
+@pytest.fixture(scope="module")
+def minute_returns():
+    rng = np.random.default_rng(5)
+    index = pd.date_range("2024-01-01", periods=20000, freq="min")
+    returns = pd.Series(rng.standard_t(4, 20000) * 10.0, index)
+    returns.iloc[0] = np.nan
+    returns.iloc[5000:5020] = np.nan
+
+    return returns
+
+
+def test_incremental_matches_mixed_minute_vol(minute_returns):
+    expected = mixed_minute_vol_calc(minute_returns.copy(), **VOL_KWARGS)
+    result = incrementalVol(**VOL_KWARGS).update_with_series(minute_returns)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-12)
+
+
+def test_incremental_matches_simple_ewvol(minute_returns):
+    expected = simple_ewvol_calc(minute_returns, days=25, min_periods=10)
+    vol_state = incremental_vol_for_vol_function(
+        "sysquant.estimators.vol.simple_ewvol_calc", days=25, min_periods=10
+    )
+    result = vol_state.update_with_series(minute_returns)
+
+    pd.testing.assert_series_equal(result, expected, rtol=1e-12)
+
+
+def test_saved_state_carries_on_where_it_left_off(minute_returns, tmp_path):
+    expected = mixed_minute_vol_calc(minute_returns.copy(), **VOL_KWARGS)
+
+    vol_state = incrementalVol.from_returns(minute_returns.iloc[:12000], **VOL_KWARGS)
+    filename = str(tmp_path / "vol_state.json")
+    vol_state.save(filename)
+    loaded_state = incrementalVol.load(filename)
+
+    # only the returns after the last update are used
+    new_vol = loaded_state.update_with_new_returns_only(minute_returns)
+
+    pd.testing.assert_series_equal(new_vol, expected.iloc[12000:], rtol=1e-12)
+
+    next_datetime = minute_returns.index[-1] + pd.Timedelta(minutes=1)
+    loaded_state.update(1.0, return_datetime=next_datetime)
+    with pytest.raises(Exception):
+        loaded_state.update(1.0, return_datetime=next_datetime)
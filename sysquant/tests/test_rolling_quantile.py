@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysquant.estimators.rolling_quantile import (
+    rollingQuantile,
+    approximate_rolling_quantile,
+)
+
+
+@pytest.fixture(scope="module")
+def vol():
+    rng = np.random.default_rng(11)
+    returns = pd.Series(rng.standard_t(4, 200000) * 0.001)
+
+    return returns.ewm(span=35, min_periods=10).std()
+
+
+def test_streaming_quantile_matches_pandas(vol):
+    sample = vol.iloc[:20000]
+
+    expected = sample.rolling(2000, min_periods=100).quantile(0.05)
+    result = rollingQuantile(window=2000, quantile=0.05, min_periods=100)
+
+    pd.testing.assert_series_equal(result.update_with_series(sample), expected)
+
+
+def test_approximate_quantile_error_is_bounded(vol):
+    window = 20000
+    relative_error = 0.01
+    rank_error = 0.001
+
+    exact = vol.rolling(window, min_periods=100).quantile(0.05)
+    approximate = approximate_rolling_quantile(
+        vol,
+        window=window,
+        quantile=0.05,
+        min_periods=100,
+        relative_error=relative_error,
+        rank_error=rank_error,
+    )
+
+    # once the window is full, window lag and rank error are small next to the
+    # bucket width
+    full_window = slice(2 * window, None)
+    error = ((approximate - exact) / exact).abs().iloc[full_window]
+
+    assert error.median() < relative_error
+    assert error.max() < 3 * relative_error
+
+
+def test_approximate_quantile_never_looks_ahead():
+    series = pd.Series(np.concatenate([np.ones(5000), np.full(5000, 100.0)]))
+
+    approximate = approximate_rolling_quantile(
+        series, window=5000, quantile=0.5, min_periods=10, rank_error=0.01
+    )
+
+    assert (approximate.iloc[:5000].dropna() < 1.01).all()
@@ -0,0 +1,156 @@
+"""
+Save a system cache as a directory with one file per cached item, and load it lazily
+
+system.cache.pickle writes one pickle of everything, which for a minute system takes
+minutes and many GB, and all of it has to be read back to look at anything. Here each
+item is a separate file: time series as numpy arrays, data frames as parquet, and
+anything else as its own pickle, with a manifest of the cache references. Loading only
+reads the manifest; each item is read the first time its value is used.
+"""
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from systems.system_cache import cacheElement
+
+MANIFEST_FILENAME = "manifest.pck"
+
+NUMPY_FORMAT = "npz"
+PARQUET_FORMAT = "parquet"
+PICKLE_FORMAT = "pck"
+
+
+def save_cache_to_directory(cache, directory: str):
+    Path(directory).mkdir(parents=True, exist_ok=True)
+
+    manifest = []
+    for item_number, (cache_ref, cache_element) in enumerate(cache.items()):
+        if cache_element.not_pickable:
+            continue
+
+        value = cache_element.value
+        file_format = _file_format_for_value(value)
+        filename = "%06d.%s" % (item_number, file_format)
+        extra_details = _write_value(
+            value, os.path.join(directory, filename), file_format=file_format
+        )
+
+        manifest.append(
+            dict(
+                cache_ref=cache_ref,
+                filename=filename,
+                file_format=file_format,
+                protected=cache_element.protected,
+                **extra_details,
+            )
+        )
+
+    with open(os.path.join(directory, MANIFEST_FILENAME), "wb") as manifest_file:
+        pickle.dump(manifest, manifest_file)
+
+
+def load_cache_from_directory(cache, directory: str, clearcache: bool = True):
+    with open(os.path.join(directory, MANIFEST_FILENAME), "rb") as manifest_file:
+        manifest = pickle.load(manifest_file)
+
+    if clearcache:
+        cache.clear()
+
+    for entry in manifest:
+        cache_ref = entry.pop("cache_ref")
+        filename = os.path.join(directory, entry.pop("filename"))
+        cache[cache_ref] = lazyCacheElement(filename=filename, **entry)
+
+
+def is_cache_directory(directory: str) -> bool:
+    return os.path.isfile(os.path.join(directory, MANIFEST_FILENAME))
+
+
+class lazyCacheElement(cacheElement):
+    ## reads its value from file the first time it is used
+    def __init__(
+        self,
+        filename: str,
+        file_format: str,
+        protected: bool = False,
+        **extra_details,
+    ):
+        super().__init__(None, protected=protected, not_pickable=False)
+        self._filename = filename
+        self._file_format = file_format
+        self._extra_details = extra_details
+        self._loaded_value = None
+        self._is_loaded = False
+
+    @property
+    def value(self):
+        if not self._is_loaded:
+            self._loaded_value = _read_value(
+                self._filename, file_format=self._file_format, **self._extra_details
+            )
+            self._is_loaded = True
+
+        return self._loaded_value
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._is_loaded
+
+
+def _file_format_for_value(value) -> str:
+    ## subclasses may need more than their data to be rebuilt, so they are pickled
+    if (
+        type(value) is pd.Series
+        and isinstance(value.index, pd.DatetimeIndex)
+        and value.dtype.kind in "fiub"
+    ):
+        return NUMPY_FORMAT
+
+    if type(value) is pd.DataFrame and all(
+        [isinstance(column, str) for column in value.columns]
+    ):
+        return PARQUET_FORMAT
+
+    return PICKLE_FORMAT
+
+
+def _write_value(value, filename: str, file_format: str) -> dict:
+    if file_format == NUMPY_FORMAT:
+        index = value.index
+        tz = None if index.tz is None else str(index.tz)
+        if tz is not None:
+            index = index.tz_convert("utc").tz_localize(None)
+        ## asi8 is in the index's own unit: parquet data comes back in microseconds
+        with open(filename, "wb") as numpy_file:
+            np.savez(numpy_file, index=index.asi8, values=value.values)
+
+        return dict(tz=tz, name=value.name, unit=index.unit)
+
+    if file_format == PARQUET_FORMAT:
+        value.to_parquet(filename)
+        return {}
+
+    with open(filename, "wb") as pickle_file:
+        pickle.dump(value, pickle_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return {}
+
+
+def _read_value(filename: str, file_format: str, tz=None, name=None, unit="ns"):
+    if file_format == NUMPY_FORMAT:
+        with np.load(filename) as saved:
+            index = pd.DatetimeIndex(saved["index"].view("M8[%s]" % unit))
+            values = saved["values"]
+        if tz is not None:
+            index = index.tz_localize("utc").tz_convert(tz)
+
+        return pd.Series(values, index=index, name=name)
+
+    if file_format == PARQUET_FORMAT:
+        return pd.read_parquet(filename)
+
+    with open(filename, "rb") as pickle_file:
+        return pickle.load(pickle_file)
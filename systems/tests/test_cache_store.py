@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from systems.cache_store import (
+    save_cache_to_directory,
+    load_cache_from_directory,
+    is_cache_directory,
+)
+from systems.system_cache import cacheElement, cacheRef
+
+
+class seriesWithExtras(pd.Series):
+    pass
+
+
+def _example_cache():
+    index = pd.date_range("2024-01-01", periods=500, freq="min", tz="UTC")
+    return {
+        cacheRef("rawdata", "get_daily_prices", "BTC"): cacheElement(
+            pd.Series(np.random.randn(500).cumsum(), index=index, name="price")
+        ),
+        cacheRef("portfolio", "get_position_contracts_as_df"): cacheElement(
+            pd.DataFrame(
+                dict(BTC=np.arange(500.0), ETH=np.ones(500)),
+                index=index.tz_localize(None),
+            ),
+            protected=True,
+        ),
+        cacheRef("rules", "get_raw_forecast", "BTC", keyname="ewmac16"): cacheElement(
+            seriesWithExtras(np.arange(500.0), index=index)
+        ),
+        cacheRef("accounts", "get_some_dict", "ETH"): cacheElement(dict(a=1.5)),
+        cacheRef("rawdata", "get_data_handle"): cacheElement(
+            object(), not_pickable=True
+        ),
+    }
+
+
+def test_cache_round_trips_and_loads_lazily(tmp_path):
+    directory = str(tmp_path / "20240101_000000_backtest")
+    cache = _example_cache()
+    save_cache_to_directory(cache, directory)
+    assert is_cache_directory(directory)
+
+    loaded_cache = {}
+    load_cache_from_directory(loaded_cache, directory)
+
+    assert len(loaded_cache) == len(cache) - 1
+    assert all([not cache_element.is_loaded for cache_element in loaded_cache.values()])
+
+    for cache_ref, loaded_element in loaded_cache.items():
+        original = cache[cache_ref]
+        assert loaded_element.protected == original.protected
+        assert type(loaded_element.value) is type(original.value)
+        if isinstance(original.value, pd.Series):
+            pd.testing.assert_series_equal(
+                loaded_element.value, original.value, check_freq=False
+            )
+        elif isinstance(original.value, pd.DataFrame):
+            pd.testing.assert_frame_equal(
+                loaded_element.value, original.value, check_freq=False
+            )
+        else:
+            assert loaded_element.value == original.value
+        assert loaded_element.is_loaded
+
+
+def test_only_used_items_are_read(tmp_path):
+    directory = str(tmp_path / "backtest")
+    save_cache_to_directory(_example_cache(), directory)
+
+    loaded_cache = {}
+    load_cache_from_directory(loaded_cache, directory)
+    loaded_cache[cacheRef("rawdata", "get_daily_prices", "BTC")].value
+
+    assert [cache_element.is_loaded for cache_element in loaded_cache.values()].count(
+        True
+    ) == 1
+
+
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_series_with_index_not_in_nanoseconds_round_trips(tmp_path, tz):
+    # as pd.read_parquet returns them
+    index = pd.date_range("2024-01-01", periods=100, freq="min", tz=tz).as_unit("us")
+    price = pd.Series(np.arange(100.0), index=index, name="price")
+    cache_ref = cacheRef("rawdata", "get_daily_prices", "BTC")
+    directory = str(tmp_path / "backtest")
+    save_cache_to_directory({cache_ref: cacheElement(price)}, directory)
+
+    loaded_cache = {}
+    load_cache_from_directory(loaded_cache, directory)
+
+    pd.testing.assert_series_equal(
+        loaded_cache[cache_ref].value, price, check_freq=False
+    )